@@ -19,20 +19,23 @@ Outputs (default saved under ./analysis/behavioral_patterns/):
  - boxplot_<feature>.png (for top features)
  - figures_package.zip
  - interpretation_apa.txt
+ - correlations_overall_resampling.csv (with --n-permutations / --n-bootstrap:
+   permutation p-values and bootstrap CIs for Pearson and Spearman, see
+   resampling.py)
 """
 
 import argparse
 from pathlib import Path
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy import stats
 import zipfile, os, json
+from correlation_engine import correlation_table
+from resampling import resampled_correlations
 
 sns.set(style="whitegrid")
 
-def run(csv_path, out_dir):
+def run(csv_path, out_dir, n_permutations=0, n_bootstrap=0, n_workers=1, seed=2025):
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
     fig_dir = out_dir / "figures"
@@ -51,19 +54,10 @@ def run(csv_path, out_dir):
     for c in feature_cols:
         df[c] = pd.to_numeric(df[c], errors='coerce')
 
-    # Overall correlations (Pearson & Spearman) vs TLX
-    pearson_results = []
-    spearman_results = []
-    for c in feature_cols:
-        valid = df[['tlx', c]].dropna()
-        if len(valid) < 3:
-            pearson_results.append((c, np.nan, np.nan))
-            spearman_results.append((c, np.nan, np.nan))
-            continue
-        r, p = stats.pearsonr(valid['tlx'], valid[c])
-        rho, p2 = stats.spearmanr(valid['tlx'], valid[c])
-        pearson_results.append((c, r, p))
-        spearman_results.append((c, rho, p2))
+    # Overall correlations (Pearson & Spearman) vs TLX, all features at once
+    overall = correlation_table(df, feature_cols, ['tlx'])
+    pearson_results = overall[['feature','pearson_r','pearson_p']].itertuples(index=False)
+    spearman_results = overall[['feature','spearman_rho','spearman_p']].itertuples(index=False)
 
     pearson_df = pd.DataFrame(pearson_results, columns=['feature','pearson_r','pearson_p']).sort_values('pearson_r', key=abs, ascending=False)
     spearman_df = pd.DataFrame(spearman_results, columns=['feature','spearman_rho','spearman_p']).sort_values('spearman_rho', key=abs, ascending=False)
@@ -71,22 +65,28 @@ def run(csv_path, out_dir):
     pearson_df.to_csv(out_dir / "correlations_overall_pearson.csv", index=False)
     spearman_df.to_csv(out_dir / "correlations_overall_spearman.csv", index=False)
 
+    # Resampling inference (permutation p-values, bootstrap CIs)
+    resampling_csv = None
+    if n_permutations > 0 or n_bootstrap > 0:
+        resampled = []
+        for method in ('pearson', 'spearman'):
+            res = resampled_correlations(df, feature_cols, 'tlx', method=method,
+                                         n_permutations=n_permutations, n_bootstrap=n_bootstrap,
+                                         n_workers=n_workers, seed=seed)
+            cols = [c for c in ('perm_p', 'ci_low', 'ci_high') if c in res.columns]
+            resampled.append(res.drop(columns=[f"{method}_r"]).rename(
+                columns={c: f"{method}_{c}" for c in cols}))
+        resampled_df = resampled[0].merge(resampled[1].drop(columns=['n']), on='feature')
+        resampling_csv = out_dir / "correlations_overall_resampling.csv"
+        resampled_df.to_csv(resampling_csv, index=False)
+
     # Correlation matrix (features + tlx)
     corr_matrix = df[['tlx'] + feature_cols].corr(method='pearson')
     corr_matrix.to_csv(out_dir / "feature_correlation_matrix_pearson.csv")
 
     # Per-task correlations
-    per_task_records = []
-    for task in df['task_id'].unique():
-        sub = df[df['task_id']==task]
-        for c in feature_cols:
-            valid = sub[['tlx', c]].dropna()
-            if len(valid) < 3:
-                r = np.nan; p = np.nan
-            else:
-                r, p = stats.pearsonr(valid['tlx'], valid[c])
-            per_task_records.append({'task_id': task, 'feature': c, 'pearson_r': r, 'pearson_p': p, 'n': len(valid)})
-    per_task_df = pd.DataFrame(per_task_records)
+    per_task_df = correlation_table(df, feature_cols, ['tlx'], group_col='task_id', methods=['pearson'])
+    per_task_df = per_task_df[['task_id','feature','pearson_r','pearson_p','n']]
     per_task_df.to_csv(out_dir / "correlations_by_task_pearson.csv", index=False)
 
     # Top features by absolute Pearson r
@@ -161,15 +161,21 @@ def run(csv_path, out_dir):
         "heatmap_png": str(heatmap_path),
         "boxplots": boxplot_paths,
         "figures_zip": str(zip_path),
-        "interpretation": str(out_dir / "interpretation_apa.txt")
+        "interpretation": str(out_dir / "interpretation_apa.txt"),
+        "resampling_csv": str(resampling_csv) if resampling_csv else None
     }
 
 def main():
     parser = argparse.ArgumentParser(description='Behavioral Pattern Discovery analysis')
     parser.add_argument('--csv', type=str, default='/mnt/data/modeling_dataset.csv', help='Path to modeling CSV')
     parser.add_argument('--out', type=str, default='/mnt/data/analysis/behavioral_patterns', help='Output folder')
+    parser.add_argument('--n-permutations', type=int, default=0, help='Permutation resamples for p-values (0 = skip)')
+    parser.add_argument('--n-bootstrap', type=int, default=0, help='Bootstrap resamples for CIs (0 = skip)')
+    parser.add_argument('--n-workers', type=int, default=1, help='Processes for the resampling chunks')
+    parser.add_argument('--seed', type=int, default=2025)
     args = parser.parse_args()
-    res = run(args.csv, args.out)
+    res = run(args.csv, args.out, n_permutations=args.n_permutations, n_bootstrap=args.n_bootstrap,
+              n_workers=args.n_workers, seed=args.seed)
     print('Saved outputs:')
     for k,v in res.items():
         print(f' - {k}: {v}')
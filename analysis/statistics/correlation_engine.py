@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+analysis/statistics/correlation_engine.py
+
+Pearson and Spearman correlations (r and two-sided p-values) for every
+feature x target pair, overall or within each group (e.g. task_id), in one
+pass of array operations.
+
+NaNs are handled pairwise: each (feature, target, group) uses exactly the
+rows where both values are present, as `df[[target, f]].dropna()` would,
+without copying the data per pair. Spearman ranks are computed within each
+pair's valid rows and group (ties get average ranks), so the results match
+`scipy.stats.pearsonr` / `spearmanr` on the dropna'd pair to floating point
+precision. Pairs with fewer than `min_n` rows, or with a constant column,
+get NaN.
+
+Rows are sorted by group once; per-group sums are then `np.add.reduceat`
+over the sorted rows, so the cost is O(rows x pairs) whatever the number of
+groups. Pair columns are processed in blocks of at most `block_size` floats.
+
+Usage:
+    python correlation_engine.py --csv ../../data/modeling_dataset.csv --group-col task_id
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+METHODS = ("pearson", "spearman")
+
+
+def _group_layout(groups, n_rows):
+    """Row order sorting the groups together, group labels, and group starts.
+
+    Rows whose group is NaN are dropped (as in `DataFrame.groupby`).
+    """
+    if groups is None:
+        return np.arange(n_rows), np.array([None], dtype=object), np.array([0])
+    codes, labels = pd.factorize(pd.Series(groups), sort=False)
+    keep = np.flatnonzero(codes >= 0)
+    order = keep[np.argsort(codes[keep], kind="stable")]
+    sizes = np.bincount(codes[keep], minlength=len(labels))
+    starts = np.cumsum(sizes) - sizes
+    return order, np.asarray(labels, dtype=object), starts
+
+
+def rank_within(V, row_group, starts):
+    """Average ranks (1-based) of each column within each group; NaN stays NaN.
+
+    V's rows must already be sorted by group (`row_group` non-decreasing).
+    """
+    n = V.shape[0]
+    # Sort each column by value, then stably by group: NaNs end up last
+    # within their group, so the valid values take ranks 1..n_valid
+    order = np.argsort(V, axis=0, kind="stable")
+    order = np.take_along_axis(
+        order, np.argsort(row_group[order], axis=0, kind="stable"), axis=0
+    )
+    S = np.take_along_axis(V, order, axis=0)
+    pos = np.arange(n)[:, None]
+    same_group = row_group[1:, None] == row_group[:-1, None]
+    new_run = np.ones(S.shape, dtype=bool)
+    new_run[1:] = (S[1:] != S[:-1]) | ~same_group
+    end_run = np.ones(S.shape, dtype=bool)
+    end_run[:-1] = new_run[1:]
+    first = np.maximum.accumulate(np.where(new_run, pos, 0), axis=0)
+    last = np.minimum.accumulate(np.where(end_run, pos, n)[::-1], axis=0)[::-1]
+    rank = (first + last) / 2.0 - starts[row_group][:, None] + 1.0
+    R = np.empty_like(S)
+    np.put_along_axis(R, order, rank, axis=0)
+    R[np.isnan(V)] = np.nan
+    return R
+
+
+def _pearson(a, b, mask, row_group, starts, min_n):
+    """r and n per (group, column) from pairwise-masked columns a, b."""
+    n = np.add.reduceat(mask.astype(np.int64), starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ma = np.add.reduceat(np.where(mask, a, 0.0), starts, axis=0) / n
+        mb = np.add.reduceat(np.where(mask, b, 0.0), starts, axis=0) / n
+        da = np.where(mask, a - ma[row_group], 0.0)
+        db = np.where(mask, b - mb[row_group], 0.0)
+        r = np.add.reduceat(da * db, starts, axis=0) / np.sqrt(
+            np.add.reduceat(da * da, starts, axis=0) * np.add.reduceat(db * db, starts, axis=0)
+        )
+    # Exactly constant columns are undefined (scipy returns NaN as well);
+    # compare min and max rather than trusting a rounded-to-tiny variance
+    const = np.zeros(r.shape, dtype=bool)
+    for v in (a, b):
+        lo = np.minimum.reduceat(np.where(mask, v, np.inf), starts, axis=0)
+        hi = np.maximum.reduceat(np.where(mask, v, -np.inf), starts, axis=0)
+        const |= lo == hi
+    r = np.clip(r, -1.0, 1.0)
+    r[const | (n < min_n)] = np.nan
+    return r, n
+
+
+def pearson_pvalue(r, n):
+    """Two-sided p-value of Pearson r on n rows (exact beta null, as scipy)."""
+    ab = n / 2.0 - 1.0
+    with np.errstate(invalid="ignore"):
+        p = 2.0 * special.betainc(ab, ab, (1.0 - np.abs(r)) / 2.0)
+    return np.minimum(p, 1.0)
+
+
+def spearman_pvalue(rho, n):
+    """Two-sided p-value of Spearman rho on n rows (t approximation, as scipy)."""
+    dof = n - 2.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = rho * np.sqrt((dof / ((rho + 1.0) * (1.0 - rho))).clip(0))
+        p = 2.0 * special.stdtr(dof, -np.abs(t))
+    return np.minimum(p, 1.0)
+
+
+def correlate(X, Y, groups=None, methods=METHODS, min_n=3, block_size=1 << 24):
+    """Correlations of every column of X with every column of Y, per group.
+
+    Parameters
+    - X: array-like (n_rows, n_features)
+    - Y: array-like (n_rows, n_targets)
+    - groups: array-like (n_rows,) or None -- group label per row (one group if None)
+    - methods: iterable of "pearson" / "spearman"
+    - min_n: int -- pairs with fewer valid rows get NaN r and p
+    - block_size: int -- max floats per (rows x pairs) working array
+
+    Returns
+    - dict with "groups" (labels, in order of first appearance), "n" and, per
+      method, "<method>_r" and "<method>_p", each (n_groups, n_features, n_targets)
+    """
+    methods = tuple(methods)
+    unknown = set(methods) - set(METHODS)
+    if unknown:
+        raise ValueError(f"unknown correlation methods: {sorted(unknown)}")
+    X = np.asarray(X, dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64)
+    X, Y = X.reshape(X.shape[0], -1), Y.reshape(Y.shape[0], -1)
+    n_features, n_targets = X.shape[1], Y.shape[1]
+
+    order, labels, starts = _group_layout(groups, X.shape[0])
+    X, Y = X[order], Y[order]
+    row_group = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(order))))
+    n_pairs = n_features * n_targets
+    out = {"groups": labels, "n": np.zeros((len(starts), n_pairs), dtype=np.int64)}
+    for m in methods:
+        out[f"{m}_r"] = np.full((len(starts), n_pairs), np.nan)
+        out[f"{m}_p"] = np.full((len(starts), n_pairs), np.nan)
+
+    # Pair column j is (feature j // n_targets, target j % n_targets)
+    step = max(1, block_size // max(len(order), 1))
+    for lo in range(0, n_pairs if len(order) else 0, step):
+        cols = np.arange(lo, min(lo + step, n_pairs))
+        a, b = X[:, cols // n_targets], Y[:, cols % n_targets]
+        mask = ~(np.isnan(a) | np.isnan(b))
+        for m in methods:
+            if m == "spearman":
+                a_m = rank_within(np.where(mask, a, np.nan), row_group, starts)
+                b_m = rank_within(np.where(mask, b, np.nan), row_group, starts)
+            else:
+                a_m, b_m = a, b
+            r, n = _pearson(a_m, b_m, mask, row_group, starts, min_n)
+            out["n"][:, cols] = n
+            out[f"{m}_r"][:, cols] = r
+            pvalue = pearson_pvalue if m == "pearson" else spearman_pvalue
+            out[f"{m}_p"][:, cols] = pvalue(r, n)
+
+    shape = (len(starts), n_features, n_targets)
+    for key in out:
+        if key != "groups":
+            out[key] = out[key].reshape(shape)
+    return out
+
+
+def correlation_table(df, features, targets=("tlx",), group_col=None, methods=METHODS, min_n=3):
+    """Long-format correlation table for DataFrame columns.
+
+    Columns are coerced with `pd.to_numeric(errors="coerce")`.
+
+    Returns
+    - DataFrame with [group_col,] target, feature, n and pearson_r / pearson_p
+      and/or spearman_rho / spearman_p; one row per (group, target, feature),
+      groups in order of first appearance, then targets, then features
+    """
+    features, targets = list(features), list(targets)
+    X = df[features].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    Y = df[targets].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    groups = df[group_col].to_numpy() if group_col is not None else None
+    res = correlate(X, Y, groups=groups, methods=methods, min_n=min_n)
+
+    n_groups = len(res["groups"])
+    # (group, target, feature) ordering
+    table = {
+        "target": np.tile(np.repeat(targets, len(features)), n_groups),
+        "feature": np.tile(features, n_groups * len(targets)),
+        "n": res["n"].transpose(0, 2, 1).ravel(),
+    }
+    if group_col is not None:
+        table = {group_col: np.repeat(res["groups"], len(targets) * len(features)), **table}
+    names = {"pearson": ("pearson_r", "pearson_p"), "spearman": ("spearman_rho", "spearman_p")}
+    for m in methods:
+        r_name, p_name = names[m]
+        table[r_name] = res[f"{m}_r"].transpose(0, 2, 1).ravel()
+        table[p_name] = res[f"{m}_p"].transpose(0, 2, 1).ravel()
+    return pd.DataFrame(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature x target correlations (Pearson + Spearman).")
+    parser.add_argument("--csv", type=str, default="../../data/modeling_dataset.csv")
+    parser.add_argument("--targets", type=str, default="tlx", help="Comma-separated target columns")
+    parser.add_argument("--group-col", type=str, default=None, help="e.g. task_id")
+    parser.add_argument("--out", type=str, default=None, help="Optional output CSV")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    targets = [t.strip() for t in args.targets.split(",")]
+    meta_cols = {"participantId", "task_id", "tlx", "High_Load", "shap_cluster"} | set(targets)
+    features = [c for c in df.columns if c not in meta_cols]
+    table = correlation_table(df, features, targets, group_col=args.group_col)
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"Saved {len(table)} correlations to {args.out}")
+    else:
+        print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+analysis/statistics/resampling.py
+
+Permutation p-values and bootstrap confidence intervals for every
+feature-TLX correlation (Pearson or Spearman), computed in batches.
+
+Each pair (feature, TLX) uses its own complete rows, as in
+correlation_engine.py. Resamples are shared by all features: a chunk of B
+resamples is one (B, n_rows) index matrix, drawn once, and the statistic
+for every feature and resample comes out of a few matrix operations:
+ - permutation: TLX is shuffled across rows; for Pearson the per-feature
+   sums are matrix products of the (rows x features) mask / centered
+   feature matrix with the (rows x B) shuffled TLX matrix
+ - bootstrap: rows are drawn with replacement and enter as (rows x B)
+   count weights, so every per-feature moment is again one matrix product
+ - Spearman: ranks inside each resample are weighted mid-ranks, i.e. sums
+   of resample weights over the ties runs of each pre-sorted column
+   (`np.add.reduceat`), so nothing is re-sorted per resample
+
+The statistic of every resample equals scipy.stats.pearsonr / spearmanr on
+the explicitly resampled, dropna'd pair.
+
+Chunk c draws its indices from the c-th child of `np.random.SeedSequence(seed)`,
+so results depend only on `seed`, `n_resamples` and `chunk_size`, not on
+`n_workers`. With n_workers > 1, chunks are spread across processes; the
+data is handed to each worker once by the pool initializer.
+
+Permutations are of whole rows, i.e. they assume rows are exchangeable
+under the null; repeated measures per participant are not taken into
+account.
+
+Usage:
+    python resampling.py --csv ../../data/modeling_dataset.csv \
+        --n-permutations 9999 --n-bootstrap 9999 --n-workers 4
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+from correlation_engine import rank_within, correlate
+
+# Per-process data for resampling chunks, set once by the pool initializer
+_RESAMPLE_STATE: Dict[str, Any] = {}
+
+
+class _Prepared:
+    """Feature matrix, TLX and the per-column sort orders every chunk reuses.
+
+    Rows with a missing target are dropped up front; feature NaNs are kept
+    and masked per column.
+    """
+
+    def __init__(self, X, y, method):
+        keep = ~np.isnan(y)
+        self.method = method
+        self.X = X[keep]
+        self.y = y[keep] - y[keep].mean()
+        self.M = ~np.isnan(self.X)
+        self.n = self.M.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mx = np.where(self.M, self.X, 0.0).sum(axis=0) / self.n
+        self.Xc = np.where(self.M, self.X - mx, 0.0)
+        self.Sxx = (self.Xc**2).sum(axis=0)
+        if method == "spearman":
+            n_rows = len(self.y)
+            zero = np.zeros(n_rows, dtype=np.intp)
+            # Fixed mid-ranks of each feature within its valid rows (used by
+            # the permutation test, where the feature is not resampled)
+            self.Rx = rank_within(self.X, zero, np.array([0]))
+            self.y_sort = _sort_runs(self.y)
+            self.x_sort = [_sort_runs(self.X[:, j]) for j in range(self.X.shape[1])]
+
+
+def _sort_runs(v):
+    """Sort order of v (NaNs last), start of each ties run, run id of each row."""
+    order = np.argsort(v, kind="stable")
+    s = v[order]
+    new_run = np.ones(len(s), dtype=bool)
+    new_run[1:] = s[1:] != s[:-1]
+    row_run = np.empty(len(v), dtype=np.intp)
+    row_run[order] = np.cumsum(new_run) - 1
+    return order, np.flatnonzero(new_run), row_run
+
+
+def _weighted_midranks(w, sort):
+    """Mid-ranks of a pre-sorted column in B weighted samples.
+
+    w: (B, n_rows) weight of each row in each sample. A row with weight w
+    stands for w tied copies; rows with weight 0 are absent.
+    """
+    order, starts, row_run = sort
+    tot = np.add.reduceat(w[:, order], starts, axis=1)
+    mid = np.cumsum(tot, axis=1) - tot + (tot + 1.0) / 2.0
+    return mid[:, row_run]
+
+
+def _pearson_from_moments(n, sx, sy, sxx, syy, sxy, scale):
+    """r from weighted sums; NaN where n < 3 or a side is (numerically) constant."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vx = sxx - sx**2 / n
+        vy = syy - sy**2 / n
+        r = (sxy - sx * sy / n) / np.sqrt(vx * vy)
+        degenerate = (n < 3) | (vx <= 1e-12 * scale[0] * n) | (vy <= 1e-12 * scale[1] * n)
+    r = np.clip(r, -1.0, 1.0)
+    r[degenerate] = np.nan
+    return r
+
+
+def _permutation_stats(data: _Prepared, idx: np.ndarray) -> np.ndarray:
+    """(n_features, B) statistics with TLX of row i replaced by y[idx[b, i]]."""
+    Yp = data.y[idx].T
+    if data.method == "pearson":
+        Mf = data.M.astype(np.float64)
+        sy, syy = Mf.T @ Yp, Mf.T @ Yp**2
+        sxy = data.Xc.T @ Yp
+        n = data.n[:, None]
+        scale = (data.Sxx[:, None] / n, (data.y**2).mean())
+        return _pearson_from_moments(n, 0.0, sy, data.Sxx[:, None], syy, sxy, scale)
+
+    out = np.empty((data.X.shape[1], idx.shape[0]))
+    rows = np.arange(idx.shape[0])[:, None]
+    # TLX ranks only depend on which rows are valid: share them between
+    # features with the same missing pattern (typically: none missing)
+    ry_by_mask = {}
+    for j in range(data.X.shape[1]):
+        valid = data.M[:, j]
+        key = valid.tobytes()
+        if key not in ry_by_mask:
+            if valid.all():
+                ry = _weighted_midranks(np.ones((1, len(valid))), data.y_sort)[0][idx]
+            else:
+                # TLX value y[r] is present in sample b iff its new row
+                # idx^-1(r) is valid
+                present = np.zeros(idx.shape)
+                present[rows, idx] = valid
+                ry = _weighted_midranks(present, data.y_sort)[rows, idx]
+            ry_by_mask[key] = ry
+        ry = ry_by_mask[key]
+        n = valid.sum()
+        mean = (n + 1.0) / 2.0
+        rx = np.where(valid, data.Rx[:, j] - mean, 0.0)
+        ryc = np.where(valid, ry - mean, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = (ryc @ rx) / np.sqrt((rx**2).sum() * (ryc**2).sum(axis=1))
+        out[j] = r if n >= 3 else np.nan
+    return np.clip(out, -1.0, 1.0)
+
+
+def _bootstrap_stats(data: _Prepared, idx: np.ndarray) -> np.ndarray:
+    """(n_features, B) statistics on rows idx[b] (drawn with replacement)."""
+    B, n_rows = idx.shape
+    W = np.bincount((idx + n_rows * np.arange(B)[:, None]).ravel(), minlength=B * n_rows)
+    W = W.reshape(B, n_rows).astype(np.float64)
+    if data.method == "pearson":
+        Mf = data.M.astype(np.float64)
+        Wt = W.T
+        n = Mf.T @ Wt
+        sx, sxx = data.Xc.T @ Wt, (data.Xc**2).T @ Wt
+        sy, syy = Mf.T @ (Wt * data.y[:, None]), Mf.T @ (Wt * data.y[:, None] ** 2)
+        sxy = (data.Xc * data.y[:, None]).T @ Wt
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = ((data.Sxx / data.n)[:, None], (data.y**2).mean())
+        return _pearson_from_moments(n, sx, sy, sxx, syy, sxy, scale)
+
+    out = np.empty((data.X.shape[1], B))
+    ry_by_mask = {}
+    for j in range(data.X.shape[1]):
+        w = W * data.M[:, j]
+        rx = _weighted_midranks(w, data.x_sort[j])
+        key = data.M[:, j].tobytes()
+        if key not in ry_by_mask:
+            ry_by_mask[key] = _weighted_midranks(w, data.y_sort)
+        ry = ry_by_mask[key]
+        n = w.sum(axis=1)
+        mean = ((n + 1.0) / 2.0)[:, None]
+        rxc, ryc = rx - mean, ry - mean
+        sxx, syy = (w * rxc**2).sum(axis=1), (w * ryc**2).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = (w * rxc * ryc).sum(axis=1) / np.sqrt(sxx * syy)
+        r[(n < 3) | (sxx <= 0) | (syy <= 0)] = np.nan
+        out[j] = r
+    return np.clip(out, -1.0, 1.0)
+
+
+def _draw(kind, seed, size, n_rows):
+    """One chunk's (size, n_rows) index matrix."""
+    rng = np.random.default_rng(seed)
+    if kind == "permutation":
+        return rng.permuted(np.tile(np.arange(n_rows), (size, 1)), axis=1)
+    return rng.integers(0, n_rows, size=(size, n_rows))
+
+
+def _init_resample_worker(data: _Prepared):
+    _RESAMPLE_STATE["data"] = data
+
+
+def _run_chunk(kind, seed, size):
+    data = _RESAMPLE_STATE["data"]
+    idx = _draw(kind, seed, size, len(data.y))
+    stats = _permutation_stats if kind == "permutation" else _bootstrap_stats
+    return stats(data, idx)
+
+
+def _resample(data, kind, n_resamples, chunk_size, seed, n_workers):
+    """(n_features, n_resamples) resampled statistics, chunk by chunk."""
+    sizes = [min(chunk_size, n_resamples - lo) for lo in range(0, n_resamples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if n_workers <= 1 or len(sizes) == 1:
+        _RESAMPLE_STATE["data"] = data
+        try:
+            parts = [_run_chunk(kind, s, size) for s, size in zip(seeds, sizes)]
+        finally:
+            _RESAMPLE_STATE.clear()
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(n_workers, len(sizes)),
+            initializer=_init_resample_worker,
+            initargs=(data,),
+        ) as pool:
+            futures = [pool.submit(_run_chunk, kind, s, size) for s, size in zip(seeds, sizes)]
+            parts = [f.result() for f in futures]
+    return np.concatenate(parts, axis=1)
+
+
+def resampled_correlations(
+    df,
+    features,
+    target="tlx",
+    method="pearson",
+    n_permutations=9999,
+    n_bootstrap=9999,
+    confidence=0.95,
+    chunk_size=1000,
+    n_workers=1,
+    seed=2025,
+):
+    """Permutation p-values and percentile bootstrap CIs for feature-target r.
+
+    Parameters
+    - df: DataFrame with the feature and target columns
+    - features: list of feature column names
+    - target: str -- target column (TLX)
+    - method: "pearson" or "spearman"
+    - n_permutations, n_bootstrap: int -- resamples of each kind (0 skips it)
+    - confidence: float -- bootstrap interval level
+    - chunk_size: int -- resamples per chunk (memory ~ chunk_size x rows floats)
+    - n_workers: int -- processes for the chunks (1 = in process)
+    - seed: int -- root seed; the same seed gives the same output for any n_workers
+
+    Returns
+    - DataFrame: feature, n, <method>_r, perm_p (two-sided, (1 + #|r_b| >= |r|) /
+      (B + 1)), ci_low, ci_high
+    """
+    features = list(features)
+    X = df[features].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    y = pd.to_numeric(df[target], errors="coerce").to_numpy(dtype=np.float64)
+    observed = correlate(X, y[:, None], methods=[method])
+    r_obs = observed[f"{method}_r"][0, :, 0]
+    out = pd.DataFrame({"feature": features, "n": observed["n"][0, :, 0], f"{method}_r": r_obs})
+
+    data = _Prepared(X, y, method)
+    if n_permutations > 0:
+        perm = _resample(data, "permutation", n_permutations, chunk_size, seed, n_workers)
+        # Same relative tolerance as scipy.stats.permutation_test, so that
+        # resamples equal to the observed r up to rounding count as extreme
+        gamma = np.abs(r_obs) * np.finfo(np.float64).eps * 100
+        extreme = (np.abs(perm) >= (np.abs(r_obs) - gamma)[:, None]).sum(axis=1)
+        out["perm_p"] = np.where(np.isnan(r_obs), np.nan, (extreme + 1.0) / (n_permutations + 1.0))
+    if n_bootstrap > 0:
+        # Seed the bootstrap differently from the permutations
+        boot = _resample(data, "bootstrap", n_bootstrap, chunk_size, seed + 1, n_workers)
+        alpha = (1.0 - confidence) / 2.0
+        with np.errstate(invalid="ignore"):
+            lo, hi = np.nanquantile(boot, [alpha, 1.0 - alpha], axis=1)
+        undefined = np.isnan(r_obs)
+        out["ci_low"] = np.where(undefined, np.nan, lo)
+        out["ci_high"] = np.where(undefined, np.nan, hi)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Permutation / bootstrap inference for feature-TLX correlations.")
+    parser.add_argument("--csv", type=str, default="../../data/modeling_dataset.csv")
+    parser.add_argument("--method", choices=["pearson", "spearman"], default="pearson")
+    parser.add_argument("--n-permutations", type=int, default=9999)
+    parser.add_argument("--n-bootstrap", type=int, default=9999)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--n-workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--out", type=str, default=None, help="Optional output CSV")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    meta_cols = {"participantId", "task_id", "tlx", "High_Load", "shap_cluster"}
+    features = [c for c in df.columns if c not in meta_cols]
+    res = resampled_correlations(
+        df,
+        features,
+        method=args.method,
+        n_permutations=args.n_permutations,
+        n_bootstrap=args.n_bootstrap,
+        chunk_size=args.chunk_size,
+        n_workers=args.n_workers,
+        seed=args.seed,
+    )
+    if args.out:
+        res.to_csv(args.out, index=False)
+        print(f"Saved resampling results to {args.out}")
+    else:
+        print(res.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 """
 analysis/statistics/run_correlations.py
 
-Compute Pearson correlations between engineered features and NASA-TLX.
+Compute Pearson correlations between engineered features and NASA-TLX
+(all features and tasks at once, via correlation_engine.py).
 Produces:
  - overall correlations CSV
  - heatmap saved as PNG
@@ -17,7 +18,7 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy.stats import pearsonr
+from correlation_engine import correlation_table
 
 DEFAULT_CSV = "../../data/modeling_dataset.csv"
 
@@ -55,61 +56,37 @@ def detect_features(df, candidate_features):
     missing = [f for f in candidate_features if f not in df.columns]
     return present, missing
 
+def _filled_numeric(df, features):
+    # Missing feature values count as 0 (as before); values that are not
+    # numeric are dropped pairwise by the correlation engine
+    return df[features].fillna(0.0).apply(pd.to_numeric, errors="coerce").assign(
+        tlx=pd.to_numeric(df["tlx"], errors="coerce")
+    )
+
 def compute_overall_correlations(df, features):
-    results = []
-    for f in features:
-        try:
-            x = pd.to_numeric(df[f].fillna(0.0), errors="coerce")
-            y = pd.to_numeric(df["tlx"], errors="coerce")
-            mask = (~x.isna()) & (~y.isna())
-            if mask.sum() < 3:
-                r, p = np.nan, np.nan
-            else:
-                r, p = pearsonr(x[mask], y[mask])
-            direction = "positive" if (not np.isnan(r) and r > 0) else ("negative" if (not np.isnan(r) and r < 0) else "nan")
-            results.append({"feature": f, "pearson_r": r, "p_value": p, "direction": direction, "n": int(mask.sum())})
-        except Exception as e:
-            results.append({"feature": f, "pearson_r": np.nan, "p_value": np.nan, "direction": "error", "n": 0})
-    dfres = pd.DataFrame(results)
+    dfres = correlation_table(_filled_numeric(df, features), features, ["tlx"], methods=["pearson"])
+    dfres = dfres.rename(columns={"pearson_p": "p_value"})
+    r = dfres["pearson_r"]
+    dfres["direction"] = np.where(r > 0, "positive", np.where(r < 0, "negative", "nan"))
+    dfres = dfres[["feature", "pearson_r", "p_value", "direction", "n"]]
     dfres["rank"] = dfres["pearson_r"].abs().rank(ascending=False, method="first")
     dfres = dfres.sort_values("rank")
     return dfres
 
 def compute_taskwise_correlations(df, features):
-    rows = []
-    for task, g in df.groupby("task_id"):
-        for f in features:
-            if f not in g.columns:
-                rows.append({"task_id": task, "feature": f, "pearson_r": np.nan, "p_value": np.nan, "n": 0})
-                continue
-            x = pd.to_numeric(g[f].fillna(0.0), errors="coerce")
-            y = pd.to_numeric(g["tlx"], errors="coerce")
-            mask = (~x.isna()) & (~y.isna())
-            if mask.sum() < 3:
-                r, p = np.nan, np.nan
-            else:
-                r, p = pearsonr(x[mask], y[mask])
-            rows.append({"task_id": task, "feature": f, "pearson_r": r, "p_value": p, "n": int(mask.sum())})
-    return pd.DataFrame(rows)
+    data = _filled_numeric(df, features).assign(task_id=df["task_id"])
+    rows = correlation_table(data, features, ["tlx"], group_col="task_id", methods=["pearson"])
+    rows = rows.rename(columns={"pearson_p": "p_value"})
+    # groupby order: tasks sorted, features in the order given
+    rows = rows.sort_values("task_id", kind="stable").reset_index(drop=True)
+    return rows[["task_id", "feature", "pearson_r", "p_value", "n"]]
 
 def save_heatmap(df, features, out_path):
     # Build a matrix: features x [tlx] only - show correlation magnitudes
-    corr_vals = {}
-    for f in features:
-        if f in df.columns:
-            try:
-                x = pd.to_numeric(df[f].fillna(0.0), errors="coerce")
-                y = pd.to_numeric(df["tlx"], errors="coerce")
-                mask = (~x.isna()) & (~y.isna())
-                if mask.sum() >= 3:
-                    r, _ = pearsonr(x[mask], y[mask])
-                else:
-                    r = np.nan
-            except:
-                r = np.nan
-        else:
-            r = np.nan
-        corr_vals[f] = r
+    present = [f for f in features if f in df.columns]
+    overall = correlation_table(_filled_numeric(df, present), present, ["tlx"], methods=["pearson"])
+    corr_vals = dict.fromkeys(features, np.nan)
+    corr_vals.update(zip(overall["feature"], overall["pearson_r"]))
     series = pd.Series(corr_vals).rename("pearson_r")
     # Heatmap will be a single-column heatmap (features vs TLX)
     heat_df = series.to_frame().sort_values("pearson_r", ascending=False)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+bench_adaptation.py
+
+Temporal smoothing + hysteresis for all active sessions per tick: the usual
+per-session Python loop (one state dict per session) vs the vectorized
+controller (src/inference/adaptation.py), in milliseconds per tick and
+session updates per second. Checks that both switch the same sessions on the
+same ticks. Also times `step_store` on micro-batches of a SessionStore.
+
+Usage:
+    python benchmarks/bench_adaptation.py --sessions 1000 10000 100000 --ticks 30
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "inference"))
+
+from adaptation import HysteresisController, simulate  # noqa: E402
+from session_store import HIGH_LOAD, LOW_LOAD, SessionStore  # noqa: E402
+
+
+def loop_step(sessions, proba, ctrl, cast=float):
+    """Reference: the per-session update as deployments write it today.
+
+    cast=np.float32 rounds like the controller's columns (for the agreement check).
+    """
+    switched = []
+    for i, p in enumerate(proba.tolist()):
+        s = sessions[i]
+        s["n"] += 1
+        p = cast(p)
+        s["ewma"] = p if s["ewma"] is None else cast(s["ewma"] + ctrl.alpha * (p - s["ewma"]))
+        if s["n"] <= ctrl.calibration_windows:
+            s["dwell"] = 0
+            continue
+        if s["state"] == HIGH_LOAD:
+            toward, need = s["ewma"] <= ctrl.exit_threshold, ctrl.exit_windows
+        else:
+            toward, need = s["ewma"] >= ctrl.enter_threshold, ctrl.enter_windows
+        s["dwell"] = s["dwell"] + 1 if toward else 0
+        if toward and s["dwell"] >= need:
+            s["state"] = LOW_LOAD if s["state"] == HIGH_LOAD else HIGH_LOAD
+            s["dwell"] = 0
+            switched.append(i)
+    return switched
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--ticks", type=int, default=30)
+    parser.add_argument("--batch", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'sessions':>9}{'loop ms/tick':>14}{'vector ms/tick':>16}{'speedup':>9}{'updates/s':>14}  same switches")
+    for n in args.sessions:
+        probas = simulate(n, args.ticks)
+        ctrl = HysteresisController(n)
+        fresh = lambda: [{"n": 0, "ewma": None, "state": LOW_LOAD, "dwell": 0} for _ in range(n)]  # noqa: E731
+        timed, checked = fresh(), fresh()
+        t_loop = t_vec = 0.0
+        same = True
+        for p in probas:
+            t0 = time.perf_counter()
+            loop_step(timed, p, ctrl)
+            t1 = time.perf_counter()
+            got = ctrl.step(p)
+            t2 = time.perf_counter()
+            t_loop += t1 - t0
+            t_vec += t2 - t1
+            same &= loop_step(checked, p, ctrl, cast=np.float32) == got.tolist()
+        print(
+            f"{n:>9}{1e3 * t_loop / args.ticks:>14.1f}{1e3 * t_vec / args.ticks:>16.2f}"
+            f"{t_loop / t_vec:>9.0f}{n * args.ticks / t_vec:>14,.0f}  {same}"
+        )
+
+    # Store path: each scored micro-batch updates its sessions' columns; few
+    # enough sessions that they get past calibration
+    n = min(args.sessions)
+    store = SessionStore(ttl_s=None, max_sessions=n)
+    ctrl = HysteresisController()
+    ids = [f"s-{i:06d}" for i in range(n)]
+    rng = np.random.default_rng(0)
+    n_batches = 2000
+    batches = [rng.choice(n, args.batch, replace=False) for _ in range(n_batches)]
+    proba = rng.random((n_batches, args.batch))
+    t_store = t_ctrl = 0.0
+    n_switched = 0
+    for b, p in zip(batches, proba):
+        t0 = time.perf_counter()
+        slots = store.update_many([ids[i] for i in b], proba=p, now=0.0)
+        t1 = time.perf_counter()
+        n_switched += len(ctrl.step_store(store, slots, p))
+        t_ctrl += time.perf_counter() - t1
+        t_store += t1 - t0
+    rows = n_batches * args.batch
+    print(
+        f"SessionStore, batches of {args.batch}: update_many {1e9 * t_store / rows:.0f} ns/row, "
+        f"step_store {1e9 * t_ctrl / rows:.0f} ns/row ({n_switched} switches)"
+    )
+
+
+if __name__ == "__main__":
+    main()
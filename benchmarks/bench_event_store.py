@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+bench_event_store.py
+
+Time feature extraction from per-session JSON files against the columnar
+event store (event_store.py), which reads only the STORE_COLUMNS the
+extractor needs. Both paths must produce the same modeling DataFrame, also
+for a column that is numeric in one ingest chunk and text in another, and
+for cursor points with null coordinates.
+
+Usage:
+    python benchmarks/bench_event_store.py --n-participants 200 --n-points 20000
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "data_preparation"))
+
+from compute_features import (  # noqa: E402
+    build_modeling_dataframe,
+    build_modeling_dataframe_from_store,
+)
+from event_store import ingest_raw  # noqa: E402
+from synthetic import write_corpus  # noqa: E402
+
+
+def check_mixed_types(tmp):
+    """A column numeric in one chunk and text in the next must widen to string."""
+    raw_dir = os.path.join(tmp, "mixed_raw")
+    write_corpus(raw_dir, 2, 50)
+    path = sorted(glob.glob(os.path.join(raw_dir, "p-00001", "task_2_*.json")))[0]
+    with open(path) as f:
+        obj = json.load(f)
+    obj["filter_interactions"][0]["value_after"] = "acme"
+    with open(path, "w") as f:
+        json.dump(obj, f)
+    store_dir = os.path.join(tmp, "mixed_events")
+    manifest = ingest_raw(raw_dir, store_dir, chunk_sessions=1)
+    assert manifest["tables"]["filter_interactions"]["value_after"] == "string", manifest
+    pd.testing.assert_frame_equal(
+        build_modeling_dataframe(raw_dir), build_modeling_dataframe_from_store(store_dir)
+    )
+
+
+def check_null_coordinates(tmp):
+    """Null x / y in mouse_path points default to 0 on both paths."""
+    raw_dir = os.path.join(tmp, "null_raw")
+    write_corpus(raw_dir, 1, 50)
+    for path in sorted(glob.glob(os.path.join(raw_dir, "p-00000", "*.json"))):
+        with open(path) as f:
+            obj = json.load(f)
+        for key in ("mouse_path", "mouse_data"):
+            if obj.get(key):
+                obj[key][1]["x"] = None
+                obj[key][2].pop("y", None)
+        with open(path, "w") as f:
+            json.dump(obj, f)
+    store_dir = os.path.join(tmp, "null_events")
+    ingest_raw(raw_dir, store_dir)
+    pd.testing.assert_frame_equal(
+        build_modeling_dataframe(raw_dir), build_modeling_dataframe_from_store(store_dir)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-participants", type=int, default=200)
+    parser.add_argument("--n-points", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = os.path.join(tmp, "raw")
+        store_dir = os.path.join(tmp, "events")
+        write_corpus(raw_dir, args.n_participants, args.n_points)
+
+        t0 = time.perf_counter()
+        ingest_raw(raw_dir, store_dir)
+        t_ingest = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        df_json = build_modeling_dataframe(raw_dir)
+        t_json = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        df_store = build_modeling_dataframe_from_store(store_dir)
+        t_store = time.perf_counter() - t0
+
+        pd.testing.assert_frame_equal(df_json, df_store)
+        check_mixed_types(tmp)
+        check_null_coordinates(tmp)
+        print(f"sessions: {len(df_json)}  one-off ingest: {t_ingest:.2f}s")
+        print(f"{'source':<10}{'seconds':>10}")
+        print(f"{'json':<10}{t_json:>10.2f}")
+        print(f"{'store':<10}{t_store:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
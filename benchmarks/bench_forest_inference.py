@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+bench_forest_inference.py
+
+Equivalence check and latency benchmark for the packed-array forest
+(src/modeling/forest_compiler.py) against `Pipeline.predict_proba`.
+
+A pipeline with the default tuned parameters (300 trees, depth 12) is fit on
+the modeling CSV; both paths then score batches of 1, 32 and 1024 rows drawn
+from it with noise and injected NaNs (to exercise the imputer).
+
+Usage:
+    python benchmarks/bench_forest_inference.py --csv results/modeling_dataset_with_oof_probs.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "modeling"))
+
+from forest_compiler import CompiledForest, compile_pipeline  # noqa: E402
+from train_louo_random_forest import DEFAULT_PARAMS, build_pipeline_from_params  # noqa: E402
+
+META_COLS = {"participantId", "task_id", "tlx", "High_Load", "pred_proba_highload"}
+
+
+def load_xy(csv_path):
+    df = pd.read_csv(csv_path)
+    feature_cols = [c for c in df.columns if c not in META_COLS]
+    return df[feature_cols].values.astype(float), df["High_Load"].values
+
+
+def make_batch(rng, X, n):
+    rows = X[rng.integers(0, len(X), n)].copy()
+    rows *= rng.normal(1.0, 0.1, rows.shape)
+    rows[rng.random(rows.shape) < 0.05] = np.nan
+    return rows
+
+
+def median_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return 1e3 * float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--csv",
+        type=str,
+        default=os.path.join(HERE, "..", "results", "modeling_dataset_with_oof_probs.csv"),
+    )
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    X, y = load_xy(args.csv)
+    X[np.random.default_rng(0).random(X.shape) < 0.05] = np.nan
+    pipeline = build_pipeline_from_params(DEFAULT_PARAMS).fit(X, y)
+    compiled = compile_pipeline(pipeline)
+
+    # Round-trip through .npz to check persistence too
+    path = os.path.join(os.environ.get("TMPDIR", "/tmp"), "bench_compiled_forest.npz")
+    compiled = CompiledForest.load(compiled.save(path))
+
+    rng = np.random.default_rng(2025)
+    print(f"trees: {compiled.n_trees}  nodes: {compiled.feature.shape[0]}  depth: {compiled.max_depth}")
+    print(f"{'batch':>7}{'sklearn ms':>13}{'compiled ms':>13}{'speedup':>9}{'max |diff|':>12}")
+    for n in args.batch_sizes:
+        batch = make_batch(rng, X, n)
+        ref = pipeline.predict_proba(batch)
+        out = compiled.predict_proba(batch)
+        diff = float(np.abs(ref - out).max())
+        assert np.allclose(ref, out, rtol=0, atol=1e-12), f"batch {n}: max diff {diff}"
+        assert (compiled.predict(batch) == pipeline.predict(batch)).all()
+        t_ref = median_ms(lambda: pipeline.predict_proba(batch), args.repeats)
+        t_out = median_ms(lambda: compiled.predict_proba(batch), args.repeats)
+        print(f"{n:>7}{t_ref:>13.3f}{t_out:>13.3f}{t_ref / t_out:>9.1f}{diff:>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+bench_generate_data.py
+
+Synthetic data generation: the per-session Python generator in
+`synthetic.py` (one `make_session` dict per session) vs the batched
+generator `src/data_preparation/generate_data.py`, in sessions per second
+and cursor samples per second. Also times the raw-matching JSON writer and
+checks that the batched output is identical for 1 and `--n-workers`
+processes, and that compute_features rebuilds the CSV from the raw JSON
+with the `computed_metrics` blocks removed.
+
+Usage:
+    python benchmarks/bench_generate_data.py --n-participants 2000 --n-workers 4
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, "..", "src", "data_preparation"))
+
+from compute_features import build_modeling_dataframe  # noqa: E402
+from generate_data import TASKS, generate_dataset  # noqa: E402
+from synthetic import make_session  # noqa: E402
+
+
+def check_recomputed(raw_dir, df):
+    """Strip `computed_metrics` from the raw JSON and re-extract: must match the generator's rows."""
+    for path in glob.glob(os.path.join(raw_dir, "*", "*.json")):
+        with open(path) as f:
+            obj = json.load(f)
+        del obj["computed_metrics"]
+        with open(path, "w") as f:
+            json.dump(obj, f)
+    keys = ["participantId", "task_id"]
+    got = build_modeling_dataframe(raw_dir).sort_values(keys).reset_index(drop=True)
+    want = df.sort_values(keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got[want.columns], want, check_dtype=False, rtol=1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-participants", type=int, default=2000)
+    parser.add_argument("--n-workers", type=int, default=4)
+    parser.add_argument("--shard-size", type=int, default=250)
+    parser.add_argument("--mouse-hz", type=float, default=5.0)
+    args = parser.parse_args()
+    n_sessions = args.n_participants * len(TASKS)
+
+    t0 = time.perf_counter()
+    df = generate_dataset(args.n_participants, shard_size=args.shard_size, mouse_hz=args.mouse_hz)
+    t_batch = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    df_par = generate_dataset(
+        args.n_participants, shard_size=args.shard_size, n_workers=args.n_workers, mouse_hz=args.mouse_hz
+    )
+    t_par = time.perf_counter() - t0
+
+    # Same cursor volume per session for the per-session reference
+    n_points = int(args.mouse_hz * 270)
+    rng = np.random.default_rng(2025)
+    n_ref = min(n_sessions, 3000)
+    t0 = time.perf_counter()
+    for i in range(n_ref // len(TASKS)):
+        for task in TASKS:
+            make_session(rng, f"p-{i:05d}", task, n_points)
+    t_loop = (time.perf_counter() - t0) * n_sessions / n_ref
+
+    n_raw = min(args.n_participants, 200)
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        df_raw = generate_dataset(n_raw, shard_size=args.shard_size, mouse_hz=args.mouse_hz, raw_dir=tmp)
+        t_raw = time.perf_counter() - t0
+        check_recomputed(tmp, df_raw)
+
+    print(f"{args.n_participants} participants, {n_sessions} sessions, ~{n_points} cursor samples each")
+    print(f"per-session dicts (synthetic.py, extrapolated from {n_ref}): {t_loop:.1f} s")
+    print(f"batched, 1 process:  {t_batch:.1f} s ({n_sessions / t_batch:,.0f} sessions/s, {t_loop / t_batch:.0f}x)")
+    print(f"batched, {args.n_workers} processes: {t_par:.1f} s ({n_sessions / t_par:,.0f} sessions/s)")
+    print(f"raw-matching JSON: {n_raw * len(TASKS) / t_raw:,.0f} sessions/s")
+    print(f"identical across worker counts: {df.equals(df_par)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+bench_hyperparameter_search.py
+
+Wall-clock time, forest fits, trees grown and chosen parameters of the
+exhaustive grouped grid search, the warm-started grid and successive halving
+over n_estimators (src/modeling/hyperparameter_search.py). All use
+LeaveOneGroupOut and F1; the warm-started grid must reproduce the exhaustive
+grid's fold scores exactly.
+
+Usage:
+    python benchmarks/bench_hyperparameter_search.py --n-jobs 4
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "modeling"))
+
+from hyperparameter_search import (  # noqa: E402
+    run_grouped_grid_search,
+    run_grouped_halving_search,
+    run_grouped_warm_start_search,
+)
+
+META_COLS = {"participantId", "task_id", "tlx", "High_Load", "pred_proba_highload"}
+
+
+def budget(name, search, n_folds):
+    """(forest fits, total trees grown) for a fitted search."""
+    trees = np.array([p["rf__n_estimators"] for p in search.cv_results_["params"]])
+    if name == "warm":
+        # One forest per config and fold, grown to the largest size
+        n_configs = len(trees) // len(np.unique(trees))
+        return n_configs * n_folds, n_configs * int(trees.max()) * n_folds
+    return len(trees) * n_folds, int(trees.sum()) * n_folds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--csv",
+        type=str,
+        default=os.path.join(HERE, "..", "results", "modeling_dataset_with_oof_probs.csv"),
+    )
+    parser.add_argument("--n-jobs", type=int, default=1)
+    parser.add_argument(
+        "--skip-grid", action="store_true", help="Skip the exhaustive GridSearchCV"
+    )
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    feature_cols = [c for c in df.columns if c not in META_COLS]
+    n_folds = df["participantId"].nunique()
+    # Folds with a single class make F1 ill-defined; sklearn warns per fold
+    warnings.filterwarnings("ignore", category=UserWarning)
+    warnings.filterwarnings("ignore", module="sklearn.metrics")
+
+    runs = [("warm", run_grouped_warm_start_search), ("halving", run_grouped_halving_search)]
+    if not args.skip_grid:
+        runs.insert(0, ("grid", run_grouped_grid_search))
+
+    rows = []
+    fitted = {}
+    for name, fn in runs:
+        t0 = time.perf_counter()
+        search = fn(df, feature_cols, n_jobs=args.n_jobs)
+        dt = time.perf_counter() - t0
+        fitted[name] = search
+        fits, trees = budget(name, search, n_folds)
+        rows.append(
+            {
+                "search": name,
+                "seconds": round(dt, 1),
+                "fits": fits,
+                "trees": trees,
+                "best_f1": round(float(search.best_score_), 4),
+                **search.best_params_,
+            }
+        )
+    print(pd.DataFrame(rows).to_string(index=False))
+
+    if "grid" in fitted:
+        grid, warm = fitted["grid"].cv_results_, fitted["warm"].cv_results_
+        assert grid["params"] == warm["params"]
+        for k in range(n_folds):
+            key = f"split{k}_test_score"
+            assert np.array_equal(grid[key], warm[key]), key
+        print("warm-started grid fold scores identical to GridSearchCV: True")
+
+
+if __name__ == "__main__":
+    main()
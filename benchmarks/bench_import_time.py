@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+bench_import_time.py
+
+Import cost of the src packages' entry points, measured with
+`python -X importtime` in fresh interpreters: total import time and which
+heavy libraries (matplotlib, seaborn, sklearn, shap, scipy, pandas) each
+statement loads. "eager utils" re-creates the old `utils/__init__.py`,
+which imported io_utils, metrics and plot_utils up front.
+
+Usage:
+    python benchmarks/bench_import_time.py --repeats 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+HEAVY = ["matplotlib", "seaborn", "sklearn", "shap", "scipy", "pandas"]
+
+CASES = [
+    ("eager utils (old __init__)", "import utils.io_utils, utils.metrics, utils.plot_utils"),
+    ("from utils import read_json", "from utils import read_json"),
+    ("from utils import save_fig", "from utils import save_fig"),
+    (
+        "inference path",
+        "from src.utils import read_json; "
+        "from src.modeling import compile_pipeline; "
+        "from src.interpretation import tree_shap_values",
+    ),
+    ("from src.interpretation import ShapService", "from src.interpretation import ShapService"),
+]
+
+
+def importtime(stmt):
+    """(total import seconds, top-level packages loaded) for `stmt` in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.join(ROOT, "src"), ROOT]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us, loaded = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Nested imports are indented under their parent; sum the top level only
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+        loaded.add(name.strip().split(".")[0])
+    return total_us / 1e6, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'statement':<44} {'import s':>9}  heavy libraries loaded")
+    for label, stmt in CASES:
+        runs = [importtime(stmt) for _ in range(args.repeats)]
+        best = min(t for t, _ in runs)
+        heavy = [h for h in HEAVY if h in runs[0][1]]
+        print(f"{label:<44} {best:>9.3f}  {', '.join(heavy) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+bench_inference_server.py
+
+Throughput vs latency of the HTTP inference server (src/inference/server.py)
+with and without micro-batching. A model is trained on synthetic data
+(generate_data.py) and compiled to .npz; for each server configuration a
+server process is started and closed-loop clients (one keep-alive
+connection each, one window per request) hammer /predict at several
+concurrency levels. Reports requests/s, p50 / p99 latency and the server's
+mean batch size. For reference it also times the status quo:
+`Pipeline.predict_proba` on one row (no explanation).
+
+Usage:
+    python benchmarks/bench_inference_server.py --concurrency 1 8 32 128 --seconds 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVER = os.path.join(HERE, "..", "src", "inference", "server.py")
+sys.path.insert(0, os.path.join(HERE, "..", "src", "modeling"))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "data_preparation"))
+
+from compute_features import REQUIRED_FEATURES  # noqa: E402
+from forest_compiler import compile_pipeline  # noqa: E402
+from generate_data import generate_dataset  # noqa: E402
+from train_louo_random_forest import DEFAULT_PARAMS, build_pipeline_from_params  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _request(reader, writer, body):
+    writer.write(
+        b"POST /predict HTTP/1.1\r\nHost: x\r\nContent-Type: application/json\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+    return json.loads(await reader.readexactly(length))
+
+
+async def _get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+    data = await reader.read()
+    writer.close()
+    return json.loads(data.split(b"\r\n\r\n", 1)[1])
+
+
+async def load(port, bodies, concurrency, seconds):
+    """Closed-loop clients; returns per-request latencies (s) and wall time."""
+    latencies = []
+    stop = time.perf_counter() + seconds
+
+    async def client(i):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        j = i
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            await _request(reader, writer, bodies[j % len(bodies)])
+            latencies.append(time.perf_counter() - t0)
+            j += concurrency
+        writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return np.array(latencies), time.perf_counter() - t0
+
+
+def start_server(model_path, port, max_batch, max_wait_ms, explain):
+    proc = subprocess.Popen(
+        [sys.executable, SERVER, "--model", model_path, "--port", str(port),
+         "--max-batch", str(max_batch), "--max-wait-ms", str(max_wait_ms), "--explain", explain],
+        stdout=subprocess.DEVNULL,
+    )
+    for _ in range(200):
+        try:
+            asyncio.run(_get(port, "/health"))
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-participants", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--explain", type=str, default="topk")
+    parser.add_argument("--max-wait-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    df = generate_dataset(args.n_participants)
+    X = df[REQUIRED_FEATURES].to_numpy(dtype=np.float64)
+    model = build_pipeline_from_params(DEFAULT_PARAMS).fit(X, df["High_Load"].to_numpy())
+    bodies = [json.dumps({"features": dict(zip(REQUIRED_FEATURES, row))}).encode() for row in X.tolist()]
+
+    t0 = time.perf_counter()
+    for row in X[:200]:
+        model.predict_proba(row[None, :])
+    t_sklearn = (time.perf_counter() - t0) / 200
+    print(
+        f"status quo, Pipeline.predict_proba on 1 row (no explanation): {1e3 * t_sklearn:.1f} ms "
+        f"-> at most {1 / t_sklearn:.0f} requests/s per process"
+    )
+
+    configs = [("unbatched", 1), ("micro-batched", 64)]
+    print(f"{'server':<14}{'clients':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'batch':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = compile_pipeline(model).save(os.path.join(tmp, "model.npz"))
+        for label, max_batch in configs:
+            port = free_port()
+            proc = start_server(model_path, port, max_batch, args.max_wait_ms, args.explain)
+            try:
+                for c in args.concurrency:
+                    before = asyncio.run(_get(port, "/stats"))
+                    lat, wall = asyncio.run(load(port, bodies, c, args.seconds))
+                    after = asyncio.run(_get(port, "/stats"))
+                    n_batches = after["batches"] - before["batches"]
+                    batch = (after["requests"] - before["requests"]) / max(n_batches, 1)
+                    p50, p99 = 1e3 * np.percentile(lat, [50, 99])
+                    print(f"{label:<14}{c:>8}{len(lat) / wall:>9.0f}{p50:>9.1f}{p99:>9.1f}{batch:>7.1f}")
+            finally:
+                proc.terminate()
+                proc.wait()
+
+
+if __name__ == "__main__":
+    main()
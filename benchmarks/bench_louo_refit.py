@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+bench_louo_refit.py
+
+Wall time of refit-per-fold LOUO (`evaluate_model.evaluate_louo_refit`),
+serial vs a process pool sharing X / y through memory-mapped .npy files.
+All runs must produce identical fold metrics and misclassifications.
+
+Usage:
+    python benchmarks/bench_louo_refit.py --n-workers 1 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "modeling"))
+
+from evaluate_model import evaluate_louo_refit  # noqa: E402
+from train_louo_random_forest import DEFAULT_PARAMS, build_pipeline_from_params  # noqa: E402
+
+META_COLS = {"participantId", "task_id", "tlx", "High_Load", "pred_proba_highload"}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--csv",
+        type=str,
+        default=os.path.join(HERE, "..", "results", "modeling_dataset_with_oof_probs.csv"),
+    )
+    parser.add_argument("--n-workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--n-estimators", type=int, default=DEFAULT_PARAMS["rf__n_estimators"])
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    feature_cols = [c for c in df.columns if c not in META_COLS]
+    params = dict(DEFAULT_PARAMS, rf__n_estimators=args.n_estimators)
+    model = build_pipeline_from_params(params)
+    print(
+        f"rows: {len(df)}  participants: {df['participantId'].nunique()}  "
+        f"trees: {args.n_estimators}  cpus: {os.cpu_count()}"
+    )
+
+    reference = None
+    base = None
+    print(f"{'workers':>8}{'seconds':>10}{'speedup':>9}  identical")
+    for n in args.n_workers:
+        t0 = time.perf_counter()
+        folds_df, summary, mis = evaluate_louo_refit(model, df, feature_cols, n_workers=n)
+        dt = time.perf_counter() - t0
+        if reference is None:
+            reference, base = (folds_df, mis), dt
+        same = folds_df.equals(reference[0]) and mis == reference[1]
+        assert same, f"n_workers={n} differs from the first run"
+        print(f"{n:>8}{dt:>10.2f}{base / dt:>9.2f}  {same}")
+    print("summary:", {k: round(v, 4) for k, v in summary.items() if k != "fold"})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+bench_mouse_kernels.py
+
+Microbenchmark for mouse_kernels on sessions with 10^5-10^6 cursor samples:
+ - legacy: `np.std([p.get("x", 0) for p in mouse_path])` as in compute_features
+ - convert: list-of-dicts -> contiguous float64 arrays (once per session)
+ - kernels: all MOUSE_KERNEL_FEATURES on the arrays
+ - python: per-point loop for speed/curvature, used as a correctness reference
+
+Null or absent x / y must convert to 0, as in compute_features.
+
+Usage:
+    python benchmarks/bench_mouse_kernels.py --sizes 100000 1000000
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "data_preparation"))
+
+from mouse_kernels import mouse_kernel_features, mouse_path_arrays  # noqa: E402
+
+
+def make_path(n, seed=2025):
+    """Random-walk cursor path of `n` {"x", "y", "t"} points."""
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.normal(0, 6, n)).round()
+    y = np.cumsum(rng.normal(0, 4, n)).round()
+    t = np.cumsum(rng.integers(1, 30, n))
+    return [{"x": int(a), "y": int(b), "t": int(c)} for a, b, c in zip(x, y, t)]
+
+
+def python_reference(points):
+    """Per-point loop computing mean speed and curvature the slow way."""
+    speeds, turn_sum, travelled = [], 0.0, 0.0
+    prev_heading, prev_step = None, 0.0
+    for a, b in zip(points, points[1:]):
+        dx, dy = b["x"] - a["x"], b["y"] - a["y"]
+        dt = max(b["t"] - a["t"], 1)
+        step = math.hypot(dx, dy)
+        speeds.append(step / dt)
+        heading = math.atan2(dy, dx)
+        if prev_heading is not None and step > 0 and prev_step > 0:
+            d = (heading - prev_heading + math.pi) % (2 * math.pi) - math.pi
+            turn_sum += abs(d)
+            travelled += step
+        prev_heading, prev_step = heading, step
+    return sum(speeds) / len(speeds), (turn_sum / travelled if travelled else 0.0)
+
+
+def best_of(fn, repeats):
+    """Best wall time (seconds) of `fn` over `repeats` runs, plus its result."""
+    best, out = float("inf"), None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    path = mouse_path_arrays([{"x": 1, "t": 0}, {"x": None, "y": 2, "t": 5}])
+    assert path.x.tolist() == [1.0, 0.0] and path.y.tolist() == [0.0, 2.0], path
+
+    print(f"{'points':>10}{'legacy ms':>12}{'convert ms':>12}{'kernels ms':>12}{'python ms':>12}")
+    for n in args.sizes:
+        points = make_path(n)
+        t_legacy, _ = best_of(lambda: np.std([p.get("x", 0) for p in points]), args.repeats)
+        t_conv, path = best_of(lambda: mouse_path_arrays(points), args.repeats)
+        t_kern, feats = best_of(lambda: mouse_kernel_features(path), args.repeats)
+        t_py, (speed_ref, curv_ref) = best_of(lambda: python_reference(points), 1)
+        assert np.isclose(feats["mouse_speed_mean"], speed_ref, rtol=1e-9)
+        assert np.isclose(feats["mouse_curvature_mean"], curv_ref, rtol=1e-9)
+        print(
+            f"{n:>10}{t_legacy * 1e3:>12.1f}{t_conv * 1e3:>12.1f}"
+            f"{t_kern * 1e3:>12.1f}{t_py * 1e3:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+bench_parallel_load.py
+
+Compare serial `load_all_raw` with the thread- and process-pool loaders on a
+synthetic corpus, and check that every mode returns identical objects in the
+same order.
+
+Usage:
+    python benchmarks/bench_parallel_load.py --n-participants 2000 --n-workers 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "data_preparation"))
+
+from load_data import load_all_raw  # noqa: E402
+from synthetic import write_corpus  # noqa: E402
+
+
+def time_call(fn, repeats=3):
+    """Return (best wall time in seconds, last result) over `repeats` runs."""
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--raw-dir", type=str, default=None, help="Existing corpus (default: synthetic)")
+    parser.add_argument("--n-participants", type=int, default=1000)
+    parser.add_argument("--n-points", type=int, default=500)
+    parser.add_argument("--n-workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = args.raw_dir
+        if raw_dir is None:
+            raw_dir = tmp
+            write_corpus(raw_dir, args.n_participants, args.n_points)
+
+        t_serial, ref = time_call(lambda: load_all_raw(raw_dir), args.repeats)
+        print(f"files: {len(ref)}  workers: {args.n_workers}")
+        print(f"{'mode':<10}{'seconds':>10}{'files/s':>12}{'speedup':>10}")
+        print(f"{'serial':<10}{t_serial:>10.3f}{len(ref) / t_serial:>12.0f}{1.0:>10.2f}")
+        for backend in ["thread", "process"]:
+            t, out = time_call(
+                lambda: load_all_raw(raw_dir, n_workers=args.n_workers, backend=backend),
+                args.repeats,
+            )
+            assert out == ref, f"{backend} loader output differs from serial"
+            print(f"{backend:<10}{t:>10.3f}{len(out) / t:>12.0f}{t_serial / t:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
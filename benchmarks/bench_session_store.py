@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+bench_session_store.py
+
+Per-session inference state for many concurrent sessions: the bounded
+struct-of-arrays store (src/inference/session_store.py) vs the usual
+dict-of-dicts (one dict per session holding the feature vector, a
+deque(maxlen=history) of probabilities and hysteresis fields). Reports
+memory for --sessions live sessions (tracemalloc), lookup and single-window
+update cost, the batched update used after a micro-batch is scored, and the
+store's insert rate when it is full and evicting LRU sessions.
+
+Usage:
+    python benchmarks/bench_session_store.py --sessions 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "inference"))
+
+from session_store import SessionStore  # noqa: E402
+
+
+def fill_dicts(ids, X, proba, history):
+    sessions = {}
+    for i, sid in enumerate(ids):
+        sessions[sid] = {
+            "features": X[i].tolist(),
+            "proba": deque([float(proba[i])], maxlen=history),
+            "top_features": [0, 1, 2],
+            "ewma": float(proba[i]),
+            "state": 0,
+            "dwell": 0,
+            "n_windows": 1,
+            "last_seen": 0.0,
+        }
+    return sessions
+
+
+def fill_store(ids, X, proba, history):
+    store = SessionStore(history=history, ttl_s=None, max_bytes=1 << 30)
+    for start in range(0, len(ids), 1024):
+        store.update_many(ids[start:start + 1024], X[start:start + 1024], proba[start:start + 1024], now=0.0)
+    return store
+
+
+def traced(fn, *args):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = fn(*args)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def per_op_ns(fn, n):
+    t0 = time.perf_counter()
+    fn()
+    return 1e9 * (time.perf_counter() - t0) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--history", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=64)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.sessions
+    ids = [f"s-{i:06d}" for i in range(n)]
+    X = rng.random((n, 16), dtype=np.float32)
+    proba = rng.random(n)
+    order = rng.integers(0, n, args.ops)
+    keys = [ids[i] for i in order]
+    x_ops, p_ops = X[order % n], proba[order]
+
+    dicts, dict_bytes = traced(fill_dicts, ids, X, proba, args.history)
+    store, store_bytes = traced(fill_store, ids, X, proba, args.history)
+    print(f"{n} live sessions, history {args.history}")
+    print(f"{'':<28}{'dict-of-dicts':>15}{'SessionStore':>15}")
+    print(f"{'memory (MB)':<28}{dict_bytes / 2**20:>15.1f}{store_bytes / 2**20:>15.1f}")
+
+    def dict_lookup():
+        for k in keys:
+            dicts[k]["ewma"]
+
+    def store_lookup():
+        for k in keys:
+            store.get(k, 1.0).ewma
+
+    def dict_update():
+        for k, x, p in zip(keys, x_ops, p_ops):
+            s = dicts[k]
+            s["features"] = x.tolist()
+            s["proba"].append(float(p))
+            s["n_windows"] += 1
+            s["last_seen"] = 2.0
+
+    def store_update():
+        for k, x, p in zip(keys, x_ops, p_ops):
+            store.update(k, x, p, now=2.0)
+
+    # Micro-batch results: unique sessions per batch, as scored together
+    n_batches = args.ops // args.batch
+    batches = [rng.choice(n, args.batch, replace=False) for _ in range(n_batches)]
+    batch_ids = [[ids[i] for i in b] for b in batches]
+
+    def dict_batch():
+        for b, bid in zip(batches, batch_ids):
+            for i, k in zip(b, bid):
+                s = dicts[k]
+                s["features"] = X[i].tolist()
+                s["proba"].append(float(proba[i]))
+                s["n_windows"] += 1
+                s["last_seen"] = 3.0
+
+    def store_batch():
+        for b, bid in zip(batches, batch_ids):
+            store.update_many(bid, X[b], proba[b], now=3.0)
+
+    n_batch_rows = n_batches * args.batch
+    rows = [
+        ("lookup (ns/op)", dict_lookup, store_lookup, args.ops),
+        ("update, 1 window (ns/op)", dict_update, store_update, args.ops),
+        (f"update, batch {args.batch} (ns/row)", dict_batch, store_batch, n_batch_rows),
+    ]
+    for label, f_dict, f_store, n_ops in rows:
+        print(f"{label:<28}{per_op_ns(f_dict, n_ops):>15.0f}{per_op_ns(f_store, n_ops):>15.0f}")
+
+    # Full store: every new session evicts the least recently used one
+    full = SessionStore(history=args.history, ttl_s=None, max_sessions=n // 2)
+    t0 = time.perf_counter()
+    for start in range(0, n, 1024):
+        full.update_many(ids[start:start + 1024], X[start:start + 1024], proba[start:start + 1024], now=0.0)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"insert with LRU eviction (capacity {n // 2}): {1e9 * elapsed / n:.0f} ns/session, "
+        f"{full.n_evicted} evicted, {full.nbytes / 2**20:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
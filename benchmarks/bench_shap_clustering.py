@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+bench_shap_clustering.py
+
+Peak RSS and wall time of `shap_clustering.py` in its default (np.load +
+KMeans + PCA) mode vs `--stream` (memmap + MiniBatchKMeans / IncrementalPCA,
+labels appended per chunk) on a large synthetic SHAP archive. Each mode runs
+in its own child process; the two label files are compared with the adjusted
+Rand index.
+
+Usage:
+    python benchmarks/bench_shap_clustering.py --n-rows 2000000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import adjusted_rand_score
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLUSTER_SCRIPT = os.path.join(HERE, "..", "src", "interpretation", "shap_clustering.py")
+
+
+def run_child(cmd):
+    """Run `cmd` and return (wall seconds, peak RSS in MiB) for that child only."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"command failed: {' '.join(cmd)}")
+    # ru_maxrss is reported in KiB on Linux
+    return wall, usage.ru_maxrss / 1024.0
+
+
+def write_archive(tmp, n_rows, n_features, seed=2025):
+    """Two well-separated SHAP regimes plus the metadata CSV, written in chunks."""
+    rng = np.random.default_rng(seed)
+    shap_path = os.path.join(tmp, "shap_values.npy")
+    arr = np.lib.format.open_memmap(shap_path, mode="w+", dtype=np.float64, shape=(n_rows, n_features))
+    centers = rng.normal(0, 0.2, (2, n_features))
+    meta_path = os.path.join(tmp, "meta.csv")
+    step = 200000
+    for start in range(0, n_rows, step):
+        stop = min(start + step, n_rows)
+        regime = rng.integers(0, 2, stop - start)
+        arr[start:stop] = centers[regime] + rng.normal(0, 0.05, (stop - start, n_features))
+        pd.DataFrame(
+            {
+                "participantId": [f"P{i // 3:07d}" for i in range(start, stop)],
+                "task_id": [f"task_{i % 3 + 1}" for i in range(start, stop)],
+                "tlx": rng.uniform(20, 90, stop - start).round(2),
+                "High_Load": regime,
+            }
+        ).to_csv(meta_path, mode="a", header=start == 0, index=False)
+    arr.flush()
+    del arr
+    features_path = os.path.join(tmp, "features.json")
+    with open(features_path, "w") as f:
+        json.dump([f"f{i}" for i in range(n_features)], f)
+    return shap_path, features_path, meta_path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-rows", type=int, default=2000000)
+    parser.add_argument("--n-features", type=int, default=16)
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shap_path, features_path, meta_path = write_archive(tmp, args.n_rows, args.n_features)
+        size_mib = os.path.getsize(shap_path) / 2**20
+        results = {}
+        for mode, extra in (("batch", []), ("stream", ["--stream", "--chunk-size", str(args.chunk_size)])):
+            outdir = os.path.join(tmp, mode)
+            cmd = [
+                sys.executable, CLUSTER_SCRIPT,
+                "--shap-values", shap_path, "--features", features_path,
+                "--csv", meta_path, "--outdir", outdir,
+            ] + extra
+            results[mode] = run_child(cmd)
+
+        batch = pd.read_csv(os.path.join(tmp, "batch", "shap_cluster_labels.csv"))
+        stream = pd.read_csv(os.path.join(tmp, "stream", "shap_cluster_labels.csv"))
+        assert len(batch) == len(stream) == args.n_rows
+        ari = adjusted_rand_score(batch["shap_cluster"], stream["shap_cluster"])
+
+        print(f"rows: {args.n_rows}  SHAP archive: {size_mib:.0f} MiB")
+        print(f"{'mode':<10}{'seconds':>10}{'peak RSS MiB':>15}")
+        for mode, (wall, rss) in results.items():
+            print(f"{mode:<10}{wall:>10.2f}{rss:>15.1f}")
+        print(f"adjusted Rand index (batch vs stream labels): {ari:.4f}")
+
+
+if __name__ == "__main__":
+    main()
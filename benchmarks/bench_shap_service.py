@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+bench_shap_service.py
+
+Per-prediction SHAP latency: the shap_analysis.py approach (build a
+TreeExplainer and transform the whole CSV per invocation) vs the long-lived
+`ShapService` (src/interpretation/shap_service.py), cold (every row a cache
+miss) and on a replayed stream where consecutive windows repeat with tiny
+jitter, as sliding windows of one session do.
+
+Usage:
+    python benchmarks/bench_shap_service.py --requests 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import shap
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "modeling"))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "interpretation"))
+
+from shap_service import ShapService, positive_class_shap  # noqa: E402
+from train_louo_random_forest import DEFAULT_PARAMS, build_pipeline_from_params  # noqa: E402
+
+META_COLS = {"participantId", "task_id", "tlx", "High_Load", "pred_proba_highload"}
+
+
+def percentiles(lat_ms):
+    p50, p99 = np.percentile(lat_ms, [50, 99])
+    return p50, p99
+
+
+def per_invocation(model, X_all, row):
+    """What shap_analysis.py does for one request."""
+    explainer = shap.TreeExplainer(model.named_steps["rf"])
+    Xt = model.named_steps["scaler"].transform(model.named_steps["imputer"].transform(X_all))
+    sv = positive_class_shap(explainer.shap_values(Xt, check_additivity=False))
+    return sv[row]
+
+
+def time_calls(fn, items):
+    lat = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        lat.append(1e3 * (time.perf_counter() - t0))
+    return np.array(lat)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--csv",
+        type=str,
+        default=os.path.join(HERE, "..", "results", "modeling_dataset_with_oof_probs.csv"),
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--baseline-requests", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=8, help="Windows per distinct state")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    df = pd.read_csv(args.csv)
+    feature_cols = [c for c in df.columns if c not in META_COLS]
+    X = df[feature_cols].values.astype(float)
+    model = build_pipeline_from_params(DEFAULT_PARAMS).fit(X, df["High_Load"].values)
+
+    rng = np.random.default_rng(2025)
+    rows = rng.integers(0, len(X), args.requests)
+
+    # Correctness: service output equals a direct TreeExplainer run
+    service = ShapService(model, cache_size=0)
+    ref = per_invocation(model, X, np.arange(len(X)))
+    assert np.allclose(service.explain(X), ref, atol=1e-12)
+
+    print(f"{'mode':<28}{'p50 ms':>9}{'p99 ms':>9}  notes")
+    lat = time_calls(lambda r: per_invocation(model, X, r), rows[: args.baseline_requests])
+    print(f"{'shap_analysis per request':<28}{percentiles(lat)[0]:>9.2f}{percentiles(lat)[1]:>9.2f}")
+
+    t0 = time.perf_counter()
+    service = ShapService(model, cache_size=0)
+    build_ms = 1e3 * (time.perf_counter() - t0)
+    lat = time_calls(lambda r: service.explain(X[r]), rows)
+    p50, p99 = percentiles(lat)
+    print(f"{'service, no cache':<28}{p50:>9.2f}{p99:>9.2f}  built once in {build_ms:.0f} ms")
+
+    # Sliding windows: each state repeats `repeat` times with ~1e-7 relative jitter
+    base = X[np.repeat(rows[: args.requests // args.repeat], args.repeat)]
+    stream = base * (1 + rng.normal(0, 1e-7, base.shape))
+    service = ShapService(model, cache_size=4096, resolution=1e-3)
+    lat = time_calls(lambda x: service.explain(x), stream)
+    p50, p99 = percentiles(lat)
+    st = service.stats()
+    print(f"{'service, LRU replay':<28}{p50:>9.2f}{p99:>9.2f}  hit rate {st['hit_rate']:.2f}")
+    err = np.abs(service.explain(stream) - ShapService(model, cache_size=0).explain(stream)).max()
+    print(f"max |cached - exact| on the replay: {err:.2e}")
+
+    for batch in (8, 64):
+        service = ShapService(model, cache_size=0)
+        chunks = [X[rows[i : i + batch]] for i in range(0, len(rows), batch)]
+        lat = time_calls(service.explain, chunks) / batch
+        p50, p99 = percentiles(lat)
+        print(f"{f'service, micro-batch {batch}':<28}{p50:>9.2f}{p99:>9.2f}  per row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+bench_shap_store.py
+
+Append-only SHAP store (src/interpretation/shap_store.py) vs the monolithic
+shap_values.npy: time to add one new session's explanations to a large
+archive (append vs rewrite the whole .npy) and time to read one
+participant's rows (memmapped slice vs np.load of everything, then mask).
+Reads are checked to be identical.
+
+Usage:
+    python benchmarks/bench_shap_store.py --n-participants 2000 --rows-per-participant 300
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "interpretation"))
+
+from shap_store import ShapStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-participants", type=int, default=2000)
+    parser.add_argument("--rows-per-participant", type=int, default=300)
+    parser.add_argument("--n-features", type=int, default=20)
+    parser.add_argument("--n-appends", type=int, default=20)
+    parser.add_argument("--n-reads", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(2025)
+    n = args.n_participants * args.rows_per_participant
+    pids = np.repeat([f"P{i:05d}" for i in range(args.n_participants)], args.rows_per_participant)
+    tasks = np.tile(
+        [f"task_{i % 3 + 1}" for i in range(args.rows_per_participant)], args.n_participants
+    )
+    values = rng.normal(size=(n, args.n_features)).astype(np.float32)
+    features = [f"f{i}" for i in range(args.n_features)]
+    # Archive of everyone but the last n_appends participants, who then
+    # arrive one session (participant) at a time
+    n_base = (args.n_participants - args.n_appends) * args.rows_per_participant
+    new = np.array_split(np.arange(n_base, n), args.n_appends)
+    print(
+        f"{n_base} archived rows x {args.n_features} features, "
+        f"then {args.n_appends} appends of {args.rows_per_participant} rows"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        npy = os.path.join(tmp, "shap_values.npy")
+        np.save(npy, values[:n_base])
+        store = ShapStore.create(os.path.join(tmp, "store"), features)
+        store.append(values[:n_base], pids[:n_base].tolist(), tasks[:n_base].tolist())
+
+        # Monolithic .npy: every new batch rewrites the whole file
+        t0 = time.perf_counter()
+        for b in new:
+            np.save(npy, np.concatenate([np.load(npy), values[b]]))
+        t_npy_write = (time.perf_counter() - t0) / args.n_appends
+
+        store = ShapStore(os.path.join(tmp, "store"))
+        t0 = time.perf_counter()
+        for b in new:
+            store.append(values[b], pids[b].tolist(), tasks[b].tolist())
+        t_store_write = (time.perf_counter() - t0) / args.n_appends
+        print(
+            f"append one session: npy rewrite {1e3 * t_npy_write:.1f} ms, "
+            f"store append {1e3 * t_store_write:.1f} ms"
+        )
+
+        targets = rng.choice(args.n_participants, args.n_reads, replace=False)
+        targets = [f"P{i:05d}" for i in targets]
+        t0 = time.perf_counter()
+        ref = [np.load(npy)[pids == p] for p in targets]
+        t_npy_read = (time.perf_counter() - t0) / args.n_reads
+
+        store = ShapStore(os.path.join(tmp, "store"))
+        store.index  # index parse is a one-off per process; time it separately
+        t0 = time.perf_counter()
+        ShapStore(os.path.join(tmp, "store")).index
+        t_index = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = [store.load(participants=[p]) for p in targets]
+        t_store_read = (time.perf_counter() - t0) / args.n_reads
+
+        same = all(np.array_equal(a, b) for a, b in zip(ref, got))
+        print(
+            f"read one participant: npy load+mask {1e3 * t_npy_read:.1f} ms, "
+            f"store slice {1e3 * t_store_read:.1f} ms "
+            f"(+ {1e3 * t_index:.0f} ms one-off index load); identical: {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
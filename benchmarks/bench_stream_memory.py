@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+bench_stream_memory.py
+
+Peak-RSS comparison of `compute_features.py` in its default (load everything)
+mode and in `--stream` mode on a large synthetic corpus. Each mode runs in its
+own child process so `ru_maxrss` reflects only that run, and the two CSVs are
+compared byte for byte.
+
+Usage:
+    python benchmarks/bench_stream_memory.py --n-participants 3000 --n-points 2000
+"""
+
+import argparse
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COMPUTE_SCRIPT = os.path.join(HERE, "..", "src", "data_preparation", "compute_features.py")
+
+from synthetic import write_corpus  # noqa: E402
+
+
+def run_child(cmd):
+    """Run `cmd` and return (wall seconds, peak RSS in MiB) for that child only."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"command failed: {' '.join(cmd)}")
+    # ru_maxrss is reported in KiB on Linux
+    return wall, usage.ru_maxrss / 1024.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--raw-dir", type=str, default=None, help="Existing corpus (default: synthetic)")
+    parser.add_argument("--n-participants", type=int, default=2000)
+    parser.add_argument("--n-points", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = args.raw_dir
+        if raw_dir is None:
+            raw_dir = os.path.join(tmp, "raw")
+            write_corpus(raw_dir, args.n_participants, args.n_points)
+
+        batch_csv = os.path.join(tmp, "batch.csv")
+        stream_csv = os.path.join(tmp, "stream.csv")
+        base = [sys.executable, COMPUTE_SCRIPT, "--raw-dir", raw_dir]
+        t_batch, rss_batch = run_child(base + ["--out-csv", batch_csv])
+        t_stream, rss_stream = run_child(
+            base + ["--out-csv", stream_csv, "--stream", "--chunk-size", str(args.chunk_size)]
+        )
+
+        identical = filecmp.cmp(batch_csv, stream_csv, shallow=False)
+        print(f"{'mode':<10}{'seconds':>10}{'peak RSS MiB':>15}")
+        print(f"{'batch':<10}{t_batch:>10.2f}{rss_batch:>15.1f}")
+        print(f"{'stream':<10}{t_stream:>10.2f}{rss_stream:>15.1f}")
+        print("byte-identical CSV:", identical)
+        if not identical:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+bench_streaming_features.py
+
+Replay synthetic sessions through StreamingFeatureEngine and report event
+throughput and per-window `features()` latency. Every session's
+end-of-session features are checked against `compute_features_from_raw`,
+with and without the session's `summary_metrics` block.
+
+Usage:
+    python benchmarks/bench_streaming_features.py --n-participants 200 --window-ms 300
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "data_preparation"))
+
+from compute_features import REQUIRED_FEATURES, compute_features_from_raw  # noqa: E402
+from streaming_features import StreamingFeatureEngine, session_to_events  # noqa: E402
+from synthetic import TASKS, make_session  # noqa: E402
+
+
+def same(a, b, rtol=1e-9):
+    if a is None or b is None:
+        return a is None and b is None
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return math.isclose(a, b, rel_tol=rtol, abs_tol=1e-12)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-participants", type=int, default=100)
+    parser.add_argument("--n-points", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--window-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(2025)
+    n_events, t_update, feat_lat = 0, 0.0, []
+    for i in range(args.n_participants):
+        for task in TASKS:
+            obj = make_session(rng, f"p-{i:05d}", task, args.n_points)
+            events = session_to_events(obj)
+            cumulative = StreamingFeatureEngine()
+            windowed = StreamingFeatureEngine(window_ms=args.window_ms)
+            t0 = time.perf_counter()
+            for j in range(0, len(events), args.batch_size):
+                batch = events[j : j + args.batch_size]
+                cumulative.update(batch)
+                windowed.update(batch)
+            t_update += time.perf_counter() - t0
+            n_events += 2 * len(events)
+            for _ in range(10):
+                t0 = time.perf_counter()
+                windowed.features()
+                feat_lat.append(time.perf_counter() - t0)
+
+            expected = compute_features_from_raw(obj)
+            got = cumulative.features()
+            bad = [k for k in REQUIRED_FEATURES if not same(expected[k], got[k])]
+            assert not bad, f"{task} session {i}: stream != batch for {bad}"
+
+            # Without summary_metrics both sides fall back to default totals
+            bare = {k: v for k, v in obj.items() if k != "summary_metrics"}
+            expected = compute_features_from_raw(bare)
+            got = StreamingFeatureEngine().update(session_to_events(bare)).features()
+            bad = [k for k in REQUIRED_FEATURES if not same(expected[k], got[k])]
+            assert not bad, f"{task} session {i} without summary_metrics: stream != batch for {bad}"
+
+    lat = np.array(feat_lat) * 1e6
+    print(
+        f"replayed {3 * args.n_participants} sessions; end-of-session features match batch "
+        "(with and without summary_metrics)"
+    )
+    print(f"update throughput: {n_events / t_update:,.0f} events/s")
+    print(f"features() latency: p50 {np.percentile(lat, 50):.1f} us, p99 {np.percentile(lat, 99):.1f} us")
+
+
+if __name__ == "__main__":
+    main()
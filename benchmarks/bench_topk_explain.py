@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+bench_topk_explain.py
+
+Accuracy/latency trade-off of the top-k early-exit explainer
+(src/interpretation/topk_explain.py) against exact TreeSHAP over all trees,
+on the DEFAULT_PARAMS forest fitted to the modeling CSV and on a
+production-size one fitted to a generated corpus. For each setting it reports
+the mean trees used per row, the median latency of batches of 1 and 64 rows
+(each repeat takes the next rows, so batch 1 covers rows that settle early
+and late), how often the top-k set equals the exact one, and how often the
+exact value lies within the reported bounds.
+
+Usage:
+    python benchmarks/bench_topk_explain.py --k 3 --batches 1 64
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "data_preparation"))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "modeling"))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "interpretation"))
+
+from compute_features import REQUIRED_FEATURES  # noqa: E402
+from forest_compiler import compile_pipeline  # noqa: E402
+from generate_data import generate_dataset  # noqa: E402
+from topk_explain import TopKExplainer  # noqa: E402
+from train_louo_random_forest import DEFAULT_PARAMS, build_pipeline_from_params  # noqa: E402
+from tree_shap import PathTables, tree_shap_values  # noqa: E402
+
+META_COLS = {"participantId", "task_id", "tlx", "High_Load", "pred_proba_highload"}
+
+# (block_trees, confidence, max_blocks)
+SETTINGS = [
+    (10, 0.80, None),
+    (10, 0.95, None),
+    (25, 0.80, None),
+    (25, 0.95, None),
+    (50, 0.95, None),
+    (25, 0.95, 2),
+]
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, 1e3 * (time.perf_counter() - t0)
+
+
+def report(forest, X, k, batch_sizes, repeats):
+    """Print the settings table for `forest` on rows X (accuracy over all of X)."""
+    rows = np.arange(len(X))[:, None]
+
+    def p50(fn):
+        fn(X[:1])  # warm-up
+        out = []
+        for b in batch_sizes:
+            reps = repeats if b == 1 else max(1, repeats // 5)
+            batches = [np.resize(np.roll(X, -r * b, axis=0), (b, X.shape[1])) for r in range(reps)]
+            out.append(np.median([timed(lambda: fn(xb))[1] for xb in batches]))
+        return out
+
+    tables = PathTables(forest)
+    exact = tree_shap_values(forest, X, tables=tables, classes=[1])[:, :, 0]
+    lat = p50(lambda xb: tree_shap_values(forest, xb, tables=tables, classes=[1]))
+    exact_top = np.argsort(-np.abs(exact), axis=1, kind="stable")[:, :k]
+    print(
+        f"k={k}  rows={len(X)}  trees={forest.n_trees}  leaves={tables.n_leaves}  "
+        f"p50 ms per batch of {batch_sizes}"
+    )
+    print(
+        f"{'block':>6}{'conf':>6}{'budget':>8}{'trees/row':>11}"
+        + "".join(f"{f'b={b} ms':>11}" for b in batch_sizes)
+        + f"{'top-k ok':>10}{'covered':>9}"
+    )
+    print(
+        f"{'exact':>6}{'':>6}{'':>8}{forest.n_trees:>11.0f}"
+        + "".join(f"{t:>11.2f}" for t in lat)
+        + f"{1.0:>10.2f}{1.0:>9.2f}"
+    )
+
+    for block_trees, confidence, max_blocks in SETTINGS:
+        explainer = TopKExplainer(forest, block_trees=block_trees)
+        kwargs = dict(k=k, confidence=confidence, max_blocks=max_blocks)
+        res = explainer.explain(X, **kwargs)
+        lat = p50(lambda xb: explainer.explain(xb, **kwargs))
+        agree = np.mean([set(a) == set(b) for a, b in zip(res.features, exact_top)])
+        err = np.abs(exact[rows, res.features] - res.values)
+        covered = np.mean(err <= res.half_width + 1e-12)
+        budget = "-" if max_blocks is None else str(max_blocks * block_trees)
+        print(
+            f"{block_trees:>6}{confidence:>6.2f}{budget:>8}{res.trees_used.mean():>11.0f}"
+            + "".join(f"{t:>11.2f}" for t in lat)
+            + f"{agree:>10.2f}{covered:>9.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--csv",
+        type=str,
+        default=os.path.join(HERE, "..", "results", "modeling_dataset_with_oof_probs.csv"),
+    )
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 64])
+    parser.add_argument("--repeats", type=int, default=40)
+    parser.add_argument("--large-participants", type=int, default=3000, help="0 skips the large forest")
+    parser.add_argument("--large-rows", type=int, default=200, help="rows scored on the large forest")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    df = pd.read_csv(args.csv)
+    feature_cols = [c for c in df.columns if c not in META_COLS]
+    X = df[feature_cols].values.astype(float)
+    forest = compile_pipeline(build_pipeline_from_params(DEFAULT_PARAMS).fit(X, df["High_Load"].values))
+    report(forest, X, args.k, args.batches, args.repeats)
+
+    if args.large_participants:
+        gen = generate_dataset(args.large_participants)
+        X = gen[REQUIRED_FEATURES].values
+        model = build_pipeline_from_params(DEFAULT_PARAMS).fit(X, gen["High_Load"].values)
+        rows = np.random.default_rng(2025).permutation(len(X))[: args.large_rows]
+        print(f"\nproduction-size forest ({len(gen)} generated sessions)")
+        report(compile_pipeline(model), X[rows], args.k, args.batches, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+bench_tree_shap.py
+
+Pure-NumPy TreeSHAP (src/interpretation/tree_shap.py) vs shap.TreeExplainer:
+agreement (must be within 1e-6), explanation time per batch, and the import
+cost each path adds to a fresh interpreter. The DEFAULT_PARAMS forest is
+timed twice: fitted on the 75-row study CSV (small trees), and fitted on a
+generated corpus (generate_data.py) so it has production-size trees, where
+p50 latency is reported for batches of 1 and 64 rows.
+
+Usage:
+    python benchmarks/bench_tree_shap.py --batch-sizes 1 16 75 --large-participants 3000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "data_preparation"))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "modeling"))
+sys.path.insert(0, os.path.join(HERE, "..", "src", "interpretation"))
+
+from compute_features import REQUIRED_FEATURES  # noqa: E402
+from forest_compiler import CompiledForest, compile_pipeline  # noqa: E402
+from train_louo_random_forest import DEFAULT_PARAMS, build_pipeline_from_params  # noqa: E402
+from generate_data import generate_dataset  # noqa: E402
+from tree_shap import PathTables, expected_value, tree_shap_values  # noqa: E402
+
+META_COLS = {"participantId", "task_id", "tlx", "High_Load", "pred_proba_highload"}
+
+
+def import_seconds(stmt):
+    """Wall time of a fresh interpreter running `stmt`, minus a bare interpreter."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path[:2]))
+
+    def run(code):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+        return time.perf_counter() - t0
+
+    return min(run(stmt) for _ in range(3)) - min(run("pass") for _ in range(3))
+
+
+def p50_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return 1e3 * float(np.median(times))
+
+
+def bench_large(shap, n_participants, batch_sizes, repeats):
+    """p50 latency on a DEFAULT_PARAMS forest fitted to a generated corpus."""
+    df = generate_dataset(n_participants)
+    X = df[REQUIRED_FEATURES].values
+    model = build_pipeline_from_params(DEFAULT_PARAMS).fit(X, df["High_Load"].values)
+    forest = compile_pipeline(model)
+    tables = PathTables(forest)
+    explainer = shap.TreeExplainer(model.named_steps["rf"])
+    print(
+        f"\nproduction-size forest ({len(df)} generated sessions): trees: {forest.n_trees}  "
+        f"leaves: {tables.n_leaves}  depth: {forest.max_depth}"
+    )
+    print(f"{'batch':>6}{'shap p50':>10}{'numpy p50':>11}{'class 1 p50':>13}{'max |diff|':>12}")
+    rng = np.random.default_rng(2025)
+    for n in batch_sizes:
+        Xt = forest.transform(X[rng.integers(0, len(X), n)])
+        ref = np.asarray(explainer.shap_values(Xt, check_additivity=False))
+        ours = tree_shap_values(forest, Xt, transformed=True, tables=tables)
+        diff = float(np.abs(ours - ref.reshape(ours.shape)).max())
+        assert diff < 1e-6, f"large forest, batch {n}: max diff {diff}"
+        reps = repeats if n == 1 else max(1, repeats // 5)
+        t_ref = p50_ms(lambda: explainer.shap_values(Xt, check_additivity=False), reps)
+        t_all = p50_ms(lambda: tree_shap_values(forest, Xt, transformed=True, tables=tables), reps)
+        t_one = p50_ms(lambda: tree_shap_values(forest, Xt, transformed=True, tables=tables, classes=[1]), reps)
+        print(f"{n:>6}{t_ref:>10.1f}{t_all:>11.1f}{t_one:>13.1f}{diff:>12.1e}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--csv",
+        type=str,
+        default=os.path.join(HERE, "..", "results", "modeling_dataset_with_oof_probs.csv"),
+    )
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 75])
+    parser.add_argument("--large-participants", type=int, default=3000, help="0 skips the large forest")
+    parser.add_argument("--large-batch-sizes", type=int, nargs="+", default=[1, 64])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    import shap
+
+    df = pd.read_csv(args.csv)
+    feature_cols = [c for c in df.columns if c not in META_COLS]
+    X = df[feature_cols].values.astype(float)
+    X[np.random.default_rng(0).random(X.shape) < 0.05] = np.nan
+    model = build_pipeline_from_params(DEFAULT_PARAMS).fit(X, df["High_Load"].values)
+
+    path = os.path.join(os.environ.get("TMPDIR", "/tmp"), "bench_tree_shap.npz")
+    forest = CompiledForest.load(compile_pipeline(model).save(path))
+    explainer = shap.TreeExplainer(model.named_steps["rf"])
+    t0 = time.perf_counter()
+    tables = PathTables(forest)
+    t_tables = 1e3 * (time.perf_counter() - t0)
+    print(
+        f"trees: {forest.n_trees}  leaves: {tables.n_leaves}  depth: {forest.max_depth}  "
+        f"path tables built once in {t_tables:.0f} ms"
+    )
+
+    print(f"{'batch':>6}{'shap ms':>10}{'numpy ms':>10}{'max |diff|':>12}")
+    rng = np.random.default_rng(2025)
+    for n in args.batch_sizes:
+        batch = X[rng.integers(0, len(X), n)]
+        Xt = forest.transform(batch)
+        t0 = time.perf_counter()
+        ref = np.asarray(explainer.shap_values(Xt, check_additivity=False))
+        t_ref = 1e3 * (time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        ours = tree_shap_values(forest, Xt, transformed=True, tables=tables)
+        t_ours = 1e3 * (time.perf_counter() - t0)
+        diff = float(np.abs(ours - ref.reshape(ours.shape)).max())
+        assert diff < 1e-6, f"batch {n}: max diff {diff}"
+        print(f"{n:>6}{t_ref:>10.1f}{t_ours:>10.1f}{diff:>12.1e}")
+
+    additivity = ours.sum(axis=1) + expected_value(forest) - model.predict_proba(batch)
+    print(f"max additivity error: {np.abs(additivity).max():.1e}")
+    print(f"import shap:      {import_seconds('import shap'):.2f} s")
+    print(f"import tree_shap: {import_seconds('import tree_shap'):.2f} s")
+
+    if args.large_participants:
+        bench_large(shap, args.large_participants, args.large_batch_sizes, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+synthetic.py
+
+Small synthetic raw-session writer shared by the benchmark scripts.
+Produces JSON objects with the same fields `compute_features_from_raw` reads
+(`mouse_path`, `field_interactions`, `idle_periods`, `component_switches`,
+`budget`, `meetings`, ...) so benchmarks can run without the study data.
+
+Usage:
+    python synthetic.py --out-dir /tmp/cogniviz_raw --n-participants 200
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+TASKS = ["task_1_form", "task_2_product", "task_3_travel"]
+
+
+def make_session(rng, pid: str, task: str, n_points: int = 500):
+    """Build one raw session object for participant `pid` and `task`.
+
+    Parameters
+    - rng: numpy.random.Generator -- source of randomness
+    - pid: str -- participant identifier
+    - task: str -- one of TASKS
+    - n_points: int -- number of mouse_path samples
+
+    Returns
+    - dict: raw session object
+    """
+    total_ms = int(rng.integers(60_000, 600_000))
+    t = np.sort(rng.integers(0, total_ms, size=n_points))
+    x = np.clip(np.cumsum(rng.normal(0, 8, size=n_points)) + 640, 0, 1280)
+    y = np.clip(np.cumsum(rng.normal(0, 6, size=n_points)) + 400, 0, 800)
+    obj = {
+        "participantId": pid,
+        "task": task,
+        "raw_tlx": round(float(rng.uniform(10, 95)), 1),
+        "summary_metrics": {
+            "total_time_ms": total_ms,
+            "error_count": int(rng.poisson(2)),
+            "success": bool(rng.random() > 0.1),
+        },
+        "mouse_path": [
+            {"x": int(a), "y": int(b), "t": int(c)} for a, b, c in zip(x, y, t)
+        ],
+        "idle_periods": [
+            {"start_ms": int(s), "duration_ms": int(d)}
+            for s, d in zip(
+                rng.integers(0, total_ms, size=8), rng.integers(500, 8000, size=8)
+            )
+        ],
+    }
+    if task == "task_1_form":
+        obj["field_interactions"] = [
+            {"field": f"field_{i}", "focus_time_ms": int(rng.integers(300, 9000))}
+            for i in range(10)
+        ]
+        obj["task_specific_metrics"] = {"zip_code_corrections": int(rng.poisson(1))}
+    elif task == "task_2_product":
+        obj["product_exploration"] = {
+            "products_viewed": [f"sku_{i}" for i in range(int(rng.integers(2, 20)))],
+            "rapid_hover_switches": int(rng.poisson(4)),
+        }
+        obj["filter_interactions"] = [
+            {"filter": "price", "value_after": int(rng.integers(0, 500))}
+        ]
+    else:
+        n_switch = int(rng.integers(5, 60))
+        obj["component_switches"] = [
+            {"from": "flights", "to": "calendar", "t": int(s)}
+            for s in rng.integers(0, total_ms, size=n_switch)
+        ]
+        obj["constraint_violations"] = [
+            {"type": "overlap", "t": int(s)}
+            for s in rng.integers(0, total_ms, size=int(rng.poisson(3)))
+        ]
+        obj["budget"] = {
+            "updates": [
+                {"t": int(s), "value": int(v)}
+                for s, v in zip(
+                    rng.integers(0, total_ms, size=12), rng.integers(500, 3000, size=12)
+                )
+            ],
+            "overrun_events": int(rng.poisson(1)),
+        }
+        obj["meetings"] = [{"id": "m1", "drag_attempts": int(rng.poisson(3))}]
+    return obj
+
+
+def write_corpus(out_dir: str, n_participants: int, n_points: int = 500, seed: int = 2025):
+    """Write `n_participants * len(TASKS)` session files under `out_dir/<pid>/`.
+
+    Returns
+    - list[str]: paths written, in sorted order
+    """
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(n_participants):
+        pid = f"p-{i:05d}"
+        pdir = os.path.join(out_dir, pid)
+        os.makedirs(pdir, exist_ok=True)
+        for task in TASKS:
+            path = os.path.join(pdir, f"{task}.json")
+            with open(path, "w") as f:
+                json.dump(make_session(rng, pid, task, n_points), f)
+            paths.append(path)
+    return sorted(paths)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out-dir", type=str, required=True)
+    parser.add_argument("--n-participants", type=int, default=100)
+    parser.add_argument("--n-points", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+    written = write_corpus(args.out_dir, args.n_participants, args.n_points, args.seed)
+    print(f"Wrote {len(written)} sessions under {args.out_dir}")
@@ -14,18 +14,48 @@ Steps:
  7. shap_clustering.py          (cluster SHAP vectors, save labels + PCA)
  8. feature_importance.py       (save RF importances + plot)
 
-This script calls the individual scripts as subprocesses to keep them isolated.
+The steps form a DAG: each declares the files it reads and writes and the
+steps it depends on. Independent branches run concurrently (up to
+--max-parallel steps at a time): baselines next to search / training, and
+SHAP (+ clustering) next to feature importances once the model exists.
+
+Every step that runs is measured: wall time, CPU time (user + system, from
+the child's rusage), peak RSS, rows of the dataset it processed and rows/s.
+The run is written to logs/run_report.json and appended to
+logs/run_history.csv, one row per step per run, and each step's wall time
+is logged next to its previous run's so slowdowns after a data refresh show
+up immediately.
+
+A step is skipped when its inputs are unchanged since its last successful
+run and its outputs still exist. The cache key hashes the step's command
+line, its script directory's source files and the contents of its input
+files (logs/run_all_state.json). A file's content hash is kept with its
+(size, mtime_ns) in logs/run_all_digests.json and only recomputed when that
+stat fingerprint changes, so an unchanged data/raw is stat()ed, not read.
+--force reruns everything.
+
+By default every step runs in its own interpreter (subprocess), as before.
+With --runner warm, pandas / sklearn / shap / matplotlib are imported once
+in this process and each step runs in a fork of it (POSIX only), so steps
+stay isolated but skip the import cost.
 
 Author: Generated for your project.
 """
 
+import argparse
+import csv
+import hashlib
+import json
+import logging
 import os
+import runpy
+import shutil
 import subprocess
-import argparse
-import datetime
-from pathlib import Path
 import sys
-import logging
+import tempfile
+import time
+import traceback
+from pathlib import Path
 
 # -------------------------
 # Defaults / paths
@@ -51,8 +81,34 @@ FI_SCRIPT = SRC_DIR / "interpretation" / "feature_importance.py"
 
 # Files
 MODELING_CSV = PROCESSED_DIR / "modeling_dataset.csv"
+FEATURE_CACHE = PROCESSED_DIR / "feature_cache.json"
 GRID_OUT = MODELS_DIR / "rf_grid_search.joblib"
 MODEL_OUT = MODELS_DIR / "tuned_random_forest_model.joblib"
+BEST_PARAMS = MODELS_DIR / "rf_best_params.json"
+STATE_FILE = LOGS_DIR / "run_all_state.json"
+DIGESTS_FILE = LOGS_DIR / "run_all_digests.json"
+REPORT_FILE = LOGS_DIR / "run_report.json"
+HISTORY_FILE = LOGS_DIR / "run_history.csv"
+HISTORY_FIELDS = [
+    "run_id", "step", "status", "runner", "wall_s", "cpu_s", "peak_rss_mb", "rows", "rows_per_s",
+]
+
+# Imported once by --runner warm before forking the steps
+WARM_IMPORTS = [
+    "numpy",
+    "pandas",
+    "scipy.stats",
+    "joblib",
+    "sklearn.ensemble",
+    "sklearn.linear_model",
+    "sklearn.model_selection",
+    "sklearn.metrics",
+    "sklearn.cluster",
+    "sklearn.decomposition",
+    "matplotlib.pyplot",
+    "seaborn",
+    "shap",
+]
 
 # -------------------------
 # Logging
@@ -70,140 +126,485 @@ console.setFormatter(formatter)
 logging.getLogger().addHandler(console)
 
 
-def run_cmd(cmd, cwd=None, env=None, fail_ok=False):
+# -------------------------
+# Steps
+# -------------------------
+class Step:
+    """One pipeline step: a script, its arguments, and what it reads / writes.
+
+    - name: step id used in logs, dependencies and the cache state
+    - script: Path of the script to run
+    - args: list of command-line arguments
+    - inputs: files / directories whose contents the step depends on
+    - outputs: files / directories it must leave behind
+    - deps: names of steps that must finish first
     """
-    Run a command (list) with subprocess.run, stream output to log and console.
-    If fail_ok is False, raises on non-zero exit.
+
+    def __init__(self, name, title, script, args, inputs=(), outputs=(), deps=()):
+        self.name = name
+        self.title = title
+        self.script = Path(script)
+        self.args = [str(a) for a in args]
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.deps = list(deps)
+
+    def cache_key(self, digests):
+        """Hash of the command line, the script directory's sources and the inputs.
+
+        - digests: FileDigests supplying each file's content hash
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps([self.script.name] + self.args).encode())
+        for path in sorted(self.script.parent.glob("*.py")) + self.inputs:
+            _hash_path(h, path, digests)
+        return h.hexdigest()
+
+    def rows_path(self):
+        """The CSV whose rows count as this step's workload: the first CSV it
+        reads, else the first it writes (generate / compute)."""
+        for p in self.inputs + self.outputs:
+            if p.suffix == ".csv":
+                return p
+        return None
+
+
+class FileDigests:
+    """Content hashes of input files, reused while a file's (size, mtime_ns) is unchanged.
+
+    Mirrors the feature cache's stat short-circuit: a file is only read when
+    its stat fingerprint differs from the one recorded with its hash. Entries
+    for files not looked up in this run are dropped on save.
     """
-    logging.info("RUN: %s", " ".join(map(str, cmd)))
+
+    def __init__(self, path=DIGESTS_FILE):
+        self.path = Path(path)
+        self.entries = {}
+        self.seen = set()
+        self.hashed = 0
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self.entries = json.load(f)
+            except ValueError:
+                logging.warning("ignoring unreadable %s", self.path)
+
+    def digest(self, f, name):
+        """SHA-256 hex digest of file `f`, recorded under `name`."""
+        st = f.stat()
+        self.seen.add(name)
+        entry = self.entries.get(name)
+        if entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["hash"]
+        h = hashlib.sha256()
+        with open(f, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                h.update(block)
+        self.hashed += 1
+        self.entries[name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": h.hexdigest()}
+        return self.entries[name]["hash"]
+
+    def save(self):
+        self.entries = {k: v for k, v in self.entries.items() if k in self.seen}
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def _hash_path(h, path, digests):
+    """Feed a file, or every file under a directory (sorted), into hash `h`."""
+    path = Path(path)
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    for f in files:
+        name = str(f.relative_to(REPO_ROOT) if f.is_relative_to(REPO_ROOT) else f)
+        h.update(name.encode())
+        if not f.exists():
+            h.update(b"<missing>")
+            continue
+        h.update(digests.digest(f, name).encode())
+
+
+def load_state():
+    if STATE_FILE.exists():
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state):
+    tmp = STATE_FILE.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_FILE)
+
+
+# -------------------------
+# Runners
+# -------------------------
+class _Running:
+    """A started step: its process and the file collecting its output."""
+
+    def __init__(self, step, log_path, key, popen=None, pid=None):
+        self.step = step
+        self.log_path = log_path
+        self.key = key
+        self.popen = popen
+        self.pid = popen.pid if popen is not None else pid
+        self.started = time.perf_counter()
+        self.wall = None
+        self.rusage = None
+
+    def poll(self):
+        """Exit code, or None while still running.
+
+        The child is reaped with wait4 (for Popen children too) so its
+        resource usage -- CPU time and peak RSS -- is captured on exit.
+        """
+        pid, status, rusage = os.wait4(self.pid, os.WNOHANG)
+        if pid == 0:
+            return None
+        self.wall = time.perf_counter() - self.started
+        self.rusage = rusage
+        code = os.waitstatus_to_exitcode(status)
+        if self.popen is not None:
+            self.popen.returncode = code
+        return code
+
+    def metrics(self):
+        """Wall / CPU seconds, peak RSS (MB), rows processed and rows per second.
+
+        In --runner warm mode the peak RSS includes the pages inherited from
+        the warm parent that the step touched.
+        """
+        ru = self.rusage
+        # ru_maxrss is in KiB on Linux, bytes on macOS
+        rss_scale = 1 / (1 << 20) if sys.platform == "darwin" else 1 / (1 << 10)
+        rows = count_rows(self.step.rows_path())
+        return {
+            "wall_s": round(self.wall, 3),
+            "cpu_s": round(ru.ru_utime + ru.ru_stime, 3),
+            "peak_rss_mb": round(ru.ru_maxrss * rss_scale, 1),
+            "rows": rows,
+            "rows_per_s": round(rows / self.wall, 1) if rows is not None and self.wall > 0 else None,
+        }
+
+
+def count_rows(path):
+    """Data rows of a CSV (lines minus the header), or None if there is none."""
+    if path is None or not Path(path).is_file():
+        return None
+    with open(path, "rb") as f:
+        lines = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+    return max(lines - 1, 0)
+
+
+def start_subprocess(step, log_path, key):
+    """Run the step in a fresh interpreter (as the pipeline always did)."""
+    log = open(log_path, "w")
+    cmd = [sys.executable, str(step.script)] + step.args
+    logging.info("RUN: %s", " ".join(cmd))
+    popen = subprocess.Popen(cmd, cwd=str(REPO_ROOT), stdout=log, stderr=subprocess.STDOUT, text=True)
+    log.close()
+    return _Running(step, log_path, key, popen=popen)
+
+
+def start_forked(step, log_path, key):
+    """Run the step's script as __main__ in a fork of this (warm) interpreter."""
+    logging.info("RUN (warm): %s %s", step.script, " ".join(step.args))
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid:
+        return _Running(step, log_path, key, pid=pid)
+    # Child: never return into the scheduler
+    code = 1
     try:
-        proc = subprocess.run(cmd, cwd=cwd or str(REPO_ROOT), env=env, check=not fail_ok, capture_output=True, text=True)
-        logging.info("Return code: %s", proc.returncode)
-        if proc.stdout:
-            logging.info("STDOUT:\n%s", proc.stdout.strip())
-        if proc.stderr:
-            logging.info("STDERR:\n%s", proc.stderr.strip())
-        return proc
-    except subprocess.CalledProcessError as e:
-        logging.error("Command failed (code %s). Stdout:\n%s\nStderr:\n%s", e.returncode, e.stdout, e.stderr)
-        if not fail_ok:
-            raise
-        return e
+        fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(fd, 1)
+        os.dup2(fd, 2)
+        logging.getLogger().handlers.clear()
+        os.chdir(REPO_ROOT)
+        # Scripts import their siblings by bare name, as when run directly
+        sys.path.insert(0, str(step.script.parent))
+        sys.argv = [str(step.script)] + step.args
+        runpy.run_path(str(step.script), run_name="__main__")
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
 
 
-def ensure_dirs():
-    for d in [DATA_DIR, RAW_MATCH_DIR, PROCESSED_DIR, MODELS_DIR, RESULTS_DIR, INTERP_RESULTS_DIR, LOGS_DIR]:
-        Path(d).mkdir(parents=True, exist_ok=True)
+def warm_up():
+    """Import the heavy libraries once so every forked step starts warm."""
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    t0 = time.perf_counter()
+    for name in WARM_IMPORTS:
+        try:
+            __import__(name)
+        except ImportError:
+            logging.info("Warm import skipped (not installed): %s", name)
+    logging.info("Warm interpreter ready in %.1f s", time.perf_counter() - t0)
 
 
-def main(args):
-    ensure_dirs()
+# -------------------------
+# DAG executor
+# -------------------------
+def run_dag(steps, max_parallel=1, runner="subprocess", force=False):
+    """Run `steps` in dependency order, concurrently where the DAG allows.
+
+    Steps whose cache key matches logs/run_all_state.json and whose outputs
+    exist are skipped. On a failure no new steps start; running ones finish,
+    then RuntimeError is raised. The run report is written either way.
+
+    Returns
+    - dict step name -> "ran" or "cached"
+    """
+    by_name = {s.name: s for s in steps}
+    for s in steps:
+        # Dependencies on steps that are not part of this run (--skip-*) are
+        # satisfied by the files already on disk
+        s.deps = [d for d in s.deps if d in by_name]
+    start = start_forked if runner == "warm" else start_subprocess
+    state = load_state()
+    digests = FileDigests()
+    status, running, failed = {}, [], []
+    records = []
+    pending = list(steps)
+    run_started = time.time()
+    t_run = time.perf_counter()
+    log_dir = Path(tempfile.mkdtemp(prefix="run_all_"))
+    try:
+        while pending or running:
+            progress = not failed
+            while progress:
+                # Cached steps finish instantly and may unblock others, so keep
+                # scheduling until nothing else can start
+                progress = False
+                for step in [s for s in pending if all(status.get(d) for d in s.deps)]:
+                    if len(running) >= max_parallel:
+                        break
+                    pending.remove(step)
+                    progress = True
+                    key = step.cache_key(digests)
+                    if not force and state.get(step.name) == key and all(p.exists() for p in step.outputs):
+                        logging.info("%s: inputs unchanged, skipping (%s)", step.title, step.name)
+                        status[step.name] = "cached"
+                        records.append({"step": step.name, "status": "cached"})
+                        continue
+                    logging.info("%s", step.title)
+                    running.append(start(step, log_dir / f"{step.name}.log", key))
+
+            if not running:
+                if pending and not failed:
+                    # Only possible with a dependency cycle
+                    raise RuntimeError(f"unsatisfiable dependencies: {[s.name for s in pending]}")
+                break
+            time.sleep(0.05)
+            for run in list(running):
+                code = run.poll()
+                if code is None:
+                    continue
+                running.remove(run)
+                output = run.log_path.read_text(errors="replace").strip()
+                metrics = run.metrics()
+                records.append({"step": run.step.name, "status": "ran" if code == 0 else "failed", **metrics})
+                if code == 0:
+                    logging.info(
+                        "%s finished in %.1f s (cpu %.1f s, peak RSS %.0f MB, %s rows) (return code 0)",
+                        run.step.name, metrics["wall_s"], metrics["cpu_s"], metrics["peak_rss_mb"],
+                        metrics["rows"] if metrics["rows"] is not None else "-",
+                    )
+                    if output:
+                        logging.info("OUTPUT (%s):\n%s", run.step.name, output)
+                    status[run.step.name] = "ran"
+                    # Inputs are hashed before the run; outputs of this step change
+                    # the keys of its dependents, not its own
+                    state[run.step.name] = run.key
+                    save_state(state)
+                else:
+                    logging.error("%s failed (code %s). Output:\n%s", run.step.name, code, output)
+                    failed.append(run.step.name)
+
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+        digests.save()
+        write_run_report(records, {
+            "run_id": time.strftime("%Y%m%dT%H%M%S", time.localtime(run_started)),
+            "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run_started)),
+            "runner": runner,
+            "max_parallel": max_parallel,
+            "force": force,
+            "wall_s": round(time.perf_counter() - t_run, 3),
+        })
+
+    if failed:
+        raise RuntimeError(f"pipeline steps failed: {', '.join(failed)}")
+    return status
+
+
+# -------------------------
+# Run report
+# -------------------------
+def read_history():
+    """Rows of logs/run_history.csv (all values as strings)."""
+    if not HISTORY_FILE.exists():
+        return []
+    with open(HISTORY_FILE, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def write_run_report(records, run):
+    """Write this run to logs/run_report.json, append it to logs/run_history.csv
+    and log each step's wall time against its previous successful run.
+
+    Parameters
+    - records: list of per-step dicts (step, status and, for steps that ran,
+      wall_s, cpu_s, peak_rss_mb, rows, rows_per_s)
+    - run: dict of run-level fields (run_id, started, runner, ...)
+    """
+    previous = {}
+    for row in read_history():
+        if row["status"] == "ran":
+            previous[row["step"]] = row
+    for rec in records:
+        prev = previous.get(rec["step"])
+        if rec["status"] != "ran" or prev is None or not float(prev["wall_s"]):
+            continue
+        change = rec["wall_s"] / float(prev["wall_s"]) - 1.0
+        logging.info(
+            "%s: %.1f s vs %.1f s on run %s (%+.0f%%)",
+            rec["step"], rec["wall_s"], float(prev["wall_s"]), prev["run_id"], 100 * change,
+        )
 
-    py = sys.executable  # use same python executable
+    tmp = REPORT_FILE.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump({**run, "steps": records}, f, indent=2)
+    os.replace(tmp, REPORT_FILE)
+
+    new_file = not HISTORY_FILE.exists()
+    with open(HISTORY_FILE, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=HISTORY_FIELDS, extrasaction="ignore")
+        if new_file:
+            writer.writeheader()
+        for rec in records:
+            writer.writerow({"run_id": run["run_id"], "runner": run["runner"], **rec})
+
+
+def build_steps(args):
+    """The pipeline DAG for the given CLI options."""
+    modeling_results = RESULTS_DIR / "modeling"
+    steps = []
 
-    # 1) Generate data (CSV + raw matching)
     if not args.skip_generate:
-        logging.info("STEP 1: Generating modeling CSV and raw-matching JSONs")
-        cmd = [
-            py,
-            str(GEN_SCRIPT),
-            "--out-csv", str(MODELING_CSV),
-            "--n-participants", str(args.n_participants),
-            "--raw-matching"
-        ]
-        run_cmd(cmd)
+        steps.append(Step(
+            "generate", "STEP 1: Generating modeling CSV and raw-matching JSONs", GEN_SCRIPT,
+            ["--out-csv", MODELING_CSV, "--n-participants", args.n_participants, "--raw-matching", "--raw-dir", RAW_MATCH_DIR],
+            outputs=[MODELING_CSV, RAW_MATCH_DIR],
+        ))
     else:
         logging.info("Skipping data generation (user requested).")
 
-    # 2) Compute features from raw (sanity check / recompute modeling CSV from raw)
     if not args.skip_compute:
-        logging.info("STEP 2: Running compute_features to regenerate modeling CSV from raw data (sanity check)")
-        cmd = [
-            py,
-            str(COMPUTE_SCRIPT),
-            "--raw-dir", str(RAW_MATCH_DIR),
-            "--out-csv", str(MODELING_CSV)
-        ]
-        run_cmd(cmd)
+        compute_args = ["--raw-dir", RAW_MATCH_DIR, "--out-csv", MODELING_CSV]
+        if args.feature_cache:
+            compute_args += ["--cache", FEATURE_CACHE]
+        steps.append(Step(
+            "compute", "STEP 2: Running compute_features to regenerate modeling CSV from raw data (sanity check)",
+            COMPUTE_SCRIPT, compute_args,
+            inputs=[RAW_MATCH_DIR], outputs=[MODELING_CSV], deps=["generate"],
+        ))
     else:
         logging.info("Skipping compute_features (user requested).")
 
-    # 3) Baselines
     if not args.skip_baselines:
-        logging.info("STEP 3: Running baselines (majority + logistic) under LOUO")
-        cmd = [
-            py,
-            str(BASELINE_SCRIPT),
-            "--csv", str(MODELING_CSV),
-            "--outdir", str(RESULTS_DIR / "modeling")
-        ]
-        run_cmd(cmd)
+        steps.append(Step(
+            "baselines", "STEP 3: Running baselines (majority + logistic) under LOUO", BASELINE_SCRIPT,
+            ["--csv", MODELING_CSV, "--outdir", modeling_results],
+            inputs=[MODELING_CSV],
+            outputs=[modeling_results / f"baseline_{m}_{kind}.csv"
+                     for m in ("majority", "logreg") for kind in ("fold_metrics", "summary")],
+            deps=["generate", "compute"],
+        ))
     else:
         logging.info("Skipping baseline evaluation.")
 
-    # 4) Hyperparameter search (optional)
+    train_args = ["--csv", MODELING_CSV, "--model-out", MODEL_OUT, "--results-outdir", modeling_results]
+    train_inputs = [MODELING_CSV]
     if args.do_search:
-        logging.info("STEP 4: Running grouped hyperparameter search (Leave-One-Group-Out)")
-        cmd = [
-            py,
-            str(HYPER_SCRIPT),
-            "--csv", str(MODELING_CSV),
-            "--out", str(GRID_OUT),
-            "--n-jobs", str(args.n_jobs)
-        ]
-        run_cmd(cmd)
+        steps.append(Step(
+            "search", "STEP 4: Running grouped hyperparameter search (Leave-One-Group-Out)", HYPER_SCRIPT,
+            ["--csv", MODELING_CSV, "--out", GRID_OUT, "--n-jobs", args.n_jobs, "--search", args.search],
+            inputs=[MODELING_CSV], outputs=[GRID_OUT, BEST_PARAMS], deps=["generate", "compute"],
+        ))
+        # Train with the params the search step saved instead of searching again
+        train_args += ["--params-json", BEST_PARAMS]
+        train_inputs.append(BEST_PARAMS)
     else:
         logging.info("Skipping hyperparameter search (user requested).")
+    if args.refit_folds:
+        train_args += ["--refit-folds", "--louo-workers", args.n_jobs]
+    steps.append(Step(
+        "train", "STEP 5: Train RandomForest and evaluate with LOUO", TRAIN_SCRIPT, train_args,
+        inputs=train_inputs,
+        outputs=[MODEL_OUT, modeling_results / "rf_summary_ultrarealistic.csv"],
+        deps=["generate", "compute", "search"],
+    ))
 
-    # 5) Train RF + LOUO evaluation
-    logging.info("STEP 5: Train RandomForest and evaluate with LOUO")
-    cmd = [
-        py,
-        str(TRAIN_SCRIPT),
-        "--csv", str(MODELING_CSV),
-        "--model-out", str(MODEL_OUT),
-        "--results-outdir", str(RESULTS_DIR / "modeling")
-    ]
-    if args.do_search:
-        cmd += ["--do-search", "--grid-out", str(GRID_OUT), "--n-jobs", str(args.n_jobs)]
-    run_cmd(cmd)
-
-    # 6) SHAP analysis
-    logging.info("STEP 6: SHAP analysis (summary bar + beeswarm)")
-    cmd = [
-        py,
-        str(SHAP_ANALYSIS),
-        "--model", str(MODEL_OUT),
-        "--csv", str(MODELING_CSV),
-        "--outdir", str(INTERP_RESULTS_DIR)
-    ]
-    run_cmd(cmd)
-
-    # 7) SHAP clustering
-    logging.info("STEP 7: SHAP clustering (k=2) + PCA plot")
-    cmd = [
-        py,
-        str(SHAP_CLUSTER),
-        "--shap-values", str(INTERP_RESULTS_DIR / "shap_values.npy"),
-        "--features", str(INTERP_RESULTS_DIR / "shap_feature_names.json"),
-        "--csv", str(MODELING_CSV),
-        "--outdir", str(INTERP_RESULTS_DIR)
-    ]
-    run_cmd(cmd)
-
-    # 8) Feature importances & plot
-    logging.info("STEP 8: Feature importances (bar plot + csv)")
-    cmd = [
-        py,
-        str(FI_SCRIPT),
-        "--model", str(MODEL_OUT),
-        "--csv", str(MODELING_CSV),
-        "--outdir", str(INTERP_RESULTS_DIR)
-    ]
-    run_cmd(cmd)
+    steps.append(Step(
+        "shap", "STEP 6: SHAP analysis (summary bar + beeswarm)", SHAP_ANALYSIS,
+        ["--model", MODEL_OUT, "--csv", MODELING_CSV, "--outdir", INTERP_RESULTS_DIR],
+        inputs=[MODEL_OUT, MODELING_CSV],
+        outputs=[INTERP_RESULTS_DIR / "shap_values.npy", INTERP_RESULTS_DIR / "shap_feature_names.json"],
+        deps=["train"],
+    ))
+    steps.append(Step(
+        "shap_clustering", "STEP 7: SHAP clustering (k=2) + PCA plot", SHAP_CLUSTER,
+        ["--shap-values", INTERP_RESULTS_DIR / "shap_values.npy",
+         "--features", INTERP_RESULTS_DIR / "shap_feature_names.json",
+         "--csv", MODELING_CSV, "--outdir", INTERP_RESULTS_DIR],
+        inputs=[INTERP_RESULTS_DIR / "shap_values.npy", MODELING_CSV],
+        outputs=[INTERP_RESULTS_DIR / "shap_cluster_labels.csv"],
+        deps=["shap"],
+    ))
+    steps.append(Step(
+        "feature_importance", "STEP 8: Feature importances (bar plot + csv)", FI_SCRIPT,
+        ["--model", MODEL_OUT, "--csv", MODELING_CSV, "--outdir", INTERP_RESULTS_DIR],
+        inputs=[MODEL_OUT, MODELING_CSV],
+        outputs=[INTERP_RESULTS_DIR / "feature_importances.csv"],
+        deps=["train"],
+    ))
+    return steps
+
+
+def ensure_dirs():
+    for d in [DATA_DIR, RAW_MATCH_DIR, PROCESSED_DIR, MODELS_DIR, RESULTS_DIR, INTERP_RESULTS_DIR, LOGS_DIR]:
+        Path(d).mkdir(parents=True, exist_ok=True)
+
+
+def main(args):
+    ensure_dirs()
+
+    runner = args.runner
+    if runner == "warm" and not hasattr(os, "fork"):
+        logging.info("--runner warm needs os.fork; falling back to subprocesses")
+        runner = "subprocess"
+    if runner == "warm":
+        warm_up()
+
+    status = run_dag(build_steps(args), max_parallel=args.max_parallel, runner=runner, force=args.force)
+    cached = [name for name, s in status.items() if s == "cached"]
+    if cached:
+        logging.info("Reused cached outputs of: %s", ", ".join(cached))
 
     logging.info("Pipeline finished successfully. Results saved under: %s", RESULTS_DIR)
     print("\nAll steps complete. Check logs at:", LOGS_DIR / "run_all.log")
+    print("Per-step timings:", REPORT_FILE, "(history:", HISTORY_FILE, ")")
     print("Key outputs:")
     print(" - Modeling CSV:", MODELING_CSV)
     print(" - Model:", MODEL_OUT)
@@ -216,10 +617,16 @@ if __name__ == "__main__":
     parser.add_argument("--n-participants", type=int, default=25, help="Number of participants to create")
     parser.add_argument("--do-search", action="store_true", help="Run grouped hyperparameter search before training")
     parser.add_argument("--n-jobs", type=int, default=1, help="Parallel jobs for grid search")
+    parser.add_argument("--search", choices=["grid", "halving", "warm"], default="grid", help="Search strategy: exhaustive grid, successive halving over n_estimators, or grid with warm-started forests")
+    parser.add_argument("--refit-folds", action="store_true", help="Refit the RF on every LOUO fold (uses --n-jobs processes)")
     parser.add_argument("--skip-generate", dest="skip_generate", action="store_true", help="Skip data generation")
     parser.add_argument("--skip-compute", dest="skip_compute", action="store_true", help="Skip feature computation step")
+    parser.add_argument("--no-feature-cache", dest="feature_cache", action="store_false", help="Recompute features for every raw file instead of reusing the content-hash cache")
     parser.add_argument("--skip-baselines", dest="skip_baselines", action="store_true", help="Skip baseline evaluation")
     parser.add_argument("--no-search", dest="do_search", action="store_false", help="Alias to skip search")
+    parser.add_argument("--max-parallel", type=int, default=3, help="Independent steps run at the same time (1 = one step at a time)")
+    parser.add_argument("--runner", choices=["subprocess", "warm"], default="subprocess", help="Fresh interpreter per step, or forks of one interpreter with pandas/sklearn/shap preloaded")
+    parser.add_argument("--force", action="store_true", help="Rerun every step even if its inputs are unchanged")
     args = parser.parse_args()
 
     try:
@@ -6,10 +6,35 @@ Provides the full experimental pipeline:
  - data_preparation  : feature engineering from raw data
  - modeling          : LOUO evaluation, baselines, hyperparameter search
  - interpretation    : SHAP, clustering, feature importance
+ - inference         : real-time predict + explain path, session replay
  - utils             : shared helpers for I/O, plotting, metrics
 
 Import examples:
     from src.utils import read_json
     from src.modeling import train_louo_random_forest
     from src.interpretation import shap_analysis
+
+Subpackages are imported on first attribute access (`src.modeling`, ...),
+and each exposes its own API lazily, so `import src` is cheap.
+
+The modules of the script packages also run as scripts. They import their
+siblings package-relatively (`from .forest_compiler import ...`) and fall
+back to the bare name only outside the package, so `src.<package>.<module>`
+is loaded once and classes such as CompiledForest are defined once.
 """
+
+import importlib
+
+_SUBPACKAGES = {"data_preparation", "modeling", "interpretation", "inference", "utils"}
+
+__all__ = sorted(_SUBPACKAGES)
+
+
+def __getattr__(name):
+    if name not in _SUBPACKAGES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f".{name}", __name__)
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBPACKAGES)
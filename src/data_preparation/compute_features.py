@@ -22,7 +22,19 @@ from typing import Any, Dict
 
 import numpy as np
 import pandas as pd
-from load_data import load_all_raw, to_dataframe  # relative import in package usage
+
+try:  # package usage (src.data_preparation.compute_features)
+    from .feature_cache import FeatureCache
+    from .load_data import iter_loaded_files, iter_raw, list_raw_files, load_all_raw, to_dataframe
+    from .mouse_kernels import MOUSE_KERNEL_FEATURES, mouse_kernel_features, mouse_path_arrays
+except ImportError:  # run as a script / imported by bare name
+    from feature_cache import FeatureCache
+    from load_data import iter_loaded_files, iter_raw, list_raw_files, load_all_raw, to_dataframe
+    from mouse_kernels import MOUSE_KERNEL_FEATURES, mouse_kernel_features, mouse_path_arrays
+
+# Bump whenever compute_features_from_raw/build_row change their output so
+# feature-cache entries written by older code are recomputed.
+FEATURE_EXTRACTOR_VERSION = "1"
 
 REQUIRED_FEATURES = [
     "form_hesitation_index",
@@ -43,12 +55,46 @@ REQUIRED_FEATURES = [
     "mouse_entropy_avg",
 ]
 
+# Event-store columns read by compute_features_from_raw (see event_store.py);
+# an empty list means only the number of events is used.
+STORE_COLUMNS = {
+    "mouse_path": ["x"],
+    "mouse_data": ["x"],
+    "field_interactions": ["focus_time_ms"],
+    "idle_periods": ["duration_ms"],
+    "filter_interactions": ["value_after"],
+    "product_exploration.products_viewed": [],
+    "component_switches": [],
+    "constraint_violations": [],
+    "budget.updates": [],
+    "meetings": ["drag_attempts"],
+}
+
 
-def compute_features_from_raw(obj: Dict[str, Any]) -> Dict[str, Any]:
+def compute_features_from_raw(
+    obj: Dict[str, Any], mouse_kinematics: bool = False
+) -> Dict[str, Any]:
     """
     Compute engineered features from a single raw JSON object.
     If `computed_metrics` exists, return that block directly (perfect reconstruction).
     Otherwise compute approximations from available fields.
+
+    With `mouse_kinematics=True` the MOUSE_KERNEL_FEATURES (cursor entropy,
+    speed, acceleration, curvature) are added, computed from the same arrays
+    used for `mouse_entropy_avg`.
+    """
+    cm, path = _task_features(obj, mouse_kinematics)
+    if mouse_kinematics:
+        cm.update(mouse_kernel_features(path))
+    return cm
+
+
+def _task_features(obj: Dict[str, Any], mouse_kinematics: bool = False):
+    """Per-task feature heuristics; returns (features, MousePath of the session).
+
+    Sessions with `computed_metrics` (and the unknown-task fallback) need no
+    cursor arrays for their features, so their MousePath is only built with
+    `mouse_kinematics`; otherwise it is None.
     """
     if "computed_metrics" in obj and obj["computed_metrics"] is not None:
         # Use copy to avoid mutation issues
@@ -57,7 +103,8 @@ def compute_features_from_raw(obj: Dict[str, Any]) -> Dict[str, Any]:
         for k in REQUIRED_FEATURES:
             if k not in cm:
                 cm[k] = None
-        return cm
+        path = mouse_path_arrays(obj.get("mouse_path") or obj.get("mouse_data")) if mouse_kinematics else None
+        return cm, path
 
     task = obj.get("task") or obj.get("task_id")
     cm = {k: None for k in REQUIRED_FEATURES}
@@ -81,13 +128,11 @@ def compute_features_from_raw(obj: Dict[str, Any]) -> Dict[str, Any]:
             obj.get("task_specific_metrics", {}).get("zip_code_corrections", 0)
         )
         # action density & mouse entropy
-        mouse_path = obj.get("mouse_path") or obj.get("mouse_data") or []
-        cm["action_density"] = float(len(mouse_path)) / max(
+        path = mouse_path_arrays(obj.get("mouse_path") or obj.get("mouse_data"))
+        cm["action_density"] = float(path.n) / max(
             1, (obj.get("summary_metrics", {}).get("total_time_ms", 1000))
         )
-        cm["mouse_entropy_avg"] = float(
-            np.std([p.get("x", 0) for p in mouse_path]) + 1e-6
-        )
+        cm["mouse_entropy_avg"] = float(np.std(path.x) + 1e-6)
         # fill other defaults
         cm["filter_optimization_score"] = None
         cm["decision_uncertainty"] = None
@@ -103,7 +148,7 @@ def compute_features_from_raw(obj: Dict[str, Any]) -> Dict[str, Any]:
         cm["idle_time_ratio"] = float(
             sum([p.get("duration_ms", 0) for p in (obj.get("idle_periods") or [])])
         ) / max(1, obj.get("summary_metrics", {}).get("total_time_ms", 1))
-        return cm
+        return cm, path
 
     # Task 2: product metrics
     if task and "product" in task:
@@ -127,11 +172,9 @@ def compute_features_from_raw(obj: Dict[str, Any]) -> Dict[str, Any]:
             and 0.02
             or 0.0
         )
-        mouse_path = obj.get("mouse_path") or []
-        cm["mouse_entropy_avg"] = float(
-            np.std([p.get("x", 0) for p in mouse_path]) + 1e-6
-        )
-        cm["action_density"] = float(len(mouse_path)) / max(
+        path = mouse_path_arrays(obj.get("mouse_path"))
+        cm["mouse_entropy_avg"] = float(np.std(path.x) + 1e-6)
+        cm["action_density"] = float(path.n) / max(
             1, obj.get("summary_metrics", {}).get("total_time_ms", 1)
         )
         # default others
@@ -158,7 +201,7 @@ def compute_features_from_raw(obj: Dict[str, Any]) -> Dict[str, Any]:
         cm["idle_time_ratio"] = float(
             sum([p.get("duration_ms", 0) for p in (obj.get("idle_periods") or [])])
         ) / max(1, obj.get("summary_metrics", {}).get("total_time_ms", 1))
-        return cm
+        return cm, path
 
     # Task 3: travel metrics
     if task and "travel" in task:
@@ -177,12 +220,11 @@ def compute_features_from_raw(obj: Dict[str, Any]) -> Dict[str, Any]:
             if "computed_metrics" in obj
             else 0.05
         )
-        cm["action_density"] = float(len(obj.get("mouse_path", []))) / max(
+        path = mouse_path_arrays(obj.get("mouse_path", []))
+        cm["action_density"] = float(path.n) / max(
             1, obj.get("summary_metrics", {}).get("total_time_ms", 1)
         )
-        cm["mouse_entropy_avg"] = float(
-            np.std([p.get("x", 0) for p in obj.get("mouse_path", [])]) + 1e-6
-        )
+        cm["mouse_entropy_avg"] = float(np.std(path.x) + 1e-6)
         cm["idle_time_ratio"] = float(
             sum([p.get("duration_ms", 0) for p in obj.get("idle_periods", [])])
         ) / max(1, obj.get("summary_metrics", {}).get("total_time_ms", 1))
@@ -203,46 +245,121 @@ def compute_features_from_raw(obj: Dict[str, Any]) -> Dict[str, Any]:
             else 0.0
         )
         cm["planning_time_ratio"] = 0.0
-        return cm
+        return cm, path
 
     # fallback - empty defaults
-    return {k: None for k in REQUIRED_FEATURES}
+    path = mouse_path_arrays(obj.get("mouse_path")) if mouse_kinematics else None
+    return {k: None for k in REQUIRED_FEATURES}, path
+
 
+def build_row(obj: Dict[str, Any], mouse_kinematics: bool = False):
+    """Turn one raw object into a modeling-dataset row (or None for TLX-only files).
 
-def build_modeling_dataframe(raw_dir: str):
+    Parameters
+    - obj: dict -- parsed raw JSON object
+    - mouse_kinematics: bool -- append MOUSE_KERNEL_FEATURES columns
+
+    Returns
+    - dict or None: participantId, task_id, tlx, High_Load and REQUIRED_FEATURES
+    """
+    # Skip TLX-only files in this pass
+    if (obj.get("task") or "").lower().find("tlx") != -1:
+        return None
+    pid = obj.get("participantId")
+    task = obj.get("task") or obj.get("task_id")
+    tlx = obj.get("raw_tlx") or (
+        obj.get("tlx_scores") and obj["tlx_scores"].get("raw_tlx")
+    )
+    feats = compute_features_from_raw(obj, mouse_kinematics=mouse_kinematics)
+    row = {
+        "participantId": pid,
+        "task_id": task,
+        "tlx": (
+            float(tlx)
+            if tlx is not None
+            else (feats.get("raw_tlx") if "raw_tlx" in feats else None)
+        ),
+        "High_Load": int((float(tlx) if tlx is not None else 0) > 60),
+    }
+    for k in REQUIRED_FEATURES:
+        row[k] = feats.get(k)
+    if mouse_kinematics:
+        for k in MOUSE_KERNEL_FEATURES:
+            row[k] = feats.get(k)
+    return row
+
+
+def iter_modeling_rows(
+    raw_dir: str,
+    n_workers: int = 1,
+    backend: str = "thread",
+    cache: FeatureCache = None,
+    mouse_kinematics: bool = False,
+):
+    """Yield modeling rows while holding at most a pool window of raw objects.
+
+    Each raw object (including its `mouse_path`) is dropped as soon as its
+    row has been computed. With a `FeatureCache`, files whose content hash and
+    extractor version match a cached entry are not parsed at all; only the
+    remaining files go through the loader and are then stored in the cache.
+    """
+    if cache is None:
+        for obj in iter_raw(raw_dir, n_workers=n_workers, backend=backend):
+            row = build_row(obj, mouse_kinematics)
+            if row is not None:
+                yield row
+        return
+
+    plan = []
+    for p in list_raw_files(raw_dir):
+        key = os.path.relpath(p, raw_dir)
+        hit, row, digest = cache.lookup(key, p)
+        plan.append((p, key, hit, row, digest))
+    misses = [p for p, _, hit, _, _ in plan if not hit]
+    loaded = iter_loaded_files(misses, n_workers=n_workers, backend=backend)
+    for p, key, hit, row, digest in plan:
+        if not hit:
+            _, obj, err = next(loaded)
+            if err is not None:
+                # Not cached, so the file is retried on the next run
+                print(f"Warning: failed reading {p}: {err}")
+                continue
+            row = build_row(obj, mouse_kinematics)
+            cache.store(key, p, row, digest)
+        if row is not None:
+            yield dict(row)
+
+
+def build_modeling_dataframe(
+    raw_dir: str,
+    n_workers: int = 1,
+    backend: str = "thread",
+    cache: FeatureCache = None,
+    mouse_kinematics: bool = False,
+):
     """Build the modeling DataFrame by computing features for all raw objects.
 
     Parameters
     - raw_dir: str -- directory with raw JSON files
+    - n_workers: int -- parallel JSON parsers passed to `load_all_raw` (1 = serial)
+    - backend: str -- "thread" or "process" pool for parsing
+    - cache: FeatureCache or None -- reuse rows of unchanged files (caller saves it)
+    - mouse_kinematics: bool -- append MOUSE_KERNEL_FEATURES columns
 
     Returns
     - pandas.DataFrame: modeling dataset with engineered features and metadata
     """
-    raw_objects = load_all_raw(raw_dir)
-    rows = []
-    for obj in raw_objects:
-        # Skip TLX-only files in this pass
-        if (obj.get("task") or "").lower().find("tlx") != -1:
-            continue
-        pid = obj.get("participantId")
-        task = obj.get("task") or obj.get("task_id")
-        tlx = obj.get("raw_tlx") or (
-            obj.get("tlx_scores") and obj["tlx_scores"].get("raw_tlx")
+    if cache is not None:
+        rows = list(
+            iter_modeling_rows(raw_dir, n_workers, backend, cache, mouse_kinematics)
         )
-        feats = compute_features_from_raw(obj)
-        row = {
-            "participantId": pid,
-            "task_id": task,
-            "tlx": (
-                float(tlx)
-                if tlx is not None
-                else (feats.get("raw_tlx") if "raw_tlx" in feats else None)
-            ),
-            "High_Load": int((float(tlx) if tlx is not None else 0) > 60),
-        }
-        for k in REQUIRED_FEATURES:
-            row[k] = feats.get(k)
-        rows.append(row)
+    else:
+        raw_objects = load_all_raw(raw_dir, n_workers=n_workers, backend=backend)
+        rows = []
+        for obj in raw_objects:
+            row = build_row(obj, mouse_kinematics)
+            if row is not None:
+                rows.append(row)
     df = pd.DataFrame(rows)
     # Some basic cleaning/sanity
     # Convert empty strings and np.nan appropriately
@@ -252,6 +369,181 @@ def build_modeling_dataframe(raw_dir: str):
     return df
 
 
+def build_modeling_dataframe_from_store(store_dir: str, mouse_kinematics: bool = False):
+    """Build the modeling DataFrame from a columnar event store (event_store.py).
+
+    Only the STORE_COLUMNS needed by the extractor are read from Parquet; with
+    `mouse_kinematics` the cursor `y`/`t` columns are read as well.
+    """
+    try:  # needs pyarrow
+        from .event_store import iter_store_sessions
+    except ImportError:
+        from event_store import iter_store_sessions
+
+    columns = {k: list(v) for k, v in STORE_COLUMNS.items()}
+    if mouse_kinematics:
+        for name in ("mouse_path", "mouse_data"):
+            columns[name] += ["y", "t", "timestamp"]
+    rows = []
+    for obj in iter_store_sessions(store_dir, columns=columns):
+        row = build_row(obj, mouse_kinematics)
+        if row is not None:
+            rows.append(row)
+    df = pd.DataFrame(rows)
+    for c in REQUIRED_FEATURES:
+        if c not in df.columns:
+            df[c] = None
+    return df
+
+
+# ------------------------------------------------------------------
+# Streaming writer
+# ------------------------------------------------------------------
+
+
+def _value_kind(v):
+    """Classify a cell the way pandas' list-of-dicts constructor does."""
+    if v is None:
+        return "none"
+    if isinstance(v, (bool, np.bool_)):
+        return "other"
+    if isinstance(v, (int, np.integer)):
+        return "int"
+    if isinstance(v, (float, np.floating)):
+        return "float"
+    return "other"
+
+
+def _resolve_dtypes(kinds: Dict[str, set]) -> Dict[str, str]:
+    """Map observed value kinds per column to the dtype `pd.DataFrame(rows)` infers."""
+    dtypes = {}
+    for col, seen in kinds.items():
+        numeric = seen & {"int", "float"}
+        if not numeric or "other" in seen:
+            dtypes[col] = "object"
+        elif seen == {"int"}:
+            dtypes[col] = "int64"
+        else:
+            dtypes[col] = "float64"
+    return dtypes
+
+
+def _chunk_frame(rows, columns, dtypes) -> pd.DataFrame:
+    """Build one chunk with the corpus-wide dtypes so chunks render identically."""
+    df = pd.DataFrame(rows, columns=columns, dtype=object)
+    for c in columns:
+        if dtypes[c] != "object":
+            df[c] = df[c].astype(dtypes[c])
+    return df
+
+
+def write_modeling_dataset_stream(
+    raw_dir: str,
+    out_csv: str = None,
+    out_parquet: str = None,
+    chunk_size: int = 1000,
+    n_workers: int = 1,
+    backend: str = "thread",
+    cache: FeatureCache = None,
+    mouse_kinematics: bool = False,
+):
+    """Stream raw JSON -> features -> chunked CSV/Parquet with bounded memory.
+
+    Pass 1 computes rows and spools them to a temporary pickle file in chunks
+    while recording which value kinds occur in each column. Pass 2 replays the
+    spool one chunk at a time with the corpus-wide dtypes, so the CSV is
+    byte-identical to `build_modeling_dataframe(raw_dir).to_csv(index=False)`.
+
+    Parameters
+    - raw_dir: str -- directory with raw JSON files
+    - out_csv: str or None -- CSV output path
+    - out_parquet: str or None -- Parquet output path (requires pyarrow)
+    - chunk_size: int -- rows held in memory at once
+    - n_workers, backend: passed to `iter_raw`
+    - cache: FeatureCache or None -- reuse rows of unchanged files (caller saves it)
+    - mouse_kinematics: bool -- append MOUSE_KERNEL_FEATURES columns
+
+    Returns
+    - int: number of rows written
+    """
+    import pickle
+    import tempfile
+
+    writer = None
+    if out_parquet:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from e
+
+    columns = None
+    kinds: Dict[str, set] = {}
+    n_rows = 0
+    n_chunks = 0
+    with tempfile.TemporaryFile() as spool:
+        chunk = []
+        for row in iter_modeling_rows(raw_dir, n_workers, backend, cache, mouse_kinematics):
+            if columns is None:
+                columns = list(row.keys())
+                kinds = {c: set() for c in columns}
+            for c in columns:
+                kinds[c].add(_value_kind(row.get(c)))
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                pickle.dump(chunk, spool, protocol=pickle.HIGHEST_PROTOCOL)
+                n_rows += len(chunk)
+                n_chunks += 1
+                chunk = []
+        if chunk:
+            pickle.dump(chunk, spool, protocol=pickle.HIGHEST_PROTOCOL)
+            n_rows += len(chunk)
+            n_chunks += 1
+        del chunk
+
+        if columns is None:
+            # Mirror build_modeling_dataframe on an empty corpus
+            empty = pd.DataFrame(columns=REQUIRED_FEATURES)
+            if out_csv:
+                empty.to_csv(out_csv, index=False)
+            if out_parquet:
+                empty.to_parquet(out_parquet, index=False)
+            return 0
+
+        dtypes = _resolve_dtypes(kinds)
+        spool.seek(0)
+        csv_fh = open(out_csv, "w", newline="") if out_csv else None
+        try:
+            for i in range(n_chunks):
+                df = _chunk_frame(pickle.load(spool), columns, dtypes)
+                if csv_fh is not None:
+                    df.to_csv(csv_fh, index=False, header=(i == 0))
+                if out_parquet:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(out_parquet, table.schema)
+                    else:
+                        table = table.cast(writer.schema)
+                    writer.write_table(table)
+        finally:
+            if csv_fh is not None:
+                csv_fh.close()
+            if writer is not None:
+                writer.close()
+    return n_rows
+
+
+def save_cache_report(cache: FeatureCache = None):
+    """Persist the feature cache (evicting removed files) and print hit statistics."""
+    if cache is None:
+        return
+    evicted = cache.save()
+    print(
+        f"Feature cache: {cache.hits} reused, {cache.misses} recomputed, "
+        f"{evicted} evicted ({cache.path})"
+    )
+
+
 def main():
     """CLI entrypoint to build and save the modeling dataset CSV.
 
@@ -271,14 +563,95 @@ def main():
         default="../../data/processed/modeling_dataset.csv",
         help="Output CSV path",
     )
+    parser.add_argument(
+        "--n-workers", type=int, default=1, help="Parallel JSON parsers (1 = serial)"
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="thread",
+        choices=["thread", "process"],
+        help="Pool type used when --n-workers > 1",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream raw files -> rows -> chunked output instead of loading all raw objects",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=1000, help="Rows per chunk in --stream mode"
+    )
+    parser.add_argument(
+        "--out-parquet",
+        type=str,
+        default=None,
+        help="Also write a Parquet copy of the dataset (--stream mode, needs pyarrow)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="Feature cache JSON; only new or changed raw files are recomputed",
+    )
+    parser.add_argument(
+        "--mouse-kinematics",
+        action="store_true",
+        help="Add vectorized cursor entropy/speed/acceleration/curvature columns",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="Read sessions from a columnar event store (event_store.py) instead of --raw-dir",
+    )
     args = parser.parse_args()
 
     raw_dir = os.path.abspath(args.raw_dir)
     out_csv = os.path.abspath(args.out_csv)
     Path(os.path.dirname(out_csv)).mkdir(parents=True, exist_ok=True)
 
+    if args.store:
+        store_dir = os.path.abspath(args.store)
+        print("Loading sessions from event store:", store_dir)
+        df = build_modeling_dataframe_from_store(store_dir, args.mouse_kinematics)
+        df.to_csv(out_csv, index=False)
+        print("Saved processed modeling CSV to:", out_csv)
+        print("Rows:", len(df))
+        return
+
     print("Loading raw files from:", raw_dir)
-    df = build_modeling_dataframe(raw_dir)
+    cache = None
+    if args.cache:
+        version = FEATURE_EXTRACTOR_VERSION + ("+kinematics" if args.mouse_kinematics else "")
+        cache = FeatureCache(os.path.abspath(args.cache), version)
+
+    if args.stream:
+        out_parquet = os.path.abspath(args.out_parquet) if args.out_parquet else None
+        n_rows = write_modeling_dataset_stream(
+            raw_dir,
+            out_csv=out_csv,
+            out_parquet=out_parquet,
+            chunk_size=args.chunk_size,
+            n_workers=args.n_workers,
+            backend=args.backend,
+            cache=cache,
+            mouse_kinematics=args.mouse_kinematics,
+        )
+        save_cache_report(cache)
+        print("Saved processed modeling CSV to:", out_csv)
+        if out_parquet:
+            print("Saved processed modeling Parquet to:", out_parquet)
+        print("Rows:", n_rows)
+        return
+
+    df = build_modeling_dataframe(
+        raw_dir,
+        n_workers=args.n_workers,
+        backend=args.backend,
+        cache=cache,
+        mouse_kinematics=args.mouse_kinematics,
+    )
+    save_cache_report(cache)
     # If tlx missing, try to fetch from TLX folder
     # Basic fix: if idx missing tlx but nasa_tlx folder has values, join - left as exercise
     df.to_csv(out_csv, index=False)
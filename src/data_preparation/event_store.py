@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+event_store.py
+
+Columnar (Parquet) event store for raw telemetry.
+
+`ingest_raw` converts the per-session JSON files under `data/raw` into one
+Parquet dataset per event type, hive-partitioned by participant and task:
+
+    <store>/sessions/participantId=p-0001/task=task_3_travel/part-0-0.parquet
+    <store>/mouse_path/participantId=p-0001/task=task_3_travel/part-0-0.parquet
+    <store>/field_interactions/...
+    <store>/budget.updates/...
+    <store>/manifest.json
+
+Every list-valued field of a session (top level, or one level down such as
+`budget.updates`) becomes an event table with one row per element plus
+`_session` (source file relative to the raw dir) and `_seq` (position in the
+list). Scalar fields go to the `sessions` table, with nested dicts flattened
+to dotted column names (`summary_metrics.total_time_ms`).
+
+`load_event_table` reads a table with column projection and partition
+filters; `iter_store_sessions` rebuilds session objects that
+`compute_features_from_raw` accepts while reading only the requested columns.
+
+Usage:
+    python event_store.py --raw-dir ../../data/raw --store ../../data/events
+"""
+
+import argparse
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+try:  # package usage (src.data_preparation.event_store)
+    from .load_data import iter_raw
+except ImportError:  # run as a script / imported by bare name
+    from load_data import iter_raw
+
+STORE_FORMAT = 1
+SESSIONS_TABLE = "sessions"
+PARTITION_COLUMNS = ["participantId", "task"]
+PARTITIONING = ds.partitioning(
+    pa.schema([("participantId", pa.string()), ("task", pa.string())]), flavor="hive"
+)
+
+# Tables returned as {column: ndarray} instead of lists of dicts when sessions
+# are rebuilt; these are the high-volume streams.
+ARRAY_TABLES = ("mouse_path",)
+
+# Manifest type names of text columns (pyarrow aliases)
+STRING_TYPES = ("string", "large_string", "utf8", "large_utf8")
+
+
+# ------------------------------------------------------------------
+# Ingestion
+# ------------------------------------------------------------------
+
+
+def _is_missing(v) -> bool:
+    return v is None or (isinstance(v, float) and np.isnan(v))
+
+
+def split_session(obj: Dict[str, Any], session_id: str):
+    """Split one raw object into a flat scalar record and per-table event rows.
+
+    Returns
+    - (scalars, events): `scalars` is a flat dict for the sessions table and
+      `events` maps table name -> list of row dicts
+    """
+    pid = obj.get("participantId")
+    task = obj.get("task") or obj.get("task_id")
+    keys = {"participantId": pid, "task": task, "_session": session_id}
+    scalars = dict(keys)
+    events: Dict[str, List[Dict[str, Any]]] = {}
+
+    def add_events(name, items):
+        rows = events.setdefault(name, [])
+        for i, item in enumerate(items):
+            row = dict(item) if isinstance(item, dict) else {"value": item}
+            row.update(keys)
+            row["_seq"] = i
+            rows.append(row)
+
+    for k, v in obj.items():
+        if k in ("participantId", "task", "task_id"):
+            continue
+        if isinstance(v, list):
+            add_events(k, v)
+        elif isinstance(v, dict):
+            for k2, v2 in v.items():
+                if isinstance(v2, list):
+                    add_events(f"{k}.{k2}", v2)
+                else:
+                    scalars[f"{k}.{k2}"] = v2
+        else:
+            scalars[k] = v
+    return scalars, events
+
+
+def _arrow_table(rows: List[Dict[str, Any]]) -> pa.Table:
+    """Rows -> Arrow table with stable column types (int64/double/bool/string)."""
+    df = pd.DataFrame(rows)
+    for c in df.columns:
+        if c in PARTITION_COLUMNS or c == "_session":
+            df[c] = df[c].astype(object).where(df[c].notna(), None)
+            continue
+        if df[c].dtype == object:
+            present = [v for v in df[c] if not _is_missing(v)]
+            if present and all(isinstance(v, bool) for v in present):
+                # bool + None stays a nullable bool column
+                df[c] = df[c].where(df[c].notna(), None)
+            else:
+                # Nested values or mixed types are kept as JSON/text
+                df[c] = [
+                    None
+                    if _is_missing(v)
+                    else (v if isinstance(v, str) else json.dumps(v))
+                    for v in df[c]
+                ]
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _unify_type(a: Optional[str], b: str) -> str:
+    """Widen two manifest type names to one that can hold both."""
+    if a is None or a == b:
+        return b
+    # pandas 3 hands text columns to Arrow as large_string
+    if a in STRING_TYPES or b in STRING_TYPES:
+        return "string"
+    if "null" in (a, b):
+        return b if a == "null" else a
+    return "double"
+
+
+def _write_chunk(store_dir: str, tables: Dict[str, List[Dict]], chunk_idx: int, manifest):
+    """Write one chunk of sessions to every table and widen manifest types."""
+    for name, rows in tables.items():
+        if not rows:
+            continue
+        table = _arrow_table(rows)
+        cols = manifest["tables"].setdefault(name, {})
+        for field in table.schema:
+            if field.name in PARTITION_COLUMNS:
+                continue
+            cols[field.name] = _unify_type(cols.get(field.name), str(field.type))
+        ds.write_dataset(
+            table,
+            base_dir=os.path.join(store_dir, name),
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"part-{chunk_idx}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+
+def ingest_raw(
+    raw_dir: str,
+    store_dir: str,
+    chunk_sessions: int = 500,
+    overwrite: bool = False,
+    n_workers: int = 1,
+    backend: str = "thread",
+) -> Dict[str, Any]:
+    """Convert every raw JSON file under `raw_dir` into the columnar store.
+
+    Parameters
+    - raw_dir: str -- root directory with raw session JSON files
+    - store_dir: str -- output directory (must be empty unless `overwrite`)
+    - chunk_sessions: int -- sessions buffered before each Parquet write
+    - overwrite: bool -- delete an existing store first
+    - n_workers, backend: passed to `iter_raw`
+
+    Returns
+    - dict: the manifest written to `<store_dir>/manifest.json`
+    """
+    if os.path.isdir(store_dir) and os.listdir(store_dir):
+        if not overwrite:
+            raise FileExistsError(f"{store_dir} is not empty (pass overwrite=True)")
+        shutil.rmtree(store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+
+    manifest = {"format": STORE_FORMAT, "n_sessions": 0, "tables": {}}
+    buffered: Dict[str, List[Dict]] = {}
+    n_buffered = 0
+    chunk_idx = 0
+    for obj in iter_raw(raw_dir, n_workers=n_workers, backend=backend):
+        session_id = os.path.relpath(obj.pop("_source_file"), raw_dir)
+        scalars, events = split_session(obj, session_id)
+        buffered.setdefault(SESSIONS_TABLE, []).append(scalars)
+        for name, rows in events.items():
+            buffered.setdefault(name, []).extend(rows)
+        n_buffered += 1
+        if n_buffered >= chunk_sessions:
+            _write_chunk(store_dir, buffered, chunk_idx, manifest)
+            manifest["n_sessions"] += n_buffered
+            buffered, n_buffered = {}, 0
+            chunk_idx += 1
+    if n_buffered:
+        _write_chunk(store_dir, buffered, chunk_idx, manifest)
+        manifest["n_sessions"] += n_buffered
+
+    with open(os.path.join(store_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# ------------------------------------------------------------------
+# Loading
+# ------------------------------------------------------------------
+
+
+def read_manifest(store_dir: str) -> Dict[str, Any]:
+    """Load `<store_dir>/manifest.json`."""
+    with open(os.path.join(store_dir, "manifest.json"), "r") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != STORE_FORMAT:
+        raise ValueError(f"unsupported event store format in {store_dir}")
+    return manifest
+
+
+def open_table(store_dir: str, name: str, manifest: Dict[str, Any] = None) -> ds.Dataset:
+    """Open one event table as a pyarrow Dataset with the manifest's unified schema."""
+    manifest = manifest or read_manifest(store_dir)
+    if name not in manifest["tables"]:
+        raise KeyError(f"no table {name!r} in {store_dir}")
+    fields = [pa.field(c, pa.type_for_alias(t)) for c, t in manifest["tables"][name].items()]
+    fields += [pa.field(c, pa.string()) for c in PARTITION_COLUMNS]
+    return ds.dataset(
+        os.path.join(store_dir, name),
+        format="parquet",
+        partitioning=PARTITIONING,
+        schema=pa.schema(fields),
+    )
+
+
+def _partition_filter(participants=None, tasks=None):
+    expr = None
+    if participants is not None:
+        expr = ds.field("participantId").isin(list(participants))
+    if tasks is not None:
+        e = ds.field("task").isin(list(tasks))
+        expr = e if expr is None else expr & e
+    return expr
+
+
+def load_event_table(
+    store_dir: str,
+    name: str,
+    columns: Optional[List[str]] = None,
+    participants: Optional[Iterable[str]] = None,
+    tasks: Optional[Iterable[str]] = None,
+    manifest: Dict[str, Any] = None,
+) -> pa.Table:
+    """Read one table, projecting `columns` and pruning partitions.
+
+    Parameters
+    - store_dir: str -- event store root
+    - name: str -- table name, e.g. "mouse_path" or "budget.updates"
+    - columns: list[str] or None -- columns to read (None = all); columns the
+      table never had are ignored
+    - participants, tasks: iterables or None -- partition filters
+
+    Returns
+    - pyarrow.Table
+    """
+    dataset = open_table(store_dir, name, manifest)
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    return dataset.to_table(columns=columns, filter=_partition_filter(participants, tasks))
+
+
+def _session_slices(table: pa.Table):
+    """Sort a table by (_session, _seq) and map session id -> (start, stop)."""
+    table = table.sort_by([("_session", "ascending"), ("_seq", "ascending")])
+    if table.num_rows == 0:
+        return table, {}
+    # Dictionary-encode so run boundaries are found on integer codes
+    encoded = table["_session"].combine_chunks().dictionary_encode()
+    codes = encoded.indices.to_numpy()
+    names = encoded.dictionary.to_pylist()
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    stops = np.r_[starts[1:], codes.size]
+    return table, {names[codes[a]]: (a, b) for a, b in zip(starts, stops)}
+
+
+def iter_store_sessions(
+    store_dir: str,
+    columns: Optional[Dict[str, Optional[List[str]]]] = None,
+    participants: Optional[Iterable[str]] = None,
+    tasks: Optional[Iterable[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Rebuild raw-like session objects from the store, in source-file order.
+
+    Parameters
+    - store_dir: str -- event store root
+    - columns: dict or None -- event table -> columns to read. An empty list
+      reads no payload columns (the list still has the right length); tables
+      not listed are skipped. None reads every table in full.
+    - participants, tasks: iterables or None -- partition filters
+
+    Returns
+    - iterator of dict: `mouse_path` (and other ARRAY_TABLES) as
+      {column: float ndarray}; other event tables as lists of dicts;
+      `_source_file` set to the session id (path relative to the raw dir)
+    """
+    manifest = read_manifest(store_dir)
+    sessions = load_event_table(
+        store_dir, SESSIONS_TABLE, participants=participants, tasks=tasks, manifest=manifest
+    ).sort_by("_session")
+
+    wanted = columns if columns is not None else {
+        n: None for n in manifest["tables"] if n != SESSIONS_TABLE
+    }
+    loaded = {}
+    for name, cols in wanted.items():
+        if name not in manifest["tables"]:
+            continue
+        read_cols = None if cols is None else list(cols) + ["_session", "_seq"]
+        table, slices = _session_slices(
+            load_event_table(store_dir, name, read_cols, participants, tasks, manifest)
+        )
+        payload = [c for c in table.column_names if c not in ("_session", "_seq", *PARTITION_COLUMNS)]
+        if name in ARRAY_TABLES:
+            data = {c: table[c].to_numpy(zero_copy_only=False).astype(np.float64) for c in payload}
+        else:
+            data = {c: table[c].to_pylist() for c in payload}
+        loaded[name] = (data, slices)
+
+    for rec in sessions.to_pylist():
+        sid = rec.pop("_session")
+        obj: Dict[str, Any] = {"_source_file": sid}
+        for k, v in rec.items():
+            if _is_missing(v):
+                continue
+            if "." in k:
+                parent, child = k.split(".", 1)
+                obj.setdefault(parent, {})[child] = v
+            else:
+                obj[k] = v
+        for name, (data, slices) in loaded.items():
+            if sid not in slices:
+                continue
+            a, b = slices[sid]
+            if name in ARRAY_TABLES:
+                value = {c: arr[a:b] for c, arr in data.items()}
+            else:
+                value = [
+                    {c: data[c][i] for c in data if not _is_missing(data[c][i])}
+                    for i in range(a, b)
+                ]
+            if "." in name:
+                parent, child = name.split(".", 1)
+                obj.setdefault(parent, {})[child] = value
+            else:
+                obj[name] = value
+        yield obj
+
+
+def main():
+    """CLI entrypoint: ingest `--raw-dir` into `--store` and print table sizes."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--raw-dir", type=str, default="../../data/raw")
+    parser.add_argument("--store", type=str, default="../../data/events")
+    parser.add_argument("--chunk-sessions", type=int, default=500)
+    parser.add_argument("--overwrite", action="store_true", help="Replace an existing store")
+    parser.add_argument("--n-workers", type=int, default=1, help="Parallel JSON parsers")
+    args = parser.parse_args()
+
+    manifest = ingest_raw(
+        os.path.abspath(args.raw_dir),
+        os.path.abspath(args.store),
+        chunk_sessions=args.chunk_sessions,
+        overwrite=args.overwrite,
+        n_workers=args.n_workers,
+    )
+    print(f"Ingested {manifest['n_sessions']} sessions into {args.store}")
+    for name, cols in sorted(manifest["tables"].items()):
+        print(f" - {name}: {len(cols)} columns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+feature_cache.py
+
+Persistent on-disk cache of per-file modeling rows for compute_features.py.
+
+Each entry is keyed by the raw file's path relative to the raw directory and
+stores the file's content hash, the extractor version that produced the row,
+and the row itself. A file is only re-parsed when its content hash or the
+extractor version changes; entries for files that disappeared are evicted on
+save. A (size, mtime) match short-circuits hashing, so unchanged files are
+not even read.
+
+Usage:
+    python feature_cache.py --cache ../../data/processed/feature_cache.json --stats
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+CACHE_FORMAT = 1
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """Return the BLAKE2b-128 hex digest of a file's contents."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class FeatureCache:
+    """Content-hash keyed store of modeling rows.
+
+    Parameters
+    - path: str -- JSON file backing the cache (created on first save)
+    - extractor_version: str -- bump to invalidate every cached row
+    """
+
+    def __init__(self, path: str, extractor_version: str):
+        self.path = path
+        self.extractor_version = str(extractor_version)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    blob = json.load(f)
+                if blob.get("format") == CACHE_FORMAT:
+                    self.entries = blob.get("entries", {})
+            except Exception as e:
+                print(f"Warning: ignoring unreadable feature cache {path}: {e}")
+
+    def lookup(self, key: str, path: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """Look up the row cached for `path`.
+
+        Returns
+        - (hit, row, digest): `row` is None for cached skip entries (TLX-only
+          files); `digest` is the content hash when it had to be computed, so
+          `store` can reuse it on a miss
+        """
+        self.seen.add(key)
+        st = os.stat(path)
+        entry = self.entries.get(key)
+        digest = None
+        if entry is not None and entry.get("version") == self.extractor_version:
+            if entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+                self.hits += 1
+                return True, entry.get("row"), entry.get("hash")
+            digest = file_digest(path)
+            if entry.get("hash") == digest:
+                # Touched but unchanged: refresh the stat fingerprint
+                entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+                self.hits += 1
+                return True, entry.get("row"), digest
+        self.misses += 1
+        return False, None, digest
+
+    def store(self, key: str, path: str, row: Optional[Dict], digest: Optional[str] = None):
+        """Record the row computed for `path` (None marks a skipped file)."""
+        st = os.stat(path)
+        self.entries[key] = {
+            "hash": digest or file_digest(path),
+            "version": self.extractor_version,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "row": row,
+        }
+
+    def evict_unseen(self) -> int:
+        """Drop entries for files not looked up in this run; return how many."""
+        stale = [k for k in self.entries if k not in self.seen]
+        for k in stale:
+            del self.entries[k]
+        return len(stale)
+
+    def save(self, evict: bool = True) -> int:
+        """Atomically write the cache to disk, evicting stale entries first.
+
+        Returns
+        - int: number of evicted entries
+        """
+        evicted = self.evict_unseen() if evict else 0
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"format": CACHE_FORMAT, "entries": self.entries}, f)
+        os.replace(tmp, self.path)
+        return evicted
+
+
+def main():
+    """Print summary statistics for an existing feature cache."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cache", type=str, required=True, help="Cache JSON path")
+    parser.add_argument("--stats", action="store_true", help="Print entry counts per extractor version")
+    args = parser.parse_args()
+
+    cache = FeatureCache(args.cache, extractor_version="")
+    print(f"{len(cache.entries)} cached files in {args.cache}")
+    if args.stats:
+        versions: Dict[str, int] = {}
+        for entry in cache.entries.values():
+            versions[entry.get("version")] = versions.get(entry.get("version"), 0) + 1
+        for v, n in sorted(versions.items()):
+            print(f" - extractor version {v}: {n} files")
+
+
+if __name__ == "__main__":
+    main()
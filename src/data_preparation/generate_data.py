@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+generate_data.py
+
+Synthetic study generator: participants x tasks sessions of raw telemetry
+(`mouse_path`, `field_interactions`, `idle_periods`, `filter_interactions`,
+`product_exploration`, `component_switches`, `constraint_violations`,
+`budget`, `meetings`) and the modeling CSV computed from them.
+
+Each participant has latent traits (skill, caution); each session's latent
+load combines them with the task's difficulty and drives both the NASA-TLX
+score and the volume / tempo of every event stream, so the features carry
+real signal about High_Load.
+
+Everything is sampled in NumPy batches: a shard of participants is drawn as
+flat event arrays plus per-session counts, and the features are segment
+reductions (`np.bincount` over segment ids) of those arrays, with no
+per-event Python work. Shards are independent and can run in parallel
+processes (--n-workers). Shard i draws from the i-th child of
+`np.random.SeedSequence(seed)`, so the output depends only on --seed and
+--shard-size, not on the number of workers.
+
+The feature row of a session uses compute_features.py's per-task
+definitions. With --raw-matching every session is also written as raw JSON
+(`<raw-dir>/<participantId>/<task>.json`) whose `computed_metrics` block
+holds that row, so compute_features.py rebuilds the same CSV from the raw
+files, with or without the block.
+
+Usage:
+    python generate_data.py --out-csv ../../data/processed/modeling_dataset.csv --n-participants 25 --raw-matching
+    python generate_data.py --out-csv /tmp/big.csv --n-participants 100000 --n-workers 8
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:  # package usage (src.data_preparation.generate_data)
+    from .compute_features import REQUIRED_FEATURES
+except ImportError:  # run as a script / imported by bare name
+    from compute_features import REQUIRED_FEATURES
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+TASKS = ["task_1_form", "task_2_product", "task_3_travel"]
+# Per-task constants, indexed like TASKS
+TASK_DIFFICULTY = np.array([-1.0, -0.2, 1.0])
+TASK_BASE_MS = np.array([150_000.0, 240_000.0, 420_000.0])
+FIELD_RANGE = np.array([[8, 15], [1, 4], [2, 7]])  # fields per session [lo, hi)
+FOCUS_BASE_MS = np.array([3000.0, 600.0, 650.0])
+FILTER_RATE = np.array([0.5, 4.0, 0.5])
+PRODUCT_RATE = np.array([1.5, 9.0, 1.5])
+SWITCH_PER_MIN = np.array([0.2, 0.3, 1.5])
+VIOLATION_RATE = np.array([0.3, 0.3, 3.0])
+BUDGET_RATE = np.array([0.5, 0.5, 10.0])
+MEETINGS = np.array([0, 0, 3])
+
+FILTER_NAMES = ["price", "brand", "rating", "category", "shipping"]
+COMPONENTS = ["flights", "hotels", "calendar", "budget"]
+VIOLATION_TYPES = ["overlap", "over_budget", "missed_deadline"]
+
+MOUSE_FMT = '{{"x": {}, "y": {}, "t": {}}}'
+
+
+def _offsets(counts):
+    """Start offsets of each segment plus the total (len(counts) + 1)."""
+    return np.concatenate([[0], np.cumsum(counts)])
+
+
+def _segment_cumsum(values, counts):
+    """Cumulative sum restarted at the start of every segment."""
+    c = np.cumsum(values)
+    starts = _offsets(counts)[:-1]
+    base = np.zeros(len(counts))
+    nonempty = counts > 0
+    base[nonempty] = c[starts[nonempty]] - values[starts[nonempty]]
+    return c - np.repeat(base, counts)
+
+
+def _sorted_times(rng, total_ms, counts):
+    """Uniform event times within each session, in increasing order."""
+    t = np.floor(rng.random(counts.sum()) * np.repeat(total_ms, counts))
+    return t[np.lexsort((t, np.repeat(np.arange(len(counts)), counts)))]
+
+
+def _segment_sum(values, counts):
+    return np.bincount(np.repeat(np.arange(len(counts)), counts), weights=values, minlength=len(counts))
+
+
+def _lognormal(rng, mean, sigma, size=None):
+    """Log-normal draws with the given mean (array or scalar)."""
+    return mean * rng.lognormal(-0.5 * sigma**2, sigma, size=size if size is not None else np.shape(mean))
+
+
+def sample_shard(rng, n_participants, mouse_hz=5.0):
+    """Draw the sessions of `n_participants` participants (all TASKS each).
+
+    Sessions are ordered participant-major, task-minor.
+
+    Parameters
+    - rng: numpy.random.Generator
+    - n_participants: int
+    - mouse_hz: float -- mean cursor samples per second
+
+    Returns
+    - dict with per-session arrays ("task", "tlx", "total_ms", ...) and, per
+      event stream, "<stream>_n" counts plus flat column arrays
+    """
+    P, T = n_participants, len(TASKS)
+    S = P * T
+    task = np.tile(np.arange(T), P)
+    skill = np.repeat(rng.normal(0.0, 0.5, P), T)
+    caution = np.repeat(rng.normal(0.25, 0.15, P), T)
+    z = TASK_DIFFICULTY[task] - 0.8 * skill + 0.3 * caution + rng.normal(0.0, 0.35, S)
+
+    s = {"task": task, "z": z}
+    # TLX stays > 0 so compute_features never mistakes it for missing
+    s["tlx"] = np.round(np.clip(47.0 + 16.0 * z + rng.normal(0.0, 5.0, S), 5.0, 100.0), 1)
+    total_ms = np.round(_lognormal(rng, TASK_BASE_MS[task] * np.exp(0.25 * z), 0.2))
+    s["total_ms"] = total_ms
+    minutes = total_ms / 60_000.0
+    s["planning_ms"] = np.round(total_ms * np.clip(_lognormal(rng, 0.03 * np.exp(0.4 * z), 0.3), 0.0, 0.5))
+    s["error_count"] = rng.poisson(1.2 * np.exp(0.5 * z))
+    s["recovery_ms"] = np.round(_lognormal(rng, 8000.0 * np.exp(0.3 * z), 0.4))
+    s["success"] = rng.random(S) > 1.0 / (1.0 + np.exp(-(z - 2.5)))
+    s["zip_corrections"] = np.where(task == 0, rng.poisson(0.3 * np.exp(0.5 * z)), 0)
+    s["rapid_hovers"] = rng.poisson(np.where(task == 1, 2.0, 0.3) * np.exp(0.6 * z))
+    s["overrun_events"] = rng.poisson(np.where(task == 2, 0.5, 0.05) * np.exp(0.7 * z))
+
+    # Cursor: heading random walk (noisier turns under load), log-normal
+    # step lengths, exponential inter-sample gaps scaled to the session length
+    n = np.maximum(2, rng.poisson(minutes * 60.0 * mouse_hz * np.exp(0.1 * z)))
+    s["mouse_n"] = n
+    turn = rng.normal(0.0, 1.0, n.sum()) * np.repeat(0.4 * np.exp(0.3 * z), n)
+    heading = _segment_cumsum(turn, n) + np.repeat(rng.uniform(0, 2 * np.pi, S), n)
+    step = _lognormal(rng, 12.0, 0.6, n.sum())
+    s["mouse_x"] = np.clip(np.round(640.0 + _segment_cumsum(step * np.cos(heading), n)), 0, 1280)
+    s["mouse_y"] = np.clip(np.round(400.0 + _segment_cumsum(step * np.sin(heading), n)), 0, 800)
+    gaps = _segment_cumsum(rng.exponential(1.0, n.sum()), n)
+    last = gaps[_offsets(n)[1:] - 1]
+    s["mouse_t"] = np.round(gaps / np.repeat(last, n) * np.repeat(total_ms, n))
+
+    lo, hi = FIELD_RANGE[task, 0], FIELD_RANGE[task, 1]
+    n = rng.integers(lo, hi)
+    s["field_n"] = n
+    focus_mean = FOCUS_BASE_MS[task] * np.exp(0.35 * z + 0.5 * caution)
+    s["field_focus_ms"] = np.round(_lognormal(rng, np.repeat(focus_mean, n), 0.5))
+    s["field_index"] = np.arange(n.sum()) - np.repeat(_offsets(n)[:-1], n)
+
+    n = rng.poisson(minutes * 60.0 / 25.0 * np.exp(0.3 * z))
+    s["idle_n"] = n
+    s["idle_start_ms"] = _sorted_times(rng, total_ms, n)
+    s["idle_duration_ms"] = np.round(_lognormal(rng, np.repeat(2500.0 * np.exp(0.2 * z), n), 0.6))
+
+    n = rng.poisson(FILTER_RATE[task]) + (task == 1)
+    s["filter_n"] = n
+    s["filter_name"] = rng.integers(0, len(FILTER_NAMES), n.sum())
+    s["filter_value"] = rng.integers(0, 500, n.sum())
+    p_revert = np.repeat(0.5 / (1.0 + np.exp(-(z - 1.5))), n)
+    s["filter_reverted"] = rng.random(n.sum()) < p_revert
+
+    n = rng.poisson(PRODUCT_RATE[task] * np.exp(0.2 * z))
+    s["product_n"] = n
+    s["product_sku"] = rng.integers(0, 10_000, n.sum())
+
+    n = rng.poisson(SWITCH_PER_MIN[task] * minutes * np.exp(0.5 * z))
+    s["switch_n"] = n
+    s["switch_from"] = rng.integers(0, len(COMPONENTS), n.sum())
+    s["switch_to"] = (s["switch_from"] + rng.integers(1, len(COMPONENTS), n.sum())) % len(COMPONENTS)
+    s["switch_t"] = _sorted_times(rng, total_ms, n)
+
+    n = rng.poisson(VIOLATION_RATE[task] * np.exp(0.6 * z))
+    s["violation_n"] = n
+    s["violation_type"] = rng.integers(0, len(VIOLATION_TYPES), n.sum())
+    s["violation_t"] = _sorted_times(rng, total_ms, n)
+
+    n = rng.poisson(BUDGET_RATE[task] * np.exp(0.3 * z))
+    s["budget_n"] = n
+    s["budget_t"] = _sorted_times(rng, total_ms, n)
+    s["budget_value"] = rng.integers(500, 3000, n.sum())
+
+    n = MEETINGS[task]
+    s["meeting_n"] = n
+    s["meeting_drags"] = rng.poisson(np.repeat(1.5 * np.exp(0.5 * z), n))
+    return s
+
+
+def _segment_first(values, counts, default=0.0):
+    """First value of every segment (`default` for empty segments)."""
+    out = np.full(len(counts), default, dtype=np.float64)
+    nonempty = counts > 0
+    out[nonempty] = values[_offsets(counts)[:-1][nonempty]]
+    return out
+
+
+def _by_task(task, form, product, travel):
+    """Per-session values picked by task from per-task arrays or scalars (None = NaN)."""
+    choices = [np.nan if v is None else v for v in (form, product, travel)]
+    return np.choose(task, [np.broadcast_to(np.asarray(c, dtype=np.float64), task.shape) for c in choices])
+
+
+def shard_features(s):
+    """REQUIRED_FEATURES for every session of a sampled shard.
+
+    The definitions are those of compute_features._task_features (per task,
+    with the same missing / constant values), evaluated on the same event
+    streams the raw JSON carries, so extracting the raw files gives these
+    rows whether or not they hold a `computed_metrics` block.
+
+    Returns
+    - dict feature name -> float64 array (one value per session)
+    """
+    task = s["task"]
+    total = np.maximum(s["total_ms"], 1.0)
+    n_fields = s["field_n"]
+    focus_sum = _segment_sum(s["field_focus_ms"], n_fields)
+    n_mouse = s["mouse_n"]
+    mouse_mean = _segment_sum(s["mouse_x"], n_mouse) / n_mouse
+    mouse_var = _segment_sum((s["mouse_x"] - np.repeat(mouse_mean, n_mouse)) ** 2, n_mouse) / n_mouse
+    first_filter = _segment_first(s["filter_value"], s["filter_n"], default=1.0)
+    n_products = s["product_n"].astype(np.float64)
+    rapid_hovers = s["rapid_hovers"].astype(np.float64)
+    n_switches = s["switch_n"].astype(np.float64)
+    f = {
+        "form_hesitation_index": _by_task(task, focus_sum, 0.0, 0.0),
+        "form_error_rate": _by_task(task, s["error_count"] / np.maximum(focus_sum, 1.0), None, 0.0),
+        "form_efficiency": _by_task(task, total / np.maximum(n_fields, 1), 0.0, 0.0),
+        "zip_code_struggle": _by_task(task, s["zip_corrections"], 0.0, 0.0),
+        # 0.8 unless the first filter's value_after is 0
+        "filter_optimization_score": _by_task(task, None, np.where(first_filter != 0, 0.8, 0.6), 0.0),
+        "decision_uncertainty": _by_task(task, None, rapid_hovers, rapid_hovers),
+        "exploration_breadth": _by_task(task, None, n_products, n_products),
+        "planning_time_ratio": _by_task(task, None, 0.02, 0.0),
+        "multitasking_load": _by_task(task, 0.0, n_switches, n_switches),
+        "constraint_violation_rate": _by_task(task, 0.0, s["violation_n"], s["violation_n"] / total),
+        "budget_management_stress": _by_task(
+            task, 0.0, s["overrun_events"], s["budget_n"] / np.maximum(1.0, total / 1000.0)
+        ),
+        "scheduling_difficulty": _by_task(task, 0.0, 0.0, _segment_first(s["meeting_drags"], s["meeting_n"])),
+        "recovery_efficiency": _by_task(
+            task, s["success"].astype(np.float64), 1.0 - rapid_hovers / np.maximum(n_products, 1.0), 0.05
+        ),
+        "action_density": n_mouse / total,
+        "idle_time_ratio": _segment_sum(s["idle_duration_ms"], s["idle_n"]) / total,
+        "mouse_entropy_avg": np.sqrt(mouse_var) + 1e-6,
+    }
+    return {k: np.asarray(f[k], dtype=np.float64) for k in REQUIRED_FEATURES}
+
+
+def _session_objects(s, pids, features):
+    """Yield (participantId, task, JSON text) for every session of a shard.
+
+    The cursor stream dominates the file size, so its points are formatted in
+    one pass over the shard and each session joins its slice.
+    """
+    points = list(map(MOUSE_FMT.format, *(s[c].astype(np.int64).tolist() for c in ("mouse_x", "mouse_y", "mouse_t"))))
+    lists = {}
+    for stream, cols in {
+        "field": ["field_index", "field_focus_ms"],
+        "idle": ["idle_start_ms", "idle_duration_ms"],
+        "filter": ["filter_name", "filter_value", "filter_reverted"],
+        "product": ["product_sku"],
+        "switch": ["switch_from", "switch_to", "switch_t"],
+        "violation": ["violation_type", "violation_t"],
+        "budget": ["budget_t", "budget_value"],
+        "meeting": ["meeting_drags"],
+    }.items():
+        lists[stream] = (_offsets(s[f"{stream}_n"]), [s[c].tolist() for c in cols])
+    scalars = {k: s[k].tolist() for k in (
+        "task", "tlx", "total_ms", "planning_ms", "error_count", "recovery_ms", "success",
+        "zip_corrections", "rapid_hovers", "overrun_events",
+    )}
+    # Missing features (NaN) are null in the JSON, as compute_features returns None
+    feats = {k: [None if np.isnan(x) else x for x in v.tolist()] for k, v in features.items()}
+    mouse_off = _offsets(s["mouse_n"])
+
+    def rows(stream, i):
+        off, cols = lists[stream]
+        return zip(*(c[off[i]:off[i + 1]] for c in cols))
+
+    for i in range(len(scalars["task"])):
+        pid, task = pids[i // len(TASKS)], TASKS[scalars["task"][i]]
+        obj = {
+            "participantId": pid,
+            "task": task,
+            "raw_tlx": scalars["tlx"][i],
+            "summary_metrics": {
+                "total_time_ms": int(scalars["total_ms"][i]),
+                "planning_time_ms": int(scalars["planning_ms"][i]),
+                "error_count": scalars["error_count"][i],
+                "recovery_time_ms": int(scalars["recovery_ms"][i]),
+                "success": scalars["success"][i],
+            },
+            "task_specific_metrics": {"zip_code_corrections": scalars["zip_corrections"][i]},
+            "field_interactions": [
+                {"field": f"field_{k}", "focus_time_ms": int(ms)} for k, ms in rows("field", i)
+            ],
+            "idle_periods": [
+                {"start_ms": int(a), "duration_ms": int(d)} for a, d in rows("idle", i)
+            ],
+            "filter_interactions": [
+                {"filter": FILTER_NAMES[k], "value_after": v, "reverted": r}
+                for k, v, r in rows("filter", i)
+            ],
+            "product_exploration": {
+                "products_viewed": [f"sku_{k}" for (k,) in rows("product", i)],
+                "rapid_hover_switches": scalars["rapid_hovers"][i],
+            },
+            "component_switches": [
+                {"from": COMPONENTS[a], "to": COMPONENTS[b], "t": int(t)} for a, b, t in rows("switch", i)
+            ],
+            "constraint_violations": [
+                {"type": VIOLATION_TYPES[k], "t": int(t)} for k, t in rows("violation", i)
+            ],
+            "budget": {
+                "updates": [{"t": int(t), "value": v} for t, v in rows("budget", i)],
+                "overrun_events": scalars["overrun_events"][i],
+            },
+            "computed_metrics": {k: feats[k][i] for k in REQUIRED_FEATURES},
+        }
+        meetings = [{"id": f"m{k + 1}", "drag_attempts": d} for k, (d,) in enumerate(rows("meeting", i))]
+        if meetings:
+            obj["meetings"] = meetings
+        # Append the pre-formatted cursor stream as the last key
+        text = json.dumps(obj)[:-1] + ', "mouse_path": [' + ", ".join(points[mouse_off[i]:mouse_off[i + 1]]) + "]}"
+        yield pid, task, text
+
+
+def participant_ids(start, stop, n_total):
+    """Zero-padded ids p-0001 ... for participants start..stop-1 of n_total."""
+    width = max(4, len(str(n_total)))
+    return [f"p-{i + 1:0{width}d}" for i in range(start, stop)]
+
+
+def generate_shard(job):
+    """Sample one shard, optionally write its raw JSON, return its CSV rows.
+
+    Parameters
+    - job: tuple (start, stop, n_total, seed_seq, mouse_hz, raw_dir or None)
+
+    Returns
+    - pandas.DataFrame: participantId, task_id, tlx, High_Load, REQUIRED_FEATURES
+    """
+    start, stop, n_total, seed_seq, mouse_hz, raw_dir = job
+    rng = np.random.default_rng(seed_seq)
+    pids = participant_ids(start, stop, n_total)
+    s = sample_shard(rng, len(pids), mouse_hz)
+    features = shard_features(s)
+
+    if raw_dir is not None:
+        for pid, task, text in _session_objects(s, pids, features):
+            pdir = os.path.join(raw_dir, pid)
+            os.makedirs(pdir, exist_ok=True)
+            with open(os.path.join(pdir, f"{task}.json"), "w") as f:
+                f.write(text)
+
+    df = pd.DataFrame({
+        "participantId": np.repeat(pids, len(TASKS)),
+        "task_id": np.array(TASKS)[s["task"]],
+        "tlx": s["tlx"],
+        "High_Load": (s["tlx"] > 60).astype(np.int64),
+    })
+    for k in REQUIRED_FEATURES:
+        df[k] = features[k]
+    return df
+
+
+def generate_dataset(n_participants, seed=2025, shard_size=250, n_workers=1, mouse_hz=5.0, raw_dir=None):
+    """Generate the modeling dataset (and optionally raw-matching JSON).
+
+    Parameters
+    - n_participants: int
+    - seed: int -- with shard_size, fully determines the output
+    - shard_size: int -- participants sampled per batch / task
+    - n_workers: int -- processes generating shards (1 = in this process)
+    - mouse_hz: float -- mean cursor samples per second of session time
+    - raw_dir: str or None -- write `<raw_dir>/<participantId>/<task>.json`
+
+    Returns
+    - pandas.DataFrame: one row per session, participant-major, task-minor
+    """
+    bounds = list(range(0, n_participants, shard_size)) + [n_participants]
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds) - 1)
+    jobs = [
+        (lo, hi, n_participants, ss, mouse_hz, raw_dir)
+        for lo, hi, ss in zip(bounds[:-1], bounds[1:], seeds)
+    ]
+    if n_workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            parts = list(pool.map(generate_shard, jobs))
+    else:
+        parts = [generate_shard(job) for job in jobs]
+    return pd.concat(parts, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic modeling dataset (and raw-matching JSON).")
+    parser.add_argument(
+        "--out-csv",
+        type=str,
+        default=str(REPO_ROOT / "data" / "processed" / "modeling_dataset.csv"),
+    )
+    parser.add_argument("--n-participants", type=int, default=25)
+    parser.add_argument(
+        "--raw-matching",
+        action="store_true",
+        help="Also write raw session JSON that compute_features.py turns back into the same CSV",
+    )
+    parser.add_argument("--raw-dir", type=str, default=str(REPO_ROOT / "data" / "raw"))
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--shard-size", type=int, default=250, help="Participants per shard")
+    parser.add_argument("--n-workers", type=int, default=1, help="Processes generating shards")
+    parser.add_argument("--mouse-hz", type=float, default=5.0, help="Mean cursor samples per second")
+    args = parser.parse_args()
+
+    out_csv = os.path.abspath(args.out_csv)
+    Path(os.path.dirname(out_csv)).mkdir(parents=True, exist_ok=True)
+    raw_dir = os.path.abspath(args.raw_dir) if args.raw_matching else None
+    df = generate_dataset(
+        args.n_participants,
+        seed=args.seed,
+        shard_size=args.shard_size,
+        n_workers=args.n_workers,
+        mouse_hz=args.mouse_hz,
+        raw_dir=raw_dir,
+    )
+    df.to_csv(out_csv, index=False)
+    print("Saved modeling CSV to:", out_csv)
+    print("Rows:", len(df), f"(High_Load rate {df['High_Load'].mean():.2f})")
+    if raw_dir:
+        print("Saved raw-matching JSON under:", raw_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+mouse_kernels.py
+
+Vectorized cursor-trajectory features. A session's `mouse_path` (list of
+{"x", "y", "t"} points, or a dict of equal-length "x"/"y"/"t" columns) is
+converted once into contiguous float64 arrays; every kernel then works on
+whole arrays with NumPy, with no per-point Python work.
+
+Features (MOUSE_KERNEL_FEATURES):
+ - mouse_spatial_entropy   : Shannon entropy (bits) of the 2-D occupancy grid
+ - mouse_velocity_entropy  : Shannon entropy (bits) of step directions
+ - mouse_speed_mean / _std : px per ms between consecutive samples
+ - mouse_accel_mean        : mean |d speed / dt|
+ - mouse_curvature_mean    : mean absolute turning angle per px travelled
+
+Usage:
+    python mouse_kernels.py --raw-file ../../data/raw/p-0001/task_3_travel.json
+"""
+
+import argparse
+import json
+from operator import itemgetter
+from typing import Any, Dict, NamedTuple
+
+import numpy as np
+
+MOUSE_KERNEL_FEATURES = [
+    "mouse_spatial_entropy",
+    "mouse_velocity_entropy",
+    "mouse_speed_mean",
+    "mouse_speed_std",
+    "mouse_accel_mean",
+    "mouse_curvature_mean",
+]
+
+
+class MousePath(NamedTuple):
+    """Contiguous float64 coordinate arrays for one session."""
+
+    x: np.ndarray
+    y: np.ndarray
+    t: np.ndarray
+
+    @property
+    def n(self) -> int:
+        return int(self.x.shape[0])
+
+
+def _column(points, key, default, n):
+    """Pull one key out of a list of point dicts into a float64 array."""
+    try:
+        # Fast path: every point has the key
+        out = np.fromiter(map(itemgetter(key), points), dtype=np.float64, count=n)
+    except (KeyError, TypeError):
+        pass
+    else:
+        # fromiter turns None into NaN; those need the default instead
+        if np.isnan(default) or not np.isnan(out).any():
+            return out
+    return np.fromiter(
+        (default if p.get(key) is None else p[key] for p in points),
+        dtype=np.float64,
+        count=n,
+    )
+
+
+def mouse_path_arrays(mouse_path: Any) -> MousePath:
+    """Convert a raw `mouse_path` into a MousePath of contiguous float64 arrays.
+
+    Parameters
+    - mouse_path: list[dict] | dict[str, sequence] | None -- point records or
+      columns; missing x/y default to 0 (matching compute_features), missing
+      timestamps become NaN and kernels fall back to sample index spacing
+
+    Returns
+    - MousePath
+    """
+    if not mouse_path:
+        empty = np.zeros(0, dtype=np.float64)
+        return MousePath(empty, empty, empty)
+    if isinstance(mouse_path, dict):
+        x = np.ascontiguousarray(mouse_path.get("x", []), dtype=np.float64)
+        y = np.ascontiguousarray(mouse_path.get("y", np.zeros_like(x)), dtype=np.float64)
+        # Columnar sources mark missing coordinates as NaN; treat them like
+        # absent keys in the list-of-dicts form
+        if np.isnan(x).any() or np.isnan(y).any():
+            x, y = np.nan_to_num(x, nan=0.0), np.nan_to_num(y, nan=0.0)
+        t = mouse_path.get("t", mouse_path.get("timestamp"))
+        t = np.full_like(x, np.nan) if t is None else np.ascontiguousarray(t, dtype=np.float64)
+        return MousePath(x, y, t)
+
+    n = len(mouse_path)
+    x = _column(mouse_path, "x", 0.0, n)
+    y = _column(mouse_path, "y", 0.0, n)
+    tkey = "timestamp" if "t" not in mouse_path[0] and "timestamp" in mouse_path[0] else "t"
+    t = _column(mouse_path, tkey, np.nan, n)
+    return MousePath(x, y, t)
+
+
+def _entropy_bits(counts: np.ndarray) -> float:
+    """Shannon entropy (bits) of a histogram."""
+    total = counts.sum()
+    if total <= 0:
+        return 0.0
+    p = counts[counts > 0] / total
+    return float(-(p * np.log2(p)).sum())
+
+
+def _bin_index(v: np.ndarray, bins: int) -> np.ndarray:
+    """Equal-width bin index in [0, bins) over the range of `v`."""
+    lo, hi = v.min(), v.max()
+    if hi <= lo:
+        return np.zeros(v.shape, dtype=np.intp)
+    idx = ((v - lo) * (bins / (hi - lo))).astype(np.intp)
+    return np.minimum(idx, bins - 1, out=idx)
+
+
+def spatial_entropy(x: np.ndarray, y: np.ndarray, bins: int = 16) -> float:
+    """Entropy of cursor occupancy over a `bins` x `bins` grid spanning the path."""
+    if x.size == 0:
+        return 0.0
+    # Integer bin indices + bincount is much cheaper than np.histogram2d
+    ix = _bin_index(x, bins)
+    iy = _bin_index(y, bins)
+    counts = np.bincount(ix * bins + iy, minlength=bins * bins)
+    return _entropy_bits(counts)
+
+
+def velocity_entropy(dx: np.ndarray, dy: np.ndarray, bins: int = 16) -> float:
+    """Entropy of movement directions, ignoring stationary samples."""
+    moving = (dx != 0) | (dy != 0)
+    if not moving.any():
+        return 0.0
+    angles = np.arctan2(dy[moving], dx[moving])
+    idx = ((angles + np.pi) * (bins / (2 * np.pi))).astype(np.intp)
+    counts = np.bincount(np.minimum(idx, bins - 1), minlength=bins)
+    return _entropy_bits(counts)
+
+
+def kinematics(path: MousePath) -> Dict[str, float]:
+    """Speed, acceleration and curvature summaries for one path."""
+    out = {
+        "mouse_speed_mean": 0.0,
+        "mouse_speed_std": 0.0,
+        "mouse_accel_mean": 0.0,
+        "mouse_curvature_mean": 0.0,
+    }
+    if path.n < 2:
+        return out
+    dx = np.diff(path.x)
+    dy = np.diff(path.y)
+    dt = np.diff(path.t)
+    if not np.isfinite(dt).all():
+        dt = np.ones_like(dx)
+    # Duplicate timestamps are common at 1 ms resolution; clamp to 1 ms
+    dt = np.maximum(dt, 1.0)
+    step = np.hypot(dx, dy)
+    speed = step / dt
+    out["mouse_speed_mean"] = float(speed.mean())
+    out["mouse_speed_std"] = float(speed.std())
+    if path.n >= 3:
+        accel = np.abs(np.diff(speed)) / dt[1:]
+        out["mouse_accel_mean"] = float(accel.mean())
+        heading = np.arctan2(dy, dx)
+        # Wrap heading changes into [-pi, pi) before taking magnitudes
+        turn = np.abs((np.diff(heading) + np.pi) % (2 * np.pi) - np.pi)
+        moving = (step[1:] > 0) & (step[:-1] > 0)
+        travelled = step[1:][moving].sum()
+        if travelled > 0:
+            out["mouse_curvature_mean"] = float(turn[moving].sum() / travelled)
+    return out
+
+
+def mouse_kernel_features(path: MousePath, bins: int = 16) -> Dict[str, float]:
+    """Compute all MOUSE_KERNEL_FEATURES for a MousePath."""
+    feats = {
+        "mouse_spatial_entropy": spatial_entropy(path.x, path.y, bins),
+        "mouse_velocity_entropy": 0.0,
+    }
+    if path.n >= 2:
+        feats["mouse_velocity_entropy"] = velocity_entropy(
+            np.diff(path.x), np.diff(path.y), bins
+        )
+    feats.update(kinematics(path))
+    return feats
+
+
+def main():
+    """Print kernel features for a single raw session file."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--raw-file", type=str, required=True)
+    parser.add_argument("--bins", type=int, default=16)
+    args = parser.parse_args()
+
+    with open(args.raw_file, "r") as f:
+        obj = json.load(f)
+    path = mouse_path_arrays(obj.get("mouse_path") or obj.get("mouse_data"))
+    print(f"{path.n} points")
+    for k, v in mouse_kernel_features(path, args.bins).items():
+        print(f" - {k}: {v:.6g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+streaming_features.py
+
+Incremental feature engine for real-time inference.
+
+`StreamingFeatureEngine` accepts batches of events for one session and keeps
+O(1)-per-event running state (counts, sums, idle accumulators, online mean /
+variance of cursor x). `features()` returns the 16 REQUIRED_FEATURES for the
+current window on demand:
+
+ - window_ms=None : cumulative over the whole session; at session end this
+   reproduces `compute_features_from_raw` on the equivalent raw object
+ - window_ms=W    : sliding window of the last W ms (events expire in
+   arrival order, so each event is added and removed exactly once)
+
+Events are flat dicts with a "type" naming the raw field they belong to,
+using the same dotted names as the event store (`mouse_path`,
+`field_interactions`, `idle_periods`, `budget.updates`,
+`product_exploration.products_viewed`, ...), plus the event payload and an
+optional timestamp (`t`, `timestamp` or `start_ms`). Session-level scalars
+(`summary_metrics.total_time_ms`, `product_exploration.rapid_hover_switches`,
+...) arrive as {"type": "session", ...} events. `session_to_events` turns a
+raw session object into such a stream for replay.
+
+Usage:
+    python streaming_features.py --raw-dir ../../data/raw --window-ms 300
+"""
+
+import argparse
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:  # package usage (src.data_preparation.streaming_features)
+    from .compute_features import REQUIRED_FEATURES
+except ImportError:  # run as a script / imported by bare name
+    from compute_features import REQUIRED_FEATURES
+
+SESSION_EVENT = "session"
+TIME_KEYS = ("t", "timestamp", "start_ms")
+
+
+def event_time(ev: Dict[str, Any]) -> Optional[float]:
+    """Return the event timestamp (ms) or None for untimed events."""
+    for k in TIME_KEYS:
+        v = ev.get(k)
+        if v is not None:
+            return float(v)
+    return None
+
+
+def session_to_events(obj: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a raw session object into a replayable event stream.
+
+    The stream starts with a `session` event carrying participantId/task,
+    then every list element of the session as a typed event in timestamp
+    order (untimed events keep list order after the timed ones), and ends with
+    a `session` event carrying all remaining scalars (summary metrics etc.).
+    """
+    pid = obj.get("participantId")
+    task = obj.get("task") or obj.get("task_id")
+    scalars: Dict[str, Any] = {}
+    timed, untimed = [], []
+
+    def add(name, items):
+        for item in items:
+            ev = dict(item) if isinstance(item, dict) else {"value": item}
+            ev["type"] = name
+            (timed if event_time(ev) is not None else untimed).append(ev)
+
+    for k, v in obj.items():
+        if k in ("participantId", "task", "task_id", "_source_file"):
+            continue
+        if isinstance(v, list):
+            add(k, v)
+        elif isinstance(v, dict):
+            for k2, v2 in v.items():
+                if isinstance(v2, list):
+                    add(f"{k}.{k2}", v2)
+                else:
+                    scalars[f"{k}.{k2}"] = v2
+        else:
+            scalars[k] = v
+    timed.sort(key=event_time)
+    start = {"type": SESSION_EVENT, "participantId": pid, "task": task}
+    end = dict(scalars, type=SESSION_EVENT)
+    return [start] + timed + untimed + [end]
+
+
+class RunningMoments:
+    """Welford mean/variance with O(1) add and remove."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, v: float):
+        self.n += 1
+        d = v - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (v - self.mean)
+
+    def remove(self, v: float):
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        d = v - self.mean
+        self.n -= 1
+        self.mean -= d / self.n
+        self.m2 -= d * (v - self.mean)
+
+    def std(self) -> float:
+        """Population standard deviation (np.std default); NaN when empty."""
+        if self.n == 0:
+            return float("nan")
+        return math.sqrt(max(self.m2, 0.0) / self.n)
+
+
+class WindowAggregates:
+    """Additive per-window accumulators; every update has an exact inverse."""
+
+    def __init__(self):
+        # Cursor x moments per source field; the batch extractor's form branch
+        # falls back to `mouse_data`, the other branches read `mouse_path` only
+        self.mouse_x = {"mouse_path": RunningMoments(), "mouse_data": RunningMoments()}
+        self.n_fields = 0
+        self.focus_ms = 0.0
+        self.idle_ms = 0.0
+        self.counts: Dict[str, int] = {}
+        # "first element" features keep the in-window events in order
+        self.meetings: deque = deque()
+        self.filters: deque = deque()
+
+    def apply(self, kind: str, ev: Dict[str, Any], sign: int):
+        if kind in self.mouse_x:
+            x = float(ev.get("x") or 0)
+            m = self.mouse_x[kind]
+            m.add(x) if sign > 0 else m.remove(x)
+        elif kind == "field_interactions":
+            self.n_fields += sign
+            self.focus_ms += sign * ev.get("focus_time_ms", 0)
+        elif kind == "idle_periods":
+            self.idle_ms += sign * ev.get("duration_ms", 0)
+        elif kind == "meetings":
+            self.meetings.append(ev) if sign > 0 else self.meetings.popleft()
+        elif kind == "filter_interactions":
+            self.filters.append(ev) if sign > 0 else self.filters.popleft()
+        self.counts[kind] = self.counts.get(kind, 0) + sign
+
+
+class StreamingFeatureEngine:
+    """Per-session incremental feature extractor.
+
+    Parameters
+    - participant_id: str or None
+    - task: str or None -- task id (may also arrive in a `session` event)
+    - window_ms: float or None -- sliding window length; None = whole session
+    """
+
+    def __init__(self, participant_id=None, task=None, window_ms: Optional[float] = None):
+        self.participant_id = participant_id
+        self.task = task
+        self.window_ms = window_ms
+        self.scalars: Dict[str, Any] = {}
+        self.agg = WindowAggregates()
+        self.window: deque = deque()
+        self.first_t: Optional[float] = None
+        self.clock: Optional[float] = None
+        self.n_events = 0
+
+    # -- ingestion -------------------------------------------------------
+
+    def update(self, events: Iterable[Dict[str, Any]]):
+        """Consume a batch of events (O(1) amortized per event)."""
+        for ev in events:
+            kind = ev.get("type")
+            if kind == SESSION_EVENT:
+                self._update_session(ev)
+                continue
+            t = event_time(ev)
+            if t is not None:
+                self.first_t = t if self.first_t is None else min(self.first_t, t)
+                self.clock = t if self.clock is None else max(self.clock, t)
+            self.n_events += 1
+            self.agg.apply(kind, ev, +1)
+            if self.window_ms is not None:
+                # Untimed events seen before any timestamp expire first
+                stamp = self.clock if self.clock is not None else float("-inf")
+                self.window.append((stamp, kind, ev))
+                self._expire()
+        return self
+
+    def _update_session(self, ev: Dict[str, Any]):
+        for k, v in ev.items():
+            if k == "type":
+                continue
+            if k == "participantId":
+                self.participant_id = v
+            elif k in ("task", "task_id"):
+                self.task = self.task or v
+            else:
+                self.scalars[k] = v
+
+    def _expire(self):
+        if self.clock is None:
+            return
+        horizon = self.clock - self.window_ms
+        while self.window and self.window[0][0] <= horizon:
+            _, kind, ev = self.window.popleft()
+            self.agg.apply(kind, ev, -1)
+
+    # -- features --------------------------------------------------------
+
+    def _total_time(self) -> Optional[float]:
+        """Window span (sliding mode), else the reported session time.
+
+        Cumulative mode returns None without `summary_metrics.total_time_ms`,
+        so each feature falls back to the batch extractor's default (1, 1000
+        or 0) and session-end features match `compute_features_from_raw`.
+        """
+        if self.window_ms is not None:
+            if self.first_t is None:
+                return None
+            return min(self.window_ms, self.clock - self.first_t)
+        return self.scalars.get("summary_metrics.total_time_ms")
+
+    def _scalar(self, key, default):
+        v = self.scalars.get(key)
+        return default if v is None else v
+
+    def _group(self, prefix: str) -> Dict[str, Any]:
+        n = len(prefix) + 1
+        return {k[n:]: v for k, v in self.scalars.items() if k.startswith(prefix + ".")}
+
+    def features(self) -> Dict[str, Any]:
+        """Return REQUIRED_FEATURES for the current window.
+
+        The formulas mirror `compute_features._task_features` branch by branch,
+        fed from running aggregates instead of full event lists.
+        """
+        computed = self._group("computed_metrics")
+        if computed:
+            for k in REQUIRED_FEATURES:
+                computed.setdefault(k, None)
+            return computed
+
+        a = self.agg
+        task = self.task
+        cm = {k: None for k in REQUIRED_FEATURES}
+        tt = self._total_time()
+
+        def total(default):
+            return default if tt is None else tt
+
+        count = a.counts.get
+        idle_ratio = float(a.idle_ms) / max(1, total(1))
+        path_x = a.mouse_x["mouse_path"]
+
+        if task and "form" in task:
+            cm["form_hesitation_index"] = float(a.focus_ms)
+            cm["form_error_rate"] = float(self._scalar("summary_metrics.error_count", 0)) / max(
+                1, (cm["form_hesitation_index"] or 1)
+            )
+            cm["form_efficiency"] = float(total(1)) / max(1, a.n_fields)
+            cm["zip_code_struggle"] = float(
+                self._scalar("task_specific_metrics.zip_code_corrections", 0)
+            )
+            form_x = path_x if path_x.n else a.mouse_x["mouse_data"]
+            cm["action_density"] = float(form_x.n) / max(1, total(1000))
+            cm["mouse_entropy_avg"] = float(form_x.std() + 1e-6)
+            cm["multitasking_load"] = 0.0
+            cm["constraint_violation_rate"] = 0.0
+            cm["budget_management_stress"] = 0.0
+            cm["scheduling_difficulty"] = 0.0
+            cm["recovery_efficiency"] = (
+                self._scalar("summary_metrics.success", True) and 1.0 or 0.0
+            )
+            cm["idle_time_ratio"] = idle_ratio
+            return cm
+
+        first_meeting = a.meetings[0] if a.meetings else {}
+        if task and "product" in task:
+            cm["exploration_breadth"] = float(count("product_exploration.products_viewed", 0))
+            cm["decision_uncertainty"] = float(
+                self._scalar("product_exploration.rapid_hover_switches", 0)
+            )
+            cm["filter_optimization_score"] = (
+                float(a.filters[0].get("value_after", 0) and 0.8 or 0.6) if a.filters else 0.8
+            )
+            cm["planning_time_ratio"] = float(total(0)) and 0.02 or 0.0
+            cm["mouse_entropy_avg"] = float(path_x.std() + 1e-6)
+            cm["action_density"] = float(path_x.n) / max(1, total(1))
+            cm["form_hesitation_index"] = 0.0
+            cm["form_efficiency"] = 0.0
+            cm["zip_code_struggle"] = 0.0
+            cm["multitasking_load"] = float(count("component_switches", 0))
+            cm["constraint_violation_rate"] = float(count("constraint_violations", 0))
+            cm["budget_management_stress"] = float(
+                self._scalar("budget.overrun_events", 0)
+            )
+            cm["scheduling_difficulty"] = float(first_meeting.get("drag_attempts", 0))
+            cm["recovery_efficiency"] = 1.0 - cm["decision_uncertainty"] / max(
+                1, (cm["exploration_breadth"] or 1)
+            )
+            cm["idle_time_ratio"] = idle_ratio
+            return cm
+
+        if task and "travel" in task:
+            has_product = bool(self._group("product_exploration")) or bool(
+                count("product_exploration.products_viewed", 0)
+            )
+            cm["multitasking_load"] = float(count("component_switches", 0))
+            cm["constraint_violation_rate"] = float(count("constraint_violations", 0)) / max(
+                1, total(1)
+            )
+            cm["budget_management_stress"] = float(count("budget.updates", 0)) / max(
+                1, (total(1) / 1000)
+            )
+            cm["scheduling_difficulty"] = float(first_meeting.get("drag_attempts", 0))
+            cm["recovery_efficiency"] = 0.05
+            cm["action_density"] = float(path_x.n) / max(1, total(1))
+            cm["mouse_entropy_avg"] = float(path_x.std() + 1e-6)
+            cm["idle_time_ratio"] = idle_ratio
+            cm["form_hesitation_index"] = 0.0
+            cm["form_error_rate"] = 0.0
+            cm["form_efficiency"] = 0.0
+            cm["zip_code_struggle"] = 0.0
+            cm["filter_optimization_score"] = 0.0
+            cm["decision_uncertainty"] = (
+                float(self._scalar("product_exploration.rapid_hover_switches", 0))
+                if has_product
+                else 0.0
+            )
+            cm["exploration_breadth"] = (
+                float(count("product_exploration.products_viewed", 0)) if has_product else 0.0
+            )
+            cm["planning_time_ratio"] = 0.0
+            return cm
+
+        return cm
+
+
+def replay(obj: Dict[str, Any], batch_size: int = 64, window_ms=None) -> StreamingFeatureEngine:
+    """Feed a raw session through an engine in batches; return the engine."""
+    events = session_to_events(obj)
+    engine = StreamingFeatureEngine(window_ms=window_ms)
+    for i in range(0, len(events), batch_size):
+        engine.update(events[i : i + batch_size])
+    return engine
+
+
+def iter_windows(
+    events: List[Dict[str, Any]], window_ms: float, hop_ms: float
+) -> Iterator[Dict[str, Any]]:
+    """Replay `events` and emit sliding-window features every `hop_ms` of event time."""
+    engine = StreamingFeatureEngine(window_ms=window_ms)
+    next_emit = None
+    for ev in events:
+        engine.update([ev])
+        if engine.clock is None:
+            continue
+        if next_emit is None:
+            next_emit = engine.clock + hop_ms
+        while engine.clock >= next_emit:
+            yield dict(engine.features(), t=next_emit)
+            next_emit += hop_ms
+
+
+def main():
+    """Replay raw sessions and compare end-of-session features with the batch extractor."""
+    try:
+        from .compute_features import compute_features_from_raw
+        from .load_data import iter_raw
+    except ImportError:
+        from compute_features import compute_features_from_raw
+        from load_data import iter_raw
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--raw-dir", type=str, default="../../data/raw")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--window-ms", type=float, default=None, help="Also report sliding-window count")
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    n_sessions, mismatches = 0, 0
+    for obj in iter_raw(args.raw_dir):
+        expected = compute_features_from_raw(obj)
+        got = replay(obj, args.batch_size).features()
+        n_sessions += 1
+        for k in REQUIRED_FEATURES:
+            a, b = expected.get(k), got.get(k)
+            same = (a is None and b is None) or (
+                a is not None
+                and b is not None
+                and (math.isclose(a, b, rel_tol=args.rtol, abs_tol=1e-12) or (a != a and b != b))
+            )
+            if not same:
+                mismatches += 1
+                print(f"Mismatch {obj.get('_source_file')} {k}: batch={a} stream={b}")
+        if args.window_ms:
+            n_windows = sum(1 for _ in iter_windows(session_to_events(obj), args.window_ms, args.window_ms))
+            print(f"{obj.get('_source_file')}: {n_windows} windows of {args.window_ms} ms")
+    print(f"Replayed {n_sessions} sessions, {mismatches} feature mismatches")
+
+
+if __name__ == "__main__":
+    main()
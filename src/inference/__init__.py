@@ -0,0 +1,73 @@
+"""
+inference package
+
+Real-time inference path:
+ - Predict + top-k explain on the compiled forest
+ - Session replay load generator (latency percentiles per window)
+ - Asyncio HTTP server with request micro-batching
+ - Bounded per-session state store (TTL / LRU eviction)
+ - Vectorized EWMA + hysteresis adaptation controller
+
+Import examples:
+    from src.inference import Predictor, replay
+    from src.inference.replay import load_recordings
+
+Names and submodules are resolved lazily (module `__getattr__`), so e.g.
+`Predictor` imports only NumPy-based modules, not sklearn or shap.
+"""
+
+import importlib
+
+# Submodules, and public name -> submodule defining it; both are imported on
+# first attribute access
+_SUBMODULES = {
+    "adaptation",
+    "predictor",
+    "replay",
+    "server",
+    "session_store",
+}
+_LAZY = {
+    # adaptation
+    "HysteresisController": "adaptation",
+    "hysteresis_step": "adaptation",
+    # predictor
+    "EXPLAINERS": "predictor",
+    "InferenceResult": "predictor",
+    "Predictor": "predictor",
+    # replay
+    "Recording": "replay",
+    "load_recordings": "replay",
+    "summarize": "replay",
+    # server
+    "InferenceServer": "server",
+    "MicroBatcher": "server",
+    "serve": "server",
+    # session_store
+    "SessionRecord": "session_store",
+    "SessionStore": "session_store",
+}
+
+__all__ = sorted(_LAZY)
+
+
+def _load(module):
+    # The modules import their siblings package-relatively (falling back to
+    # the bare name `from predictor import ...` only when run as scripts),
+    # so each file is loaded once, as src.inference.<module>
+    return importlib.import_module(f".{module}", __name__)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return _load(name)
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_load(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | set(_LAZY))
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+adaptation.py
+
+Temporal smoothing and hysteresis for every active session at once
+(docs/ADAPTATION.md, section 3).
+
+Per session the controller keeps an EWMA of the High_Load probability, a
+binary adaptation state (LOW_LOAD / HIGH_LOAD) and a dwell counter:
+
+ - calibration : the first `calibration_windows` windows only feed the EWMA;
+   no adaptation is applied
+ - escalation  : LOW -> HIGH once the EWMA has stayed >= `enter_threshold`
+   for `enter_windows` consecutive windows
+ - recovery    : HIGH -> LOW once the EWMA has stayed <= `exit_threshold`
+   for `exit_windows` consecutive windows
+
+`enter_threshold` > `exit_threshold` leaves a dead band in which the state
+holds, so a probability hovering around one threshold does not make the UI
+oscillate.
+
+The state lives in NumPy columns indexed by session slot, and one `step`
+updates every session scored in a tick with a handful of array operations
+instead of a Python loop per session. A NaN probability means the session
+had no window in this tick: its state, EWMA and dwell are left untouched.
+`step_store` runs the same update on a SessionStore's ewma / state / dwell
+columns and returns the ids of the sessions that switched.
+
+Usage:
+    python adaptation.py --sessions 100000 --ticks 50
+"""
+
+import argparse
+import time
+from typing import Hashable, List, Optional
+
+import numpy as np
+
+try:  # package usage (src.inference.adaptation)
+    from .session_store import HIGH_LOAD, LOW_LOAD, SessionStore
+except ImportError:  # run as a script / imported by bare name
+    from session_store import HIGH_LOAD, LOW_LOAD, SessionStore
+
+
+def hysteresis_step(
+    ewma: np.ndarray,
+    state: np.ndarray,
+    dwell: np.ndarray,
+    n_windows: np.ndarray,
+    proba: np.ndarray,
+    alpha: float,
+    enter_threshold: float,
+    exit_threshold: float,
+    enter_windows: int,
+    exit_windows: int,
+    calibration_windows: int,
+    counted: bool = True,
+) -> np.ndarray:
+    """Advance the given state rows by one window, in place.
+
+    Parameters
+    - ewma, state, dwell, n_windows: (n,) state rows of the sessions in `proba`
+      (views or gathered copies; the caller writes copies back)
+    - proba: (n,) High_Load probability per session; NaN = no window this tick
+    - alpha: float -- EWMA weight of the new probability
+    - enter_threshold, exit_threshold: float -- escalation / recovery thresholds on the EWMA
+    - enter_windows, exit_windows: int -- consecutive windows required to switch
+    - calibration_windows: int -- windows before any switch is allowed
+    - counted: bool -- whether to increment n_windows here (False when the
+      caller, e.g. SessionStore.update_many, has already counted the window)
+
+    Returns
+    - (n,) bool mask of rows whose state switched
+    """
+    proba = np.asarray(proba, dtype=ewma.dtype)
+    seen = ~np.isnan(proba)
+    if counted:
+        n_windows += seen
+    fresh = seen & np.isnan(ewma)
+    np.copyto(ewma, proba, where=fresh)
+    upd = seen & ~fresh
+    np.copyto(ewma, ewma + alpha * (proba - ewma), where=upd)
+
+    high = state == HIGH_LOAD
+    # Evidence for leaving the current state; NaN EWMA compares False
+    toward = np.where(high, ewma <= exit_threshold, ewma >= enter_threshold)
+    toward &= seen & (n_windows > calibration_windows)
+    need = np.where(high, exit_windows, enter_windows)
+    np.copyto(dwell, np.where(toward, dwell + 1, 0).astype(dwell.dtype), where=seen)
+    switched = toward & (dwell >= need)
+    np.copyto(state, np.where(high, LOW_LOAD, HIGH_LOAD).astype(state.dtype), where=switched)
+    dwell[switched] = 0
+    return switched
+
+
+class HysteresisController:
+    """EWMA + enter/exit thresholds + dwell counters for many sessions.
+
+    Parameters
+    - n_sessions: int -- initial number of session rows (grows on demand)
+    - alpha: float -- EWMA weight of each new probability (0 < alpha <= 1)
+    - enter_threshold, exit_threshold: float -- EWMA thresholds to escalate / recover
+      (exit_threshold < enter_threshold)
+    - enter_windows, exit_windows: int -- windows the EWMA must stay past a
+      threshold before the state switches
+    - calibration_windows: int -- initial windows without adaptation
+    """
+
+    def __init__(
+        self,
+        n_sessions: int = 0,
+        alpha: float = 0.3,
+        enter_threshold: float = 0.6,
+        exit_threshold: float = 0.4,
+        enter_windows: int = 3,
+        exit_windows: int = 5,
+        calibration_windows: int = 10,
+    ):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        if exit_threshold >= enter_threshold:
+            raise ValueError(
+                f"exit_threshold ({exit_threshold}) must be below enter_threshold ({enter_threshold})"
+            )
+        dwell_max = np.iinfo(np.uint16).max
+        if not (1 <= enter_windows < dwell_max and 1 <= exit_windows < dwell_max):
+            raise ValueError("enter_windows and exit_windows must be in [1, 65534]")
+        self.alpha = alpha
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.enter_windows = enter_windows
+        self.exit_windows = exit_windows
+        self.calibration_windows = calibration_windows
+        self.ewma = np.full(0, np.nan, dtype=np.float32)
+        self.state = np.zeros(0, dtype=np.int8)
+        self.dwell = np.zeros(0, dtype=np.uint16)
+        self.n_windows = np.zeros(0, dtype=np.uint32)
+        self.resize(n_sessions)
+
+    def __len__(self) -> int:
+        return len(self.state)
+
+    def resize(self, n: int):
+        """Grow to n session rows; new rows start uncalibrated in LOW_LOAD."""
+        old = len(self.state)
+        if n <= old:
+            return
+        self.ewma = np.concatenate([self.ewma, np.full(n - old, np.nan, dtype=np.float32)])
+        self.state = np.concatenate([self.state, np.full(n - old, LOW_LOAD, dtype=np.int8)])
+        self.dwell = np.concatenate([self.dwell, np.zeros(n - old, dtype=np.uint16)])
+        self.n_windows = np.concatenate([self.n_windows, np.zeros(n - old, dtype=np.uint32)])
+
+    def reset(self, rows):
+        """Forget the state of `rows` (e.g. when their slots are reused)."""
+        self.ewma[rows] = np.nan
+        self.state[rows] = LOW_LOAD
+        self.dwell[rows] = 0
+        self.n_windows[rows] = 0
+
+    def _params(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "enter_threshold": self.enter_threshold,
+            "exit_threshold": self.exit_threshold,
+            "enter_windows": self.enter_windows,
+            "exit_windows": self.exit_windows,
+            "calibration_windows": self.calibration_windows,
+        }
+
+    def step(self, proba, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """One tick: feed `proba` to `rows` (default: rows 0..len(proba)-1).
+
+        `rows` must not repeat within a tick.
+
+        Returns
+        - rows whose adaptation state switched; read `state[rows]` for the new state
+        """
+        proba = np.asarray(proba, dtype=np.float32)
+        if rows is None:
+            self.resize(len(proba))
+            n = len(proba)
+            switched = hysteresis_step(
+                self.ewma[:n], self.state[:n], self.dwell[:n], self.n_windows[:n], proba, **self._params()
+            )
+            return np.flatnonzero(switched)
+        rows = np.asarray(rows, dtype=np.intp)
+        if rows.size and rows.max() >= len(self):
+            self.resize(max(int(rows.max()) + 1, 2 * len(self)))
+        cols = [self.ewma[rows], self.state[rows], self.dwell[rows], self.n_windows[rows]]
+        switched = hysteresis_step(*cols, proba, **self._params())
+        self.ewma[rows], self.state[rows], self.dwell[rows], self.n_windows[rows] = cols
+        return rows[switched]
+
+    def step_store(self, store: SessionStore, slots: np.ndarray, proba) -> List[Hashable]:
+        """One tick on a SessionStore's columns for a scored batch.
+
+        `slots` / `proba` are what `store.update_many` returned / recorded for
+        the batch (one row per session), so n_windows is already counted.
+        Returns the ids of the sessions that switched state.
+        """
+        slots = np.asarray(slots, dtype=np.intp)
+        cols = [store.ewma[slots], store.state[slots], store.dwell[slots], store.n_windows[slots]]
+        switched = hysteresis_step(*cols, proba, counted=False, **self._params())
+        store.ewma[slots], store.state[slots], store.dwell[slots] = cols[:3]
+        return [store.ids[s] for s in slots[switched]]
+
+
+def simulate(n_sessions: int, n_ticks: int, seed: int = 2025) -> np.ndarray:
+    """(n_ticks, n_sessions) noisy per-window probabilities with drifting load."""
+    rng = np.random.default_rng(seed)
+    level = rng.uniform(0.1, 0.9, n_sessions)
+    out = np.empty((n_ticks, n_sessions), dtype=np.float32)
+    for t in range(n_ticks):
+        level = np.clip(level + rng.normal(0, 0.05, n_sessions), 0, 1)
+        out[t] = np.clip(level + rng.normal(0, 0.15, n_sessions), 0, 1)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the hysteresis controller on simulated sessions.")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--alpha", type=float, default=0.3)
+    parser.add_argument("--enter-threshold", type=float, default=0.6)
+    parser.add_argument("--exit-threshold", type=float, default=0.4)
+    parser.add_argument("--enter-windows", type=int, default=3)
+    parser.add_argument("--exit-windows", type=int, default=5)
+    parser.add_argument("--calibration-windows", type=int, default=10)
+    args = parser.parse_args()
+
+    ctrl = HysteresisController(
+        args.sessions,
+        alpha=args.alpha,
+        enter_threshold=args.enter_threshold,
+        exit_threshold=args.exit_threshold,
+        enter_windows=args.enter_windows,
+        exit_windows=args.exit_windows,
+        calibration_windows=args.calibration_windows,
+    )
+    probas = simulate(args.sessions, args.ticks)
+    n_switched, elapsed = 0, 0.0
+    for p in probas:
+        t0 = time.perf_counter()
+        n_switched += len(ctrl.step(p))
+        elapsed += time.perf_counter() - t0
+    print(
+        f"{args.sessions} sessions x {args.ticks} ticks: {1e3 * elapsed / args.ticks:.2f} ms per tick, "
+        f"{n_switched} switches, {np.mean(ctrl.state == HIGH_LOAD):.1%} in HIGH_LOAD at the end"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+replay.py
+
+Real-time session replay load generator for the inference path.
+
+Raw session logs (`data/raw/<participant>/<task>.json`) are turned into event
+streams (`streaming_features.session_to_events`) and replayed by many
+concurrent simulated sessions, each on the recording's own timestamps
+(divided by --speed). Every session owns a sliding-window
+`StreamingFeatureEngine`; every --hop-ms of session time its window timer
+fires and the window goes through the same path a deployment runs:
+
+    features (engine.features()) -> predict (CompiledForest) -> explain (top-k SHAP)
+
+One process plays both sides, like a single inference worker: it ingests
+the events that are due, snapshots the features of every due window, and
+scores the pending windows in micro-batches of up to --max-batch rows
+(--max-batch 1 = one predict + explain call per window). A window's
+end-to-end latency runs from its scheduled tick to the end of the batch
+that scored it, so time spent queued behind other sessions' work counts.
+
+The report gives p50 / p90 / p95 / p99 / max per stage and end to end, the
+share of windows within --budget-ms (docs/SYSTEM.md quotes 150-400 ms per
+inference cycle), and the achieved windows per second.
+
+The windows carry compute_features.REQUIRED_FEATURES; a model trained on
+other columns needs --feature-names (columns the engine does not compute
+are NaN).
+
+Usage:
+    python replay.py --raw-dir ../../data/raw --model ../../models/tuned_random_forest_model.joblib \
+        --sessions 200 --speed 1 --duration 30
+"""
+
+import argparse
+import heapq
+import os
+import sys
+import time
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+try:  # package usage (src.inference.replay)
+    from ..data_preparation.load_data import iter_raw
+    from ..data_preparation.streaming_features import (
+        SESSION_EVENT,
+        StreamingFeatureEngine,
+        event_time,
+        session_to_events,
+    )
+    from .predictor import EXPLAINERS, Predictor
+except ImportError:  # run as a script / imported by bare name
+    HERE = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.join(HERE, "..", "data_preparation"))
+    from load_data import iter_raw
+    from predictor import EXPLAINERS, Predictor
+    from streaming_features import (
+        SESSION_EVENT,
+        StreamingFeatureEngine,
+        event_time,
+        session_to_events,
+    )
+
+PERCENTILES = (50, 90, 95, 99)
+STAGES = ("queue", "features", "predict", "explain", "end_to_end")
+
+# Heap entry kinds
+_EVENTS, _TICK = 0, 1
+
+
+class Recording(NamedTuple):
+    """One raw session as an event stream with session-relative times (ms)."""
+
+    events: List[Dict]
+    times_ms: np.ndarray
+
+
+def load_recordings(raw_dir: str, limit: int = None) -> List[Recording]:
+    """Raw sessions under `raw_dir` as replayable recordings.
+
+    `computed_metrics` blocks are dropped so windows are computed from the
+    events, as they would be live. Untimed events are replayed with the last
+    timed event.
+    """
+    recordings = []
+    for obj in iter_raw(raw_dir):
+        if "tlx" in (obj.get("task") or "").lower():
+            continue
+        obj = {k: v for k, v in obj.items() if k not in ("computed_metrics", "_source_file")}
+        events = session_to_events(obj)
+        t = np.full(len(events), np.nan)
+        for i, ev in enumerate(events):
+            ts = event_time(ev) if ev.get("type") != SESSION_EVENT else None
+            if ts is not None:
+                t[i] = ts
+        if np.isnan(t).all():
+            continue
+        # Leading session event and trailing untimed events take their
+        # neighbours' times
+        t = np.fmax.accumulate(np.where(np.isnan(t), -np.inf, t))
+        t[np.isinf(t)] = t[~np.isinf(t)].min()
+        recordings.append(Recording(events, t - t[0]))
+        if limit and len(recordings) >= limit:
+            break
+    return recordings
+
+
+class _Session:
+    """A simulated session replaying one recording from wall time `start`."""
+
+    __slots__ = ("rec", "start", "speed", "engine", "pos", "next_tick_ms", "end_ms")
+
+    def __init__(self, rec: Recording, start: float, speed: float, window_ms: float, hop_ms: float):
+        self.rec = rec
+        self.start = start
+        self.speed = speed
+        self.engine = StreamingFeatureEngine(window_ms=window_ms)
+        self.pos = 0
+        self.next_tick_ms = hop_ms
+        self.end_ms = float(rec.times_ms[-1])
+
+    def wall(self, t_ms: float) -> float:
+        return self.start + t_ms / 1000.0 / self.speed
+
+
+def replay(
+    predictor: Predictor,
+    recordings: List[Recording],
+    n_sessions: int = 100,
+    speed: float = 1.0,
+    duration_s: float = 30.0,
+    ramp_s: float = 1.0,
+    window_ms: float = 3000.0,
+    hop_ms: float = 300.0,
+    max_batch: int = 64,
+    seed: int = 2025,
+) -> Dict[str, np.ndarray]:
+    """Replay `n_sessions` concurrent sessions and time every scored window.
+
+    Parameters
+    - predictor: Predictor -- predict + explain stage
+    - recordings: list[Recording] -- session i replays recordings[i % len]
+    - n_sessions: int -- concurrent simulated sessions
+    - speed: float -- replay speed-up (1 = original timestamps)
+    - duration_s: float -- wall seconds after which no new windows are scheduled
+    - ramp_s: float -- session start times are spread uniformly over this
+    - window_ms, hop_ms: float -- feature window length and inference period
+      (session time)
+    - max_batch: int -- windows scored per predict + explain call
+    - seed: int -- start-time jitter
+
+    Returns
+    - dict of per-window arrays (seconds): "queue", "features", "predict",
+      "explain", "end_to_end", plus "batch_size", "proba" and "wall_s"
+    """
+    rng = np.random.default_rng(seed)
+    t_begin = time.perf_counter() + 0.05
+    stop = t_begin + duration_s
+    sessions = [
+        _Session(recordings[i % len(recordings)], t_begin + rng.uniform(0, ramp_s), speed, window_ms, hop_ms)
+        for i in range(n_sessions)
+    ]
+    heap = []
+    for sid, s in enumerate(sessions):
+        heapq.heappush(heap, (s.start, _EVENTS, sid))
+        heapq.heappush(heap, (s.wall(s.next_tick_ms), _TICK, sid))
+
+    pending = []  # (due, features_s, feature dict)
+    out = {k: [] for k in STAGES + ("batch_size", "proba")}
+    while heap or pending:
+        now = time.perf_counter()
+        while heap and heap[0][0] <= now:
+            due, kind, sid = heapq.heappop(heap)
+            s = sessions[sid]
+            if kind == _EVENTS:
+                # Everything of this session that is due by now, as one batch
+                lo = s.pos
+                limit = (now - s.start) * 1000.0 * s.speed
+                s.pos = hi = int(np.searchsorted(s.rec.times_ms, limit, side="right"))
+                s.engine.update(s.rec.events[lo:hi])
+                if hi < len(s.rec.events) and s.wall(s.rec.times_ms[hi]) < stop:
+                    heapq.heappush(heap, (s.wall(s.rec.times_ms[hi]), _EVENTS, sid))
+            else:
+                t0 = time.perf_counter()
+                feats = s.engine.features()
+                pending.append((due, time.perf_counter() - t0, feats))
+                s.next_tick_ms += hop_ms
+                nxt = s.wall(s.next_tick_ms)
+                if s.next_tick_ms <= s.end_ms and nxt < stop:
+                    heapq.heappush(heap, (nxt, _TICK, sid))
+
+        if pending:
+            batch, pending = pending[:max_batch], pending[max_batch:]
+            t_start = time.perf_counter()
+            res = predictor.infer(predictor.vectorize([b[2] for b in batch]))
+            t_done = time.perf_counter()
+            for (due, feat_s, _), p in zip(batch, res.proba):
+                out["queue"].append(t_start - due - feat_s)
+                out["features"].append(feat_s)
+                out["predict"].append(res.predict_s)
+                out["explain"].append(res.explain_s)
+                out["end_to_end"].append(t_done - due)
+                out["batch_size"].append(len(batch))
+                out["proba"].append(p)
+            continue
+        if heap:
+            time.sleep(max(0.0, heap[0][0] - time.perf_counter()))
+
+    result = {k: np.asarray(v) for k, v in out.items()}
+    result["wall_s"] = time.perf_counter() - t_begin
+    return result
+
+
+def summarize(result: Dict[str, np.ndarray], budget_ms: float = 400.0) -> str:
+    """Text report: latency percentiles per stage, budget hit rate, throughput."""
+    n = len(result["end_to_end"])
+    if n == 0:
+        return "No windows were scored (sessions shorter than one hop?)"
+    head = f"{'stage (ms)':<12}" + "".join(f"{'p' + str(p):>9}" for p in PERCENTILES) + f"{'max':>9}"
+    lines = [head]
+    for stage in STAGES:
+        v = 1e3 * result[stage]
+        cells = "".join(f"{x:>9.1f}" for x in np.percentile(v, PERCENTILES))
+        lines.append(f"{stage:<12}{cells}{v.max():>9.1f}")
+    within = np.mean(1e3 * result["end_to_end"] <= budget_ms)
+    lines.append(
+        f"{n} windows in {result['wall_s']:.1f} s ({n / result['wall_s']:.0f} windows/s), "
+        f"mean batch {result['batch_size'].mean():.1f}, "
+        f"{100 * within:.1f}% within {budget_ms:.0f} ms"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay raw sessions through features -> predict -> explain.")
+    parser.add_argument("--raw-dir", type=str, default="../../data/raw")
+    parser.add_argument("--model", type=str, default="../../models/tuned_random_forest_model.joblib")
+    parser.add_argument("--sessions", type=int, default=100, help="Concurrent simulated sessions")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up over the recorded timestamps")
+    parser.add_argument("--duration", type=float, default=30.0, help="Wall seconds to schedule windows for")
+    parser.add_argument("--ramp", type=float, default=1.0, help="Spread session starts over this many seconds")
+    parser.add_argument("--window-ms", type=float, default=3000.0, help="Feature window (session time)")
+    parser.add_argument("--hop-ms", type=float, default=300.0, help="Inference period per session (session time)")
+    parser.add_argument("--max-batch", type=int, default=64, help="Windows per predict + explain call")
+    parser.add_argument("--explain", choices=EXPLAINERS, default="topk")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument(
+        "--feature-names",
+        type=str,
+        default=None,
+        help="Comma-separated model input columns (default: compute_features.REQUIRED_FEATURES)",
+    )
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    parser.add_argument("--max-recordings", type=int, default=None)
+    parser.add_argument("--out-csv", type=str, default=None, help="Optional per-window latency CSV")
+    args = parser.parse_args()
+
+    recordings = load_recordings(os.path.abspath(args.raw_dir), args.max_recordings)
+    if not recordings:
+        parser.error(f"no replayable sessions under {args.raw_dir}")
+    names = [n.strip() for n in args.feature_names.split(",")] if args.feature_names else None
+    predictor = Predictor.from_artifact(
+        os.path.abspath(args.model), feature_names=names, explain=args.explain, k=args.k
+    )
+    print(
+        f"Replaying {args.sessions} sessions from {len(recordings)} recordings at {args.speed:g}x, "
+        f"window {args.window_ms:g} ms every {args.hop_ms:g} ms, max batch {args.max_batch}"
+    )
+    result = replay(
+        predictor,
+        recordings,
+        n_sessions=args.sessions,
+        speed=args.speed,
+        duration_s=args.duration,
+        ramp_s=args.ramp,
+        window_ms=args.window_ms,
+        hop_ms=args.hop_ms,
+        max_batch=args.max_batch,
+    )
+    print(summarize(result, args.budget_ms))
+    if args.out_csv:
+        import pandas as pd
+
+        pd.DataFrame({k: v for k, v in result.items() if k != "wall_s"}).to_csv(args.out_csv, index=False)
+        print("Saved per-window latencies to", args.out_csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+server.py
+
+Asyncio HTTP inference server with request micro-batching (stdlib only).
+
+Clients POST one window's feature vector per request; `MicroBatcher`
+coalesces concurrent requests into batches. A batch closes when it holds
+--max-batch rows or --max-wait-ms after its first request, whichever comes
+first, and then takes one vectorized predict + explain call
+(`Predictor.infer`). Results go back to each waiting request. Scoring runs
+on one worker thread so the event loop keeps accepting and parsing
+requests, and the next batch fills while the current one is scored. With
+the default --max-wait-ms 0 a batch is whatever queued up meanwhile, so a
+lone request is not delayed; a positive deadline trades that latency for
+larger batches when the worker would otherwise be idle. --max-batch 1 gives
+the unbatched path (one predict + explain per request).
+
+Endpoints:
+ - POST /predict  {"features": {name: value, ...} | [v1, v2, ...], "session_id": optional}
+                  -> {"session_id", "proba", "high_load", "explanation": [{"feature", "shap"}, ...]}
+ - GET  /health   -> {"status": "ok"}
+ - GET  /stats    -> requests, batches, mean batch size
+
+HTTP/1.1 keep-alive is supported; bodies must carry Content-Length (a bad
+value gets 400, more than MAX_BODY_BYTES gets 413, and the connection is
+closed).
+
+Usage:
+    python server.py --model ../../models/tuned_random_forest_model.joblib --port 8000 --max-batch 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:  # package usage (src.inference.server)
+    from .predictor import EXPLAINERS, Predictor
+except ImportError:  # run as a script / imported by bare name
+    from predictor import EXPLAINERS, Predictor
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+# One window's feature vector is well under 1 KiB
+MAX_BODY_BYTES = 64 * 1024
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row requests into batched `Predictor.infer` calls.
+
+    Parameters
+    - predictor: Predictor
+    - max_batch: int -- rows per batch (1 = no batching)
+    - max_wait_ms: float -- how long a batch may wait for more rows after its
+      first (0 = take only the rows already queued)
+    """
+
+    def __init__(self, predictor: Predictor, max_batch: int = 64, max_wait_ms: float = 0.0):
+        self.predictor = predictor
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue: asyncio.Queue = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="infer")
+        self.task = None
+        self.n_requests = 0
+        self.n_batches = 0
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=True)
+
+    async def submit(self, row: np.ndarray):
+        """Score one row; resolves to (proba, top feature indices, top values)."""
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, fut))
+        return await fut
+
+    async def _collect(self):
+        """Wait for a first request, then fill the batch until full or the deadline."""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            X = np.vstack([row for row, _ in batch])
+            try:
+                res = await loop.run_in_executor(self.executor, self.predictor.infer, X)
+            except Exception as e:  # fail the batch, keep serving
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            self.n_requests += len(batch)
+            self.n_batches += 1
+            for i, (_, fut) in enumerate(batch):
+                if not fut.done():  # client may have gone away
+                    fut.set_result((float(res.proba[i]), res.top_features[i], res.top_values[i]))
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.n_requests,
+            "batches": self.n_batches,
+            "mean_batch_size": self.n_requests / self.n_batches if self.n_batches else 0.0,
+            "max_batch": self.max_batch,
+            "max_wait_ms": 1000.0 * self.max_wait,
+        }
+
+
+class InferenceServer:
+    """HTTP front end: parses requests, hands rows to the MicroBatcher.
+
+    Parameters
+    - batcher: MicroBatcher
+    - threshold: float -- probability at or above which `high_load` is true
+    - max_body: int -- largest request body accepted (larger ones get 413)
+    """
+
+    def __init__(self, batcher: MicroBatcher, threshold: float = 0.5, max_body: int = MAX_BODY_BYTES):
+        self.batcher = batcher
+        self.threshold = threshold
+        self.max_body = max_body
+        names = batcher.predictor.feature_names
+        self.feature_names = names
+        self.index = {k: i for i, k in enumerate(names)}
+
+    def parse_row(self, payload) -> np.ndarray:
+        """Feature vector from a request body; unknown names raise, missing ones are NaN."""
+        feats = payload.get("features") if isinstance(payload, dict) else None
+        n = len(self.feature_names)
+        if isinstance(feats, dict):
+            unknown = set(feats) - set(self.index)
+            if unknown:
+                raise ValueError(f"unknown features: {sorted(unknown)}")
+            row = np.full(n, np.nan)
+            for k, v in feats.items():
+                row[self.index[k]] = np.nan if v is None else float(v)
+            return row
+        if isinstance(feats, list):
+            if len(feats) != n:
+                raise ValueError(f"expected {n} feature values, got {len(feats)}")
+            return np.array([np.nan if v is None else float(v) for v in feats], dtype=np.float64)
+        raise ValueError('body must be {"features": {...} or [...]}')
+
+    async def predict(self, payload) -> dict:
+        row = self.parse_row(payload)
+        proba, top, values = await self.batcher.submit(row)
+        return {
+            "session_id": payload.get("session_id"),
+            "proba": proba,
+            "high_load": proba >= self.threshold,
+            "explanation": [
+                {"feature": self.feature_names[j], "shap": float(v)} for j, v in zip(top, values)
+            ],
+        }
+
+    async def route(self, method: str, path: str, body: bytes):
+        """(status, JSON-able response) for one request."""
+        if path == "/predict":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                payload = json.loads(body or b"{}")
+                return 200, await self.predict(payload)
+            except (ValueError, TypeError, AttributeError) as e:
+                return 400, {"error": str(e)}
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            return 200, self.batcher.stats()
+        return 404, {"error": f"no route {path}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 400, {"error": "request head too large"}, False)
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        k, v = line.split(":", 1)
+                        headers[k.strip().lower()] = v.strip()
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "bad Content-Length"}, False)
+                    break
+                if length > self.max_body:
+                    await self._respond(writer, 413, {"error": f"body over {self.max_body} bytes"}, False)
+                    break
+                body = await reader.readexactly(length)
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    status, resp = await self.route(method, target.split("?", 1)[0], body)
+                except Exception as e:
+                    status, resp = 500, {"error": repr(e)}
+                await self._respond(writer, status, resp, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, resp, keep_alive):
+        body = json.dumps(resp).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(predictor: Predictor, host="127.0.0.1", port=8000, max_batch=64, max_wait_ms=0.0, threshold=0.5):
+    """Run the server until cancelled."""
+    batcher = MicroBatcher(predictor, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    batcher.start()
+    app = InferenceServer(batcher, threshold=threshold)
+    server = await asyncio.start_server(app.handle, host, port, backlog=1024)
+    print(f"Serving on http://{host}:{port} (max batch {max_batch}, max wait {max_wait_ms:g} ms)", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP inference server.")
+    parser.add_argument("--model", type=str, default="../../models/tuned_random_forest_model.joblib")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=64, help="Requests per predict + explain call (1 = unbatched)")
+    parser.add_argument("--max-wait-ms", type=float, default=0.0, help="Max time a batch waits for more requests (0 = only those already queued)")
+    parser.add_argument("--explain", choices=EXPLAINERS, default="topk")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument(
+        "--feature-names",
+        type=str,
+        default=None,
+        help="Comma-separated model input columns (default: compute_features.REQUIRED_FEATURES)",
+    )
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.feature_names.split(",")] if args.feature_names else None
+    predictor = Predictor.from_artifact(
+        os.path.abspath(args.model), feature_names=names, explain=args.explain, k=args.k
+    )
+    try:
+        asyncio.run(
+            serve(predictor, args.host, args.port, args.max_batch, args.max_wait_ms, args.threshold)
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+session_store.py
+
+Bounded in-memory store of per-session inference state.
+
+Every live session owns one slot, i.e. one row of a set of preallocated
+NumPy columns (struct-of-arrays), so a record costs a few hundred bytes
+and no Python objects beyond its index entry:
+
+ - features      : last window's feature vector (float32, NaN until set)
+ - n_windows     : windows scored so far
+ - proba         : ring of the last `history` High_Load probabilities
+ - top_features  : feature indices of the last explanation (-1 = none)
+ - ewma, state, dwell : hysteresis state (docs/ADAPTATION.md, section 3),
+   owned by the adaptation controller
+ - created, last_seen : clock of the session's first / latest update
+
+Session ids map to slots through an OrderedDict kept in recency order, so
+lookup, touch and LRU eviction are O(1). A session not seen for `ttl_s`
+seconds is expired; when the store is full (`max_sessions`, or the number of
+records that fit in `max_bytes`) the least recently used one is evicted.
+Columns grow geometrically up to that capacity, so an idle store stays small.
+
+The store keeps the outputs of each window, not the raw event window itself
+(that is the StreamingFeatureEngine's job while the session is active).
+
+Timestamps are seconds on any monotonic clock (default `time.monotonic`);
+TTL expiry walks the LRU order, which assumes `now` never goes backwards.
+
+Usage:
+    python session_store.py --sessions 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Hashable, Iterable, List, Optional
+
+import numpy as np
+
+try:  # package usage (src.inference.session_store)
+    from ..data_preparation.compute_features import REQUIRED_FEATURES
+except ImportError:  # run as a script / imported by bare name
+    HERE = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.join(HERE, "..", "data_preparation"))
+    from compute_features import REQUIRED_FEATURES
+
+LOW_LOAD, HIGH_LOAD = 0, 1
+
+# Python-side cost per session: OrderedDict entry + links and the id object
+# (~150 bytes measured with tracemalloc for short str ids)
+INDEX_BYTES = 160
+
+
+class SessionRecord:
+    """Read view of one session's slot (invalid once the session is evicted)."""
+
+    __slots__ = ("store", "slot", "session_id")
+
+    def __init__(self, store: "SessionStore", slot: int, session_id: Hashable):
+        self.store = store
+        self.slot = slot
+        self.session_id = session_id
+
+    @property
+    def features(self) -> np.ndarray:
+        return self.store.features[self.slot]
+
+    @property
+    def n_windows(self) -> int:
+        return int(self.store.n_windows[self.slot])
+
+    @property
+    def recent_proba(self) -> np.ndarray:
+        """Up to `history` last probabilities, oldest first."""
+        return self.store.recent_proba(self.slot)
+
+    @property
+    def last_proba(self) -> float:
+        recent = self.recent_proba
+        return float(recent[-1]) if recent.size else float("nan")
+
+    @property
+    def top_features(self) -> np.ndarray:
+        top = self.store.top_features[self.slot]
+        return top[top >= 0]
+
+    @property
+    def ewma(self) -> float:
+        return float(self.store.ewma[self.slot])
+
+    @property
+    def state(self) -> int:
+        return int(self.store.state[self.slot])
+
+    @property
+    def dwell(self) -> int:
+        return int(self.store.dwell[self.slot])
+
+    @property
+    def last_seen(self) -> float:
+        return float(self.store.last_seen[self.slot])
+
+    def __repr__(self):
+        return (
+            f"SessionRecord({self.session_id!r}, n_windows={self.n_windows}, "
+            f"last_proba={self.last_proba:.3f}, state={self.state}, dwell={self.dwell})"
+        )
+
+
+class SessionStore:
+    """Fixed-budget session state with O(1) lookup, TTL and LRU eviction.
+
+    Parameters
+    - n_features: int -- feature vector length per window
+    - history: int -- probabilities kept per session
+    - k: int -- explanation feature indices kept per session
+    - ttl_s: float or None -- expire sessions idle for longer (None = never)
+    - max_sessions: int or None -- hard cap on live sessions
+    - max_bytes: int -- memory budget; caps sessions at max_bytes // bytes_per_session
+    - initial_capacity: int -- slots allocated up front
+    """
+
+    def __init__(
+        self,
+        n_features: int = len(REQUIRED_FEATURES),
+        history: int = 8,
+        k: int = 3,
+        ttl_s: Optional[float] = 1800.0,
+        max_sessions: Optional[int] = None,
+        max_bytes: int = 256 * 2**20,
+        initial_capacity: int = 4096,
+    ):
+        if history < 1 or history > np.iinfo(np.uint16).max:
+            raise ValueError(f"history must be in [1, 65535], got {history}")
+        self.n_features = n_features
+        self.history = history
+        self.k = k
+        self.ttl_s = ttl_s
+        row_bytes = sum(
+            np.dtype(dtype).itemsize * int(np.prod(shape)) for shape, dtype, _ in self._columns().values()
+        )
+        # + the reverse-map pointer in `ids`
+        self.bytes_per_session = row_bytes + 8 + INDEX_BYTES
+        capacity = max_bytes // self.bytes_per_session
+        if max_sessions is not None:
+            capacity = min(capacity, max_sessions)
+        if capacity < 1:
+            raise ValueError(f"max_bytes={max_bytes} holds no session ({self.bytes_per_session} bytes each)")
+        self.capacity = int(capacity)
+
+        self.index: "OrderedDict[Hashable, int]" = OrderedDict()  # least recent first
+        self.ids: List[Optional[Hashable]] = []
+        self.free: List[int] = []
+        self.n_allocated = 0
+        self.n_expired = 0
+        self.n_evicted = 0
+        self._allocate(min(initial_capacity, self.capacity))
+
+    def _columns(self):
+        """name -> (per-slot shape, dtype, fill of a free slot)"""
+        return {
+            "features": ((self.n_features,), np.float32, np.nan),
+            "proba": ((self.history,), np.float32, np.nan),
+            "head": ((), np.uint16, 0),
+            "n_windows": ((), np.uint32, 0),
+            "top_features": ((self.k,), np.int16, -1),
+            "ewma": ((), np.float32, np.nan),
+            "state": ((), np.int8, LOW_LOAD),
+            "dwell": ((), np.uint16, 0),
+            "created": ((), np.float64, np.nan),
+            "last_seen": ((), np.float64, np.nan),
+        }
+
+    def _allocate(self, n: int):
+        """Grow every column to n slots; new slots go on the free list."""
+        old = self.n_allocated
+        if n <= old:
+            return
+        for name, (shape, dtype, fill) in self._columns().items():
+            col = np.full((n,) + shape, fill, dtype=dtype)
+            if old:
+                col[:old] = getattr(self, name)
+            setattr(self, name, col)
+        self.ids.extend([None] * (n - old))
+        # Pop order hands out low slots first
+        self.free.extend(range(n - 1, old - 1, -1))
+        self.n_allocated = n
+
+    # -- bookkeeping -------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, session_id: Hashable) -> bool:
+        return session_id in self.index
+
+    @property
+    def nbytes(self) -> int:
+        """Allocated column bytes plus the estimated index cost of live sessions."""
+        cols = sum(getattr(self, name).nbytes for name in self._columns())
+        return cols + 8 * self.n_allocated + INDEX_BYTES * len(self)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self),
+            "capacity": self.capacity,
+            "allocated": self.n_allocated,
+            "mb": self.nbytes / 2**20,
+            "expired": self.n_expired,
+            "evicted": self.n_evicted,
+        }
+
+    def _release(self, slot: int):
+        self.ids[slot] = None
+        for name, (_, _, fill) in self._columns().items():
+            getattr(self, name)[slot] = fill
+        self.free.append(slot)
+
+    def _now(self, now: Optional[float]) -> float:
+        return time.monotonic() if now is None else now
+
+    # -- lookup / lifecycle ------------------------------------------------
+
+    def slot(self, session_id: Hashable) -> int:
+        """Slot of a live session, or -1; does not touch or expire it."""
+        return self.index.get(session_id, -1)
+
+    def get(self, session_id: Hashable, now: Optional[float] = None) -> Optional[SessionRecord]:
+        """The session's record (marking it recently used), or None if unknown or expired."""
+        slot = self.index.get(session_id)
+        if slot is None:
+            return None
+        now = self._now(now)
+        if self.ttl_s is not None and now - self.last_seen[slot] > self.ttl_s:
+            self.remove(session_id)
+            self.n_expired += 1
+            return None
+        self.index.move_to_end(session_id)
+        self.last_seen[slot] = now
+        return SessionRecord(self, slot, session_id)
+
+    def open(self, session_id: Hashable, now: Optional[float] = None, pinned: Optional[set] = None) -> int:
+        """Slot of the session, creating it (and evicting if full) when new; marks it used.
+
+        Slots in `pinned` (sessions already resolved for the same batch) are
+        never evicted to make room.
+        """
+        now = self._now(now)
+        slot = self.index.get(session_id)
+        if slot is not None:
+            if self.ttl_s is None or now - self.last_seen[slot] <= self.ttl_s:
+                self.index.move_to_end(session_id)
+                self.last_seen[slot] = now
+                return slot
+            self.remove(session_id)  # stale: start a fresh record
+            self.n_expired += 1
+        self.expire(now)
+        if len(self.index) >= self.capacity:
+            self._evict_lru(pinned)
+        if not self.free:
+            self._allocate(min(self.capacity, max(2 * self.n_allocated, 1)))
+        slot = self.free.pop()
+        self.index[session_id] = slot
+        self.ids[slot] = session_id
+        self.created[slot] = now
+        self.last_seen[slot] = now
+        return slot
+
+    def _evict_lru(self, pinned: Optional[set] = None):
+        """Drop the least recently used session whose slot is not pinned."""
+        for victim, slot in self.index.items():
+            if not pinned or slot not in pinned:
+                break
+        else:
+            raise ValueError(
+                f"batch holds more distinct sessions than the store's capacity ({self.capacity})"
+            )
+        del self.index[victim]
+        self._release(slot)
+        self.n_evicted += 1
+
+    def open_many(self, session_ids: Iterable[Hashable], now: Optional[float] = None) -> np.ndarray:
+        """`open` for a batch of ids: TTL check and clock update are vectorized.
+
+        Sessions of the batch are never evicted to make room for its new ones,
+        so distinct ids always get distinct slots.
+        """
+        now = self._now(now)
+        session_ids = list(session_ids)
+        index = self.index
+        slots = np.fromiter((index.get(s, -1) for s in session_ids), dtype=np.intp, count=len(session_ids))
+        known = slots >= 0
+        if self.ttl_s is not None and known.any():
+            known &= now - self.last_seen[np.where(known, slots, 0)] <= self.ttl_s
+        for i in np.flatnonzero(known):
+            index.move_to_end(session_ids[i])
+        self.last_seen[slots[known]] = now
+        # New and stale sessions, in batch order, through the slow path
+        new = np.flatnonzero(~known)
+        if new.size:
+            pinned = set(slots[known].tolist())
+            for i in new:
+                slots[i] = self.open(session_ids[i], now, pinned)
+                pinned.add(int(slots[i]))
+        return slots
+
+    def remove(self, session_id: Hashable) -> bool:
+        """Drop a session (e.g. on session end); False if it was not present."""
+        slot = self.index.pop(session_id, None)
+        if slot is None:
+            return False
+        self._release(slot)
+        return True
+
+    def expire(self, now: Optional[float] = None) -> List[Hashable]:
+        """Drop every session idle for more than ttl_s; returns their ids."""
+        if self.ttl_s is None:
+            return []
+        cutoff = self._now(now) - self.ttl_s
+        expired = []
+        while self.index:
+            session_id = next(iter(self.index))
+            slot = self.index[session_id]
+            if self.last_seen[slot] >= cutoff:
+                break
+            del self.index[session_id]
+            self._release(slot)
+            expired.append(session_id)
+        self.n_expired += len(expired)
+        return expired
+
+    # -- updates -----------------------------------------------------------
+
+    def update(
+        self,
+        session_id: Hashable,
+        features=None,
+        proba: Optional[float] = None,
+        top_features=None,
+        now: Optional[float] = None,
+    ) -> int:
+        """Record one scored window for a session (created if new); returns its slot."""
+        slot = self.open(session_id, now)
+        self._write(slot, features, proba, top_features)
+        return slot
+
+    def _write(self, slot: int, features=None, proba=None, top_features=None):
+        if features is not None:
+            self.features[slot] = features
+        if proba is not None:
+            h = int(self.head[slot])
+            self.proba[slot, h] = proba
+            self.head[slot] = (h + 1) % self.history
+            self.n_windows[slot] += 1
+        if top_features is not None:
+            top = np.asarray(top_features)[: self.k]
+            self.top_features[slot] = -1
+            self.top_features[slot, : top.size] = top
+
+    def update_many(
+        self,
+        session_ids: Iterable[Hashable],
+        features=None,
+        proba=None,
+        top_features=None,
+        now: Optional[float] = None,
+    ) -> np.ndarray:
+        """`update` for a scored batch: one index lookup per row, then vectorized writes.
+
+        Parameters
+        - session_ids: one id per row
+        - features: (n, n_features) array or None
+        - proba: (n,) array or None
+        - top_features: (n, <=k) int array or None
+        - now: float or None
+
+        Returns
+        - (n,) slots of the rows' sessions
+
+        Raises ValueError if the batch has more distinct sessions than the
+        store's capacity (its own sessions are never evicted for it).
+        """
+        now = self._now(now)
+        slots = self.open_many(session_ids, now)
+        if np.unique(slots).size != slots.size:
+            # Repeated sessions must see each other's ring writes; apply in order
+            for i, slot in enumerate(slots):
+                self._write(
+                    slot,
+                    None if features is None else features[i],
+                    None if proba is None else proba[i],
+                    None if top_features is None else top_features[i],
+                )
+            return slots
+        if features is not None:
+            self.features[slots] = features
+        if proba is not None:
+            h = self.head[slots]
+            self.proba[slots, h] = proba
+            self.head[slots] = (h + 1) % self.history
+            self.n_windows[slots] += 1
+        if top_features is not None:
+            top = np.asarray(top_features)[:, : self.k]
+            self.top_features[slots] = -1
+            self.top_features[slots, : top.shape[1]] = top
+        return slots
+
+    def recent_proba(self, slot: int) -> np.ndarray:
+        """Last min(n_windows, history) probabilities of a slot, oldest first."""
+        n = min(int(self.n_windows[slot]), self.history)
+        h = int(self.head[slot])
+        return np.roll(self.proba[slot], -h)[self.history - n:]
+
+    def live_slots(self) -> np.ndarray:
+        """Slots of all live sessions, least recently used first."""
+        return np.fromiter(self.index.values(), dtype=np.intp, count=len(self.index))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a session store and report its footprint.")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--history", type=int, default=8)
+    parser.add_argument("--max-mb", type=float, default=256.0)
+    args = parser.parse_args()
+
+    store = SessionStore(history=args.history, max_bytes=int(args.max_mb * 2**20), ttl_s=None)
+    rng = np.random.default_rng(0)
+    ids = [f"s-{i:06d}" for i in range(args.sessions)]
+    t0 = time.perf_counter()
+    for start in range(0, args.sessions, 1024):
+        batch = ids[start:start + 1024]
+        store.update_many(
+            batch,
+            rng.random((len(batch), store.n_features), dtype=np.float32),
+            rng.random(len(batch)),
+            rng.integers(0, store.n_features, (len(batch), store.k)),
+        )
+    elapsed = time.perf_counter() - t0
+    print(f"{len(store)} sessions in {elapsed:.2f} s; {store.stats()}")
+    print(store.get(ids[-1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,4 +10,67 @@ Import examples:
     from src.interpretation.shap_analysis import compute_shap
     from src.interpretation.shap_clustering import cluster_shap
     from src.interpretation.feature_importance import extract_importance
+    from src.interpretation import ShapService, tree_shap_values
+
+Names and submodules are resolved lazily (module `__getattr__`), so e.g.
+`tree_shap_values` imports only tree_shap / forest_compiler (NumPy), not
+shap, sklearn or matplotlib.
 """
+
+import importlib
+
+# Submodules, and public name -> submodule defining it; both are imported on
+# first attribute access
+_SUBMODULES = {
+    "feature_importance",
+    "shap_analysis",
+    "shap_clustering",
+    "shap_service",
+    "shap_store",
+    "topk_explain",
+    "tree_shap",
+}
+_LAZY = {
+    # shap_clustering
+    "iter_chunks": "shap_clustering",
+    "fit_streaming": "shap_clustering",
+    "write_labels_streaming": "shap_clustering",
+    "plot_clusters": "shap_clustering",
+    # shap_service
+    "positive_class_shap": "shap_service",
+    "ShapService": "shap_service",
+    # shap_store
+    "ShapStore": "shap_store",
+    # topk_explain
+    "TopKExplanation": "topk_explain",
+    "TopKExplainer": "topk_explain",
+    # tree_shap
+    "PathTables": "tree_shap",
+    "expected_value": "tree_shap",
+    "tree_shap_values": "tree_shap",
+    "shap_sum": "tree_shap",
+}
+
+__all__ = sorted(_LAZY)
+
+
+def _load(module):
+    # The modules import their siblings package-relatively (falling back to
+    # the bare name `from tree_shap import ...` only when run as scripts),
+    # so each file is loaded once, as src.interpretation.<module>
+    return importlib.import_module(f".{module}", __name__)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return _load(name)
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_load(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | set(_LAZY))
@@ -8,6 +8,12 @@ Compute SHAP values for the tuned Random Forest model and save:
  - shap_values.npy
  - shap_feature_names.json
 
+With --store DIR the SHAP rows are also appended to a shap_store.py store
+(created on first use), indexed by participantId / task_id / session_ts.
+The store must have been created for the same feature columns in the same
+order. Rows whose key is already stored are skipped, so re-runs do not
+duplicate them; write to a new store after retraining.
+
 Usage:
     python shap_analysis.py \
         --model ../../models/tuned_random_forest_model.joblib \
@@ -25,6 +31,11 @@ import numpy as np
 import pandas as pd
 import shap
 
+try:  # package usage (src.interpretation.shap_analysis)
+    from .shap_service import positive_class_shap
+except ImportError:  # run as a script / imported by bare name
+    from shap_service import positive_class_shap
+
 
 def main():
     """Compute and save SHAP values and summary plots for a trained RF pipeline.
@@ -36,6 +47,12 @@ def main():
     parser.add_argument("--model", type=str, required=True)
     parser.add_argument("--csv", type=str, required=True)
     parser.add_argument("--outdir", type=str, required=True)
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="Also append the SHAP rows to this shap_store.py directory",
+    )
     args = parser.parse_args()
 
     os.makedirs(args.outdir, exist_ok=True)
@@ -55,14 +72,30 @@ def main():
     transformed_X = model.named_steps["scaler"].transform(
         model.named_steps["imputer"].transform(X)
     )
-    # shap_values for binary classifiers are returned as an array for each class;
-    # index [1] corresponds to the positive class explanations.
-    shap_values = explainer.shap_values(transformed_X)[1]
+    # shap_values for binary classifiers come back per class (a list, or a
+    # trailing class axis in newer shap); keep the positive class explanations.
+    shap_values = positive_class_shap(explainer.shap_values(transformed_X))
 
     # Save SHAP data
     np.save(os.path.join(args.outdir, "shap_values.npy"), shap_values)
     with open(os.path.join(args.outdir, "shap_feature_names.json"), "w") as f:
         json.dump(feature_cols, f, indent=2)
+    if args.store:
+        try:
+            from .shap_store import ShapStore
+        except ImportError:
+            from shap_store import ShapStore
+
+        store = ShapStore.open_or_create(args.store, feature_cols)
+        session_ts = df["session_ts"].tolist() if "session_ts" in df.columns else None
+        # Re-runs over the same dataset must not duplicate rows
+        rows = store.append(
+            shap_values, df["participantId"].tolist(), df["task_id"].tolist(), session_ts, skip_existing=True
+        )
+        print(
+            f"Appended {len(rows)} rows to SHAP store {args.store} "
+            f"({len(df) - len(rows)} already stored, {len(store)} total)"
+        )
 
     # SHAP summary bar
     plt.figure(figsize=(10, 7))
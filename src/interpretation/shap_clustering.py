@@ -8,12 +8,21 @@ Saves:
  - shap_cluster_labels.csv
  - shap_clusters_pca.png
 
+With --stream the SHAP array is memory-mapped instead of loaded, the models
+are MiniBatchKMeans / IncrementalPCA fitted with partial_fit over chunks, and
+labels are assigned and appended to shap_cluster_labels.csv chunk by chunk,
+so archives larger than memory can be clustered. The PCA plot then shows a
+uniform sample of at most --plot-points rows. --store reads the rows from a
+shap_store.py directory, optionally only some --participants / --tasks.
+
 Usage:
     python shap_clustering.py \
         --shap-values ../../results/interpretation/shap_values.npy \
         --features ../../results/interpretation/shap_feature_names.json \
         --csv ../../data/processed/modeling_dataset.csv \
         --outdir ../../results/interpretation
+
+    python shap_clustering.py ... --stream --chunk-size 50000
 """
 
 import argparse
@@ -23,8 +32,107 @@ import os
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA, IncrementalPCA
+
+META_COLS = ["participantId", "task_id", "tlx", "High_Load"]
+
+
+def iter_chunks(n_rows: int, chunk_size: int):
+    """Yield consecutive row slices covering range(n_rows)."""
+    for start in range(0, n_rows, chunk_size):
+        yield slice(start, min(start + chunk_size, n_rows))
+
+
+def fit_streaming(
+    shap_values,
+    chunk_size: int = 50000,
+    n_clusters: int = 2,
+    n_epochs: int = 3,
+    random_state: int = 2025,
+):
+    """Fit MiniBatchKMeans and a 2-component IncrementalPCA over row chunks.
+
+    Parameters
+    - shap_values: array-like (n_rows, n_features), typically np.load(..., mmap_mode="r")
+    - chunk_size: int -- rows read per step
+    - n_clusters: int -- k-means clusters
+    - n_epochs: int -- passes of MiniBatchKMeans.partial_fit over the data
+    - random_state: int -- seed for k-means and the chunk visiting order
+
+    Returns
+    - (MiniBatchKMeans, IncrementalPCA)
+    """
+    n = shap_values.shape[0]
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3)
+    pca = IncrementalPCA(n_components=2)
+    chunks = list(iter_chunks(n, chunk_size))
+    rng = np.random.default_rng(random_state)
+    for epoch in range(n_epochs):
+        for i in rng.permutation(len(chunks)):
+            block = np.asarray(shap_values[chunks[i]], dtype=np.float64)
+            kmeans.partial_fit(block)
+            # IncrementalPCA needs at least n_components rows per call
+            if epoch == 0 and block.shape[0] >= pca.n_components:
+                pca.partial_fit(block)
+    return kmeans, pca
+
+
+def write_labels_streaming(
+    shap_values, meta, out_csv: str, kmeans, pca, chunk_size=50000, plot_points=20000
+):
+    """Assign clusters chunk by chunk, appending rows to `out_csv`.
+
+    `meta` is the metadata CSV path, read in the same chunks (only
+    META_COLS) so neither file is ever fully in memory, or a DataFrame with
+    one row per SHAP row.
+
+    Returns
+    - (labels_sample, comps_sample): labels and PCA coordinates of a uniform
+      random sample of at most `plot_points` rows, for plotting
+    """
+    n = shap_values.shape[0]
+    keep = min(plot_points, n)
+    sample = np.sort(np.random.default_rng(0).choice(n, size=keep, replace=False))
+    labels_sample = np.empty(keep, dtype=int)
+    comps_sample = np.empty((keep, 2))
+
+    if isinstance(meta, pd.DataFrame):
+        meta_chunks = (meta.iloc[sl] for sl in iter_chunks(len(meta), chunk_size))
+    else:
+        meta_chunks = pd.read_csv(meta, usecols=lambda c: c in META_COLS, chunksize=chunk_size)
+    if os.path.exists(out_csv):
+        os.remove(out_csv)
+    filled = 0
+    for sl, meta_chunk in zip(iter_chunks(n, chunk_size), meta_chunks):
+        if len(meta_chunk) != sl.stop - sl.start:
+            raise ValueError("metadata and the SHAP array have different row counts")
+        block = np.asarray(shap_values[sl], dtype=np.float64)
+        labels = kmeans.predict(block)
+        out = meta_chunk[[c for c in META_COLS if c in meta_chunk.columns]].copy()
+        out["shap_cluster"] = labels
+        out.to_csv(out_csv, mode="a", header=sl.start == 0, index=False)
+
+        lo, hi = np.searchsorted(sample, [sl.start, sl.stop])
+        if hi > lo:
+            local = sample[lo:hi] - sl.start
+            labels_sample[filled : filled + hi - lo] = labels[local]
+            comps_sample[filled : filled + hi - lo] = pca.transform(block[local])
+            filled += hi - lo
+    if filled != keep:
+        raise ValueError("metadata has fewer rows than the SHAP array")
+    return labels_sample, comps_sample
+
+
+def plot_clusters(comps, labels, out_path):
+    """Scatter the first two principal components, colored by cluster."""
+    plt.figure(figsize=(8, 7))
+    plt.scatter(comps[:, 0], comps[:, 1], c=labels, cmap="coolwarm", s=80, alpha=0.8)
+    plt.xlabel("PC1")
+    plt.ylabel("PC2")
+    plt.title("SHAP Clusters (PCA)")
+    plt.savefig(out_path)
+    plt.close()
 
 
 def main():
@@ -33,14 +141,68 @@ def main():
     This helps identify groups of examples with similar model explanations.
     """
     parser = argparse.ArgumentParser()
-    parser.add_argument("--shap-values", type=str, required=True)
-    parser.add_argument("--features", type=str, required=True)
-    parser.add_argument("--csv", type=str, required=True)
+    parser.add_argument("--shap-values", type=str, default=None)
+    parser.add_argument("--features", type=str, default=None)
+    parser.add_argument("--csv", type=str, default=None)
     parser.add_argument("--outdir", type=str, required=True)
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="Read SHAP rows from a shap_store.py directory instead of "
+        "--shap-values/--csv (implies --stream)",
+    )
+    parser.add_argument("--participants", nargs="+", default=None, help="With --store")
+    parser.add_argument("--tasks", nargs="+", default=None, help="With --store")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Memory-map the SHAP array and cluster it chunk by chunk",
+    )
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--n-epochs", type=int, default=3)
+    parser.add_argument("--plot-points", type=int, default=20000)
     args = parser.parse_args()
 
     os.makedirs(args.outdir, exist_ok=True)
 
+    if args.store is None and not (args.shap_values and args.csv):
+        parser.error("--shap-values and --csv are required without --store")
+
+    if args.store or args.stream:
+        if args.store:
+            try:
+                from .shap_store import ShapStore
+            except ImportError:
+                from shap_store import ShapStore
+
+            store = ShapStore(args.store)
+            if args.participants is None and args.tasks is None:
+                shap_values, meta = store.values(), store.index
+            else:
+                rows = store.rows(args.participants, args.tasks)
+                if rows.size == 0:
+                    parser.error("no stored SHAP rows match --participants / --tasks")
+                shap_values, meta = store.values()[rows], store.index.iloc[rows]
+            meta = meta[[c for c in META_COLS if c in meta.columns]].reset_index(drop=True)
+        else:
+            shap_values, meta = np.load(args.shap_values, mmap_mode="r"), args.csv
+        kmeans, pca = fit_streaming(
+            shap_values, chunk_size=args.chunk_size, n_epochs=args.n_epochs
+        )
+        labels, comps = write_labels_streaming(
+            shap_values,
+            meta,
+            os.path.join(args.outdir, "shap_cluster_labels.csv"),
+            kmeans,
+            pca,
+            chunk_size=args.chunk_size,
+            plot_points=args.plot_points,
+        )
+        plot_clusters(comps, labels, os.path.join(args.outdir, "shap_clusters_pca.png"))
+        print("Saved cluster labels and PCA plot in:", args.outdir)
+        return
+
     shap_values = np.load(args.shap_values)
     df = pd.read_csv(args.csv)
 
@@ -57,13 +219,7 @@ def main():
     pca = PCA(n_components=2)
     comps = pca.fit_transform(shap_values)
 
-    plt.figure(figsize=(8, 7))
-    plt.scatter(comps[:, 0], comps[:, 1], c=labels, cmap="coolwarm", s=80, alpha=0.8)
-    plt.xlabel("PC1")
-    plt.ylabel("PC2")
-    plt.title("SHAP Clusters (PCA)")
-    plt.savefig(os.path.join(args.outdir, "shap_clusters_pca.png"))
-    plt.close()
+    plot_clusters(comps, labels, os.path.join(args.outdir, "shap_clusters_pca.png"))
 
     print("Saved cluster labels and PCA plot in:", args.outdir)
 
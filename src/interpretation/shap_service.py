@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+shap_service.py
+
+Long-lived SHAP explanation service for per-prediction explanations.
+
+`ShapService` is built once per model artifact: the fitted pipeline is loaded,
+the `shap.TreeExplainer` for its RandomForest is constructed a single time, and
+every request only runs imputer -> scaler on its own rows and TreeSHAP on the
+rows it has not seen before.
+
+Explanations are cached in an LRU keyed on the quantized, scaled feature vector
+(`resolution` standard deviations per step). Consecutive windows of the same
+session are often identical or nearly so; they then share one explanation.
+It is exact for the first row that filled the slot; later rows in the same
+cell get that row's values, which differ from their own only when a split
+threshold falls inside the cell. `resolution=0` disables quantization (exact
+keys only).
+
+Usage:
+    python shap_service.py \
+        --model ../../models/tuned_random_forest_model.joblib \
+        --csv ../../data/processed/modeling_dataset.csv
+"""
+
+import argparse
+import os
+import time
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+import shap
+
+
+def positive_class_shap(shap_values, positive_index: int = 1) -> np.ndarray:
+    """Select the positive-class SHAP matrix from TreeExplainer output.
+
+    Older shap releases return one (n, d) array per class; newer ones return a
+    single (n, d, n_classes) array.
+    """
+    if isinstance(shap_values, list):
+        return np.asarray(shap_values[positive_index])
+    shap_values = np.asarray(shap_values)
+    if shap_values.ndim == 3:
+        return shap_values[:, :, positive_index]
+    return shap_values
+
+
+class ShapService:
+    """Cached TreeSHAP explainer for one fitted imputer -> scaler -> rf pipeline.
+
+    Parameters
+    - model: fitted sklearn Pipeline with `rf` (and optionally `imputer` /
+      `scaler`) steps, or a fitted RandomForestClassifier
+    - cache_size: int -- max cached explanations (0 disables the cache)
+    - resolution: float -- quantization step, in scaled (z-score) units
+    - positive_index: int -- class column to explain (1 = High_Load)
+    """
+
+    def __init__(
+        self,
+        model,
+        cache_size: int = 4096,
+        resolution: float = 1e-3,
+        positive_index: int = 1,
+    ):
+        steps = dict(model.named_steps) if hasattr(model, "named_steps") else {"rf": model}
+        self.model = model
+        self.imputer = steps.get("imputer")
+        self.scaler = steps.get("scaler")
+        self.explainer = shap.TreeExplainer(steps["rf"])
+        self.cache_size = int(cache_size)
+        self.resolution = float(resolution)
+        self.positive_index = positive_index
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_artifact(cls, path: str, **kwargs) -> "ShapService":
+        """Load a joblib pipeline once and wrap it."""
+        return cls(joblib.load(path), **kwargs)
+
+    @property
+    def expected_value(self) -> float:
+        ev = np.atleast_1d(self.explainer.expected_value)
+        return float(ev[self.positive_index] if ev.shape[0] > 1 else ev[0])
+
+    def transform(self, X) -> np.ndarray:
+        """Run only imputer -> scaler on the request rows."""
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        if self.imputer is not None:
+            X = self.imputer.transform(X)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return X
+
+    def _keys(self, Xt: np.ndarray):
+        if self.resolution > 0:
+            q = np.round(Xt / self.resolution).astype(np.int64)
+        else:
+            q = np.ascontiguousarray(Xt)
+        return [row.tobytes() for row in q]
+
+    def explain(self, X) -> np.ndarray:
+        """Positive-class SHAP values, shape (n_rows, n_features), for raw rows.
+
+        All cache misses in the batch (deduplicated) are explained with a
+        single TreeExplainer call.
+        """
+        Xt = self.transform(X)
+        if self.cache_size <= 0:
+            self.misses += Xt.shape[0]
+            return self._shap(Xt)
+
+        keys = self._keys(Xt)
+        out = np.empty(Xt.shape, dtype=np.float64)
+        missing = OrderedDict()
+        for i, key in enumerate(keys):
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                out[i] = hit
+                self.hits += 1
+            else:
+                missing.setdefault(key, []).append(i)
+        if missing:
+            first_rows = [rows[0] for rows in missing.values()]
+            values = self._shap(Xt[first_rows])
+            for (key, rows), v in zip(missing.items(), values):
+                out[rows] = v
+                self._cache[key] = v
+                self.misses += len(rows)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return out
+
+    def _shap(self, Xt: np.ndarray) -> np.ndarray:
+        sv = self.explainer.shap_values(Xt, check_additivity=False)
+        return positive_class_shap(sv, self.positive_index)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "cached": len(self._cache),
+        }
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+
+def main():
+    """Explain a CSV row by row through the service and report latency."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model", type=str, default="../../models/tuned_random_forest_model.joblib"
+    )
+    parser.add_argument(
+        "--csv", type=str, default="../../data/processed/modeling_dataset.csv"
+    )
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--resolution", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    service = ShapService.from_artifact(
+        os.path.abspath(args.model),
+        cache_size=args.cache_size,
+        resolution=args.resolution,
+    )
+    print(f"Built explainer in {1e3 * (time.perf_counter() - t0):.1f} ms")
+
+    df = pd.read_csv(os.path.abspath(args.csv))
+    drop_cols = {"participantId", "task_id", "tlx", "High_Load", "pred_proba_highload"}
+    feature_cols = [c for c in df.columns if c not in drop_cols]
+    X = df[feature_cols].values
+
+    lat = []
+    for row in X:
+        t0 = time.perf_counter()
+        service.explain(row)
+        lat.append(1e3 * (time.perf_counter() - t0))
+    p50, p99 = np.percentile(lat, [50, 99])
+    print(f"{len(X)} single-row explanations: p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+    print("Cache:", service.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+shap_store.py
+
+Append-only, memory-mapped SHAP value store.
+
+A store is a directory with:
+ - meta.json: feature names and row layout (float32, one fixed-width row per
+   explanation)
+ - values.f32: the rows, back to back, little-endian float32
+ - index.csv: one line per row: participantId, task_id, session_ts, row
+
+Appending writes the new rows at the end of values.f32 and then their index
+lines; existing bytes are never rewritten. Readers memory-map values.f32, so
+selecting one participant, task or session reads only those rows. The index is the
+source of truth for the row count: rows written to values.f32 without index
+lines (an interrupted append) are ignored and overwritten by the next append.
+
+A (participantId, task_id, session_ts) key may hold several rows (e.g. one
+per window of a session) and appending never replaces rows, so appending the
+same data twice duplicates it unless `append(..., skip_existing=True)` drops
+rows whose key is already indexed.
+
+Usage:
+    python shap_store.py --store ../../results/interpretation/shap_store \
+        --from-npy ../../results/interpretation/shap_values.npy \
+        --features ../../results/interpretation/shap_feature_names.json \
+        --csv ../../data/processed/modeling_dataset.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+STORE_FORMAT = 1
+INDEX_COLS = ["participantId", "task_id", "session_ts", "row"]
+DTYPE = np.dtype("<f4")
+
+
+class ShapStore:
+    """Append-only float32 SHAP rows with a (participant, task, session) index.
+
+    Use `ShapStore.create(path, feature_names)` for a new store,
+    `ShapStore(path)` to open an existing one, and
+    `ShapStore.open_or_create(path, feature_names)` to do either with a
+    feature-name check.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != STORE_FORMAT:
+            raise ValueError(f"unsupported SHAP store format in {path}")
+        self.feature_names: List[str] = meta["feature_names"]
+        self.n_features = len(self.feature_names)
+        self.row_bytes = self.n_features * DTYPE.itemsize
+        self._index: Optional[pd.DataFrame] = None
+        self._keys: Optional[set] = None
+
+    @classmethod
+    def create(cls, path: str, feature_names: Sequence[str], overwrite: bool = False):
+        """Create an empty store at `path`."""
+        if os.path.exists(os.path.join(path, "meta.json")) and not overwrite:
+            raise FileExistsError(f"SHAP store already exists at {path}")
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(
+                {"format": STORE_FORMAT, "dtype": DTYPE.str, "feature_names": list(feature_names)},
+                f,
+                indent=2,
+            )
+        open(os.path.join(path, "values.f32"), "wb").close()
+        with open(os.path.join(path, "index.csv"), "w", newline="") as f:
+            csv.writer(f).writerow(INDEX_COLS)
+        return cls(path)
+
+    @classmethod
+    def open_or_create(cls, path: str, feature_names: Sequence[str]) -> "ShapStore":
+        """Open the store at `path`, or create it; its features must match `feature_names`.
+
+        Raises ValueError if an existing store has other feature names or
+        another column order, whose rows could not be appended safely.
+        """
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            return cls.create(path, feature_names)
+        store = cls(path)
+        if store.feature_names != list(feature_names):
+            raise ValueError(
+                f"SHAP store {path} holds features {store.feature_names}, "
+                f"not {list(feature_names)}; use a new store for this model"
+            )
+        return store
+
+    # -- index -----------------------------------------------------------
+
+    @property
+    def index(self) -> pd.DataFrame:
+        """The sidecar index (read once, extended by each append)."""
+        if self._index is None:
+            self._index = pd.read_csv(
+                os.path.join(self.path, "index.csv"),
+                dtype={"participantId": str, "task_id": str, "session_ts": str},
+                keep_default_na=False,
+            )
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def keys(self) -> set:
+        """Set of indexed (participantId, task_id, session_ts) keys."""
+        if self._keys is None:
+            idx = self.index
+            self._keys = set(zip(idx["participantId"], idx["task_id"], idx["session_ts"]))
+        return self._keys
+
+    def rows(
+        self,
+        participants: Optional[Sequence[str]] = None,
+        tasks: Optional[Sequence[str]] = None,
+        session_ts: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """Row numbers matching the given participants, tasks and/or session_ts, in append order."""
+        idx = self.index
+        mask = np.ones(len(idx), dtype=bool)
+        if participants is not None:
+            mask &= idx["participantId"].isin([str(p) for p in participants]).to_numpy()
+        if tasks is not None:
+            mask &= idx["task_id"].isin([str(t) for t in tasks]).to_numpy()
+        if session_ts is not None:
+            mask &= idx["session_ts"].isin([str(t) for t in session_ts]).to_numpy()
+        return idx["row"].to_numpy()[mask]
+
+    def lookup(self, participant, task, session_ts="") -> np.ndarray:
+        """Row numbers stored under one (participantId, task_id, session_ts) key."""
+        if (str(participant), str(task), str(session_ts)) not in self.keys:
+            return np.empty(0, dtype=np.int64)
+        return self.rows([participant], [task], [session_ts])
+
+    # -- values ----------------------------------------------------------
+
+    def values(self) -> np.ndarray:
+        """Read-only memmap of all indexed rows, shape (len(store), n_features)."""
+        n = len(self)
+        if n == 0:
+            return np.empty((0, self.n_features), dtype=DTYPE)
+        return np.memmap(
+            os.path.join(self.path, "values.f32"),
+            dtype=DTYPE,
+            mode="r",
+            shape=(n, self.n_features),
+        )
+
+    def load(
+        self,
+        participants: Optional[Sequence[str]] = None,
+        tasks: Optional[Sequence[str]] = None,
+        session_ts: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """SHAP rows for a participant / task / session slice, reading only those rows."""
+        return np.asarray(self.values()[self.rows(participants, tasks, session_ts)])
+
+    # -- appending -------------------------------------------------------
+
+    def append(
+        self, shap_values, participant_ids, task_ids, session_ts=None, skip_existing: bool = False
+    ) -> np.ndarray:
+        """Append rows and their index entries; returns the new row numbers.
+
+        Parameters
+        - shap_values: array-like (n, n_features)
+        - participant_ids, task_ids: sequences of length n
+        - session_ts: sequence of length n or None (stored as empty)
+        - skip_existing: bool -- drop rows whose (participant, task, session_ts)
+          key is already in the store (e.g. when an analysis is re-run)
+        """
+        block = np.ascontiguousarray(np.atleast_2d(shap_values), dtype=DTYPE)
+        n = block.shape[0]
+        if block.shape[1] != self.n_features:
+            raise ValueError(f"expected {self.n_features} features, got {block.shape[1]}")
+        if len(participant_ids) != n or len(task_ids) != n:
+            raise ValueError("participant_ids and task_ids must have one entry per row")
+        if session_ts is None:
+            session_ts = [""] * n
+        keys = list(
+            zip(
+                [str(p) for p in participant_ids],
+                [str(t) for t in task_ids],
+                ["" if s is None else str(s) for s in session_ts],
+            )
+        )
+        if skip_existing:
+            keep = [i for i, k in enumerate(keys) if k not in self.keys]
+            if len(keep) < n:
+                block, keys, n = block[keep], [keys[i] for i in keep], len(keep)
+            if n == 0:
+                return np.empty(0, dtype=np.int64)
+
+        start = len(self)
+        with open(os.path.join(self.path, "values.f32"), "r+b") as f:
+            # Drop any tail left by an interrupted append before writing
+            f.truncate(start * self.row_bytes)
+            f.seek(start * self.row_bytes)
+            f.write(block.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        rows = np.arange(start, start + n)
+        new = pd.DataFrame(
+            {
+                "participantId": [k[0] for k in keys],
+                "task_id": [k[1] for k in keys],
+                "session_ts": [k[2] for k in keys],
+                "row": rows,
+            },
+            columns=INDEX_COLS,
+        )
+        new.to_csv(os.path.join(self.path, "index.csv"), mode="a", header=False, index=False)
+        # Extend the cached index rather than re-reading the whole file
+        self._index = pd.concat([self.index, new], ignore_index=True)
+        if self._keys is not None:
+            self._keys.update(keys)
+        return rows
+
+
+def main():
+    """Create a store (if needed) and append a saved shap_values.npy to it."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", type=str, required=True)
+    parser.add_argument("--from-npy", type=str, required=True)
+    parser.add_argument("--features", type=str, required=True)
+    parser.add_argument("--csv", type=str, required=True, help="Rows in the same order as the .npy")
+    parser.add_argument(
+        "--skip-existing",
+        action="store_true",
+        help="Do not append rows whose (participantId, task_id, session_ts) is already stored",
+    )
+    args = parser.parse_args()
+
+    with open(args.features) as f:
+        feature_names = json.load(f)
+    store = ShapStore.open_or_create(args.store, feature_names)
+
+    values = np.load(args.from_npy, mmap_mode="r")
+    df = pd.read_csv(args.csv)
+    session_ts = df["session_ts"].tolist() if "session_ts" in df.columns else None
+    rows = store.append(
+        values, df["participantId"].tolist(), df["task_id"].tolist(), session_ts, args.skip_existing
+    )
+    print(f"Appended {len(rows)} rows to {args.store} (now {len(store)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+topk_explain.py
+
+Approximate top-k explanations with early exit.
+
+The forest's SHAP values are the mean of its trees' SHAP values. The trees
+are shuffled once (fixed seed) and split into blocks; `TopKExplainer.explain`
+explains `min_blocks` blocks, then adds one block at a time, using exact
+TreeSHAP from tree_shap.py, and keeps for every row and feature:
+ - the running estimate (mean over the trees used so far)
+ - a confidence half-width from the spread of the block means (Student t
+   on b - 1 degrees of freedom after b blocks), with the finite-population
+   correction for sampling trees without replacement (0 once every tree is
+   used)
+
+The stopping rule is checked per row after every block: a row stops (and
+drops out of later blocks) as soon as its top-k features are separated from
+the rest: the smallest lower bound of |phi| in the top k is at least the
+largest upper bound outside it, or, with `tol`, once all its half-widths are
+below `tol`.
+The number of blocks used is bounded by `min_blocks` and `max_blocks`.
+`confidence`, `block_trees` and `tol` set the accuracy/latency trade-off;
+running all blocks gives the exact values.
+
+A TreeSHAP pass costs in proportion to the leaves it visits, so a row that
+settles after b of B blocks costs about b / B of exact TreeSHAP, also for a
+single row, plus a fixed per-block overhead (~1 ms) that dominates on small
+forests. bench_topk_explain.py reports both on a production-size forest.
+
+Usage:
+    python topk_explain.py \
+        --model ../../models/tuned_random_forest_model.joblib \
+        --csv ../../data/processed/modeling_dataset.csv --k 3
+"""
+
+import argparse
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy.stats import t as student_t
+
+try:  # package usage (src.interpretation.topk_explain)
+    from .tree_shap import PathTables, expected_value, shap_sum
+except ImportError:  # run as a script / imported by bare name
+    from tree_shap import PathTables, expected_value, shap_sum
+
+
+class TopKExplanation(NamedTuple):
+    """Top-k attributions per row.
+
+    - features: (n_rows, k) feature indices, by decreasing |phi|
+    - values: (n_rows, k) estimated SHAP values
+    - half_width: (n_rows, k) confidence half-widths of `values`
+    - trees_used: (n_rows,) number of trees each row's estimate is based on
+    - exact: (n_rows,) True where all trees were used (half-widths are 0)
+    """
+
+    features: np.ndarray
+    values: np.ndarray
+    half_width: np.ndarray
+    trees_used: np.ndarray
+    exact: np.ndarray
+
+
+class TopKExplainer:
+    """Block-wise TreeSHAP with a top-k stopping rule.
+
+    Parameters
+    - forest: CompiledForest with node covers
+    - block_trees: int -- trees per block (the unit of the spread estimate)
+    - class_index: int -- class to explain (1 = High_Load)
+    - seed: int -- tree shuffling seed (fixed, so results are reproducible)
+    """
+
+    def __init__(self, forest, block_trees: int = 25, class_index: int = 1, seed: int = 2025):
+        self.forest = forest
+        self.class_index = class_index
+        order = np.random.default_rng(seed).permutation(forest.n_trees)
+        self.block_roots: List[np.ndarray] = [
+            forest.roots[order[i : i + block_trees]] for i in range(0, forest.n_trees, block_trees)
+        ]
+        self.block_sizes = np.array([len(r) for r in self.block_roots])
+        self.base_value = float(expected_value(forest)[class_index])
+        # Path tables per stage (a run of blocks explained in one pass) and
+        # Student t quantiles, built once and reused by every call
+        self._stages: Dict[Tuple[int, int], PathTables] = {}
+        self._quantiles: Dict[Tuple[float, int], float] = {}
+        for start, stop in _stages(3, len(self.block_roots)):
+            self._tables(start, stop)
+
+    def _tables(self, start: int, stop: int) -> PathTables:
+        """Path tables for blocks [start, stop), labelled so shap_sum keeps their sums apart.
+
+        All blocks at once need no labels: no spread is estimated from them.
+        """
+        tables = self._stages.get((start, stop))
+        if tables is None:
+            roots = self.block_roots[start:stop]
+            labels = None
+            if stop - start < len(self.block_roots):
+                labels = np.repeat(np.arange(len(roots)), [len(r) for r in roots])
+            tables = PathTables(self.forest, roots=np.concatenate(roots), blocks=labels)
+            self._stages[(start, stop)] = tables
+        return tables
+
+    def _quantile(self, confidence: float, df: int) -> float:
+        q = self._quantiles.get((confidence, df))
+        if q is None:
+            q = self._quantiles[(confidence, df)] = float(student_t.ppf(0.5 + confidence / 2, df=df))
+        return q
+
+    def explain(
+        self,
+        X,
+        k: int = 3,
+        confidence: float = 0.95,
+        tol: float = 0.0,
+        min_blocks: int = 3,
+        max_blocks: Optional[int] = None,
+        transformed: bool = False,
+    ) -> TopKExplanation:
+        """Estimate the top-k features per row, stopping each row once its ranking is stable.
+
+        The first min_blocks blocks are explained in one pass, then one block
+        per pass; after every pass the stopping rule is checked for each
+        still-active row, and only the unsettled rows go on to the next block.
+
+        Parameters
+        - X: array-like (n_rows, n_features) -- raw rows (or transformed rows)
+        - k: int -- number of features to return
+        - confidence: float -- two-sided level of the half-widths
+        - tol: float -- also stop once every half-width is below this
+        - min_blocks, max_blocks: int -- bounds on the number of blocks used
+        - transformed: bool -- X already went through imputer / scaler
+
+        Returns
+        - TopKExplanation
+        """
+        forest = self.forest
+        Xt = np.array(X, dtype=np.float64, ndmin=2) if transformed else forest.transform(X)
+        n, n_features = Xt.shape
+        k = min(k, n_features)
+        n_blocks = len(self.block_roots)
+        max_blocks = n_blocks if max_blocks is None else min(max_blocks, n_blocks)
+        n_classes = forest.value.shape[1]
+
+        total = np.zeros((n, n_features))
+        # sum_b size_b * mean_b^2, for the spread of the block means
+        sq = np.zeros((n, n_features))
+        # No spread estimate from a single block
+        half = np.full((n, n_features), np.inf)
+        used = np.zeros(n, dtype=np.intp)
+        active = np.arange(n)
+        for start, b in _stages(min_blocks, max_blocks):
+            # Rows whose ranking is already settled drop out of later blocks
+            tables = self._tables(start, b)
+            sums = shap_sum(tables, Xt[active], n_classes, classes=[self.class_index])[:, :, 0]
+            sums = sums.reshape(len(active), tables.n_blocks, n_features)
+            sizes = self.block_sizes[start:b]
+            if tables.n_blocks == 1:
+                sizes = sizes.sum(keepdims=True)
+            total[active] += sums.sum(axis=1)
+            sq[active] += (sums**2 / sizes[None, :, None]).sum(axis=1)
+            used[active] += sizes.sum()
+            done_trees = used[active[0]]
+            if done_trees == forest.n_trees:
+                half[active] = 0.0
+                break
+            if b < 2:
+                continue
+            # Variance of the block means, then the standard error of their
+            # average, corrected for drawing trees without replacement
+            mean = total[active] / done_trees
+            var_block = np.maximum(sq[active] - done_trees * mean**2, 0.0) / (
+                done_trees * (b - 1) / b
+            )
+            fpc = 1.0 - done_trees / forest.n_trees
+            # Student t: early intervals rest on only b - 1 degrees of freedom
+            h = self._quantile(confidence, b - 1) * np.sqrt(var_block / b * fpc)
+            half[active] = h
+            settled = _separated(mean, h, k)
+            if tol > 0:
+                settled |= h.max(axis=1) < tol
+            active = active[~settled]
+            if active.size == 0:
+                break
+
+        mean = total / np.maximum(used, 1)[:, None]
+        order = np.argsort(-np.abs(mean), axis=1, kind="stable")[:, :k]
+        rows = np.arange(n)[:, None]
+        return TopKExplanation(
+            features=order,
+            values=mean[rows, order],
+            half_width=half[rows, order],
+            trees_used=used,
+            exact=used == forest.n_trees,
+        )
+
+
+def _stages(min_blocks: int, max_blocks: int) -> List[Tuple[int, int]]:
+    """(start, stop) block ranges: the first max(min_blocks, 2), then one block each, up to max_blocks."""
+    first = min(max(min_blocks, 2), max_blocks)
+    return [(0, first)] + [(b, b + 1) for b in range(first, max_blocks)]
+
+
+def _separated(mean: np.ndarray, half: np.ndarray, k: int) -> np.ndarray:
+    """Per row: is the top-k set by |mean| separated from the rest by the bounds?"""
+    if k >= mean.shape[1]:
+        return np.ones(mean.shape[0], dtype=bool)
+    mag = np.abs(mean)
+    order = np.argsort(-mag, axis=1, kind="stable")
+    rows = np.arange(mean.shape[0])[:, None]
+    top, rest = order[:, :k], order[:, k:]
+    lower_top = (mag - half)[rows, top].min(axis=1)
+    upper_rest = (mag + half)[rows, rest].max(axis=1)
+    return lower_top >= upper_rest
+
+
+def main():
+    """Explain a CSV with top-k early exit and compare against exact TreeSHAP."""
+    import time
+
+    import joblib
+    import pandas as pd
+
+    try:
+        from ..modeling.forest_compiler import compile_pipeline
+        from .tree_shap import tree_shap_values
+    except ImportError:
+        from forest_compiler import compile_pipeline
+        from tree_shap import tree_shap_values
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model", type=str, default="../../models/tuned_random_forest_model.joblib"
+    )
+    parser.add_argument(
+        "--csv", type=str, default="../../data/processed/modeling_dataset.csv"
+    )
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--block-trees", type=int, default=25)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    args = parser.parse_args()
+
+    forest = compile_pipeline(joblib.load(os.path.abspath(args.model)))
+    df = pd.read_csv(os.path.abspath(args.csv))
+    drop_cols = {"participantId", "task_id", "tlx", "High_Load", "pred_proba_highload"}
+    feature_cols = [c for c in df.columns if c not in drop_cols]
+    X = df[feature_cols].values
+
+    explainer = TopKExplainer(forest, block_trees=args.block_trees)
+    t0 = time.perf_counter()
+    res = explainer.explain(X, k=args.k, confidence=args.confidence)
+    dt = time.perf_counter() - t0
+    exact = tree_shap_values(forest, X)[:, :, 1]
+    exact_top = np.argsort(-np.abs(exact), axis=1, kind="stable")[:, : args.k]
+    agree = np.mean([set(a) == set(b) for a, b in zip(res.features, exact_top)])
+    print(
+        f"{len(X)} rows in {1e3 * dt:.1f} ms using {res.trees_used.mean():.0f}/"
+        f"{forest.n_trees} trees on average; "
+        f"top-{args.k} set agreement with exact: {agree:.2%}"
+    )
+    for j in range(args.k):
+        f = res.features[0, j]
+        print(f"  {feature_cols[f]:<28} {res.values[0, j]:+.4f} +/- {res.half_width[0, j]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,4 +11,68 @@ Import examples:
     from src.modeling.train_louo_random_forest import run_louo
     from src.modeling.baselines import run_baselines
     from src.modeling.hyperparameter_search import run_hyperparameter_search
+    from src.modeling import compile_pipeline, evaluate_louo
+
+Names and submodules are resolved lazily (module `__getattr__`), so e.g.
+`compile_pipeline` imports only forest_compiler (NumPy), not sklearn.
 """
+
+import importlib
+
+# Submodules, and public name -> submodule defining it; both are imported on
+# first attribute access
+_SUBMODULES = {
+    "baselines",
+    "evaluate_model",
+    "forest_compiler",
+    "hyperparameter_search",
+    "train_louo_random_forest",
+}
+_LAZY = {
+    # baselines
+    "evaluate_fold": "baselines",
+    "majority_baseline_predict": "baselines",
+    "run_baselines_louo": "baselines",
+    # evaluate_model
+    "fold_metrics": "evaluate_model",
+    "evaluate_louo": "evaluate_model",
+    "evaluate_louo_refit": "evaluate_model",
+    "save_fold_metrics_csv": "evaluate_model",
+    "save_feature_importances": "evaluate_model",
+    # forest_compiler
+    "CompiledForest": "forest_compiler",
+    "compile_pipeline": "forest_compiler",
+    # hyperparameter_search
+    "PARAM_GRID": "hyperparameter_search",
+    "GroupedSearchResult": "hyperparameter_search",
+    "run_grouped_grid_search": "hyperparameter_search",
+    "run_grouped_halving_search": "hyperparameter_search",
+    "run_grouped_warm_start_search": "hyperparameter_search",
+    # train_louo_random_forest
+    "DEFAULT_PARAMS": "train_louo_random_forest",
+    "build_pipeline_from_params": "train_louo_random_forest",
+}
+
+__all__ = sorted(_LAZY)
+
+
+def _load(module):
+    # The modules import their siblings package-relatively (falling back to
+    # the bare name `from evaluate_model import ...` only when run as scripts),
+    # so each file is loaded once, as src.modeling.<module>
+    return importlib.import_module(f".{module}", __name__)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return _load(name)
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_load(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | set(_LAZY))
@@ -7,15 +7,19 @@ Saves fold-level metrics and an aggregate summary, and can save feature importan
 
 Functions:
  - evaluate_louo(model, df, feature_cols, group_col='participantId', target_col='High_Load')
+ - evaluate_louo_refit(model, df, feature_cols, ..., n_workers=1)
  - save_fold_metrics_csv(metrics_df, out_path)
 """
 
 import os
-from typing import Any, Dict, List
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
 
 import joblib
 import numpy as np
 import pandas as pd
+from sklearn.base import clone
 from sklearn.metrics import (
     accuracy_score,
     f1_score,
@@ -52,6 +56,38 @@ def fold_metrics(y_true, y_pred, y_score=None):
     return m
 
 
+def _predict_with_score(model, X_test):
+    """Return (y_pred, y_score) where y_score is the positive-class score or None."""
+    y_pred = model.predict(X_test)
+    if hasattr(model, "predict_proba"):
+        y_score = model.predict_proba(X_test)[:, 1]
+    elif hasattr(model, "decision_function"):
+        y_score = model.decision_function(X_test)
+    else:
+        y_score = None
+    return y_pred, y_score
+
+
+def _record_fold(records, mis_list, fold, left_out, y_test, y_pred, y_score):
+    """Append one fold's metrics to `records` and its misclassifications to `mis_list`."""
+    m = fold_metrics(y_test, y_pred, y_score)
+    m["left_out"] = left_out
+    m["fold"] = fold
+    records.append(m)
+
+    # record misclassifications for analysis
+    for i, yi in enumerate(y_test):
+        if yi != int(y_pred[i]):
+            mis_list.append(
+                {
+                    "left_out": left_out,
+                    "test_idx_in_group": i,
+                    "true": int(yi),
+                    "pred": int(y_pred[i]),
+                }
+            )
+
+
 def evaluate_louo(
     model,
     df: pd.DataFrame,
@@ -80,41 +116,13 @@ def evaluate_louo(
 
         # If model isn't fitted yet, fit (but normally model should be pre-fit on full train set)
         try:
-            y_pred = model.predict(X_test)
-            if hasattr(model, "predict_proba"):
-                y_score = model.predict_proba(X_test)[:, 1]
-            elif hasattr(model, "decision_function"):
-                y_score = model.decision_function(X_test)
-            else:
-                y_score = None
+            y_pred, y_score = _predict_with_score(model, X_test)
         except Exception as e:
             # Fallback: fit on train split then predict
             model.fit(X_train, y_train)
-            y_pred = model.predict(X_test)
-            if hasattr(model, "predict_proba"):
-                y_score = model.predict_proba(X_test)[:, 1]
-            elif hasattr(model, "decision_function"):
-                y_score = model.decision_function(X_test)
-            else:
-                y_score = None
-
-        m = fold_metrics(y_test, y_pred, y_score)
-        m["left_out"] = left_out
-        m["fold"] = fold
-        records.append(m)
-
-        # record misclassifications for analysis
-        for i, yi in enumerate(y_test):
-            if yi != int(y_pred[i]):
-                mis_list.append(
-                    {
-                        "left_out": left_out,
-                        "test_idx_in_group": i,
-                        "true": int(yi),
-                        "pred": int(y_pred[i]),
-                    }
-                )
+            y_pred, y_score = _predict_with_score(model, X_test)
 
+        _record_fold(records, mis_list, fold, left_out, y_test, y_pred, y_score)
         fold += 1
 
     folds_df = pd.DataFrame(records)
@@ -122,6 +130,91 @@ def evaluate_louo(
     return folds_df, summary, mis_list
 
 
+# Per-process state for refit folds: the unfitted estimator and read-only
+# memmaps of X / y, set once by the pool initializer instead of per task.
+_FOLD_STATE: Dict[str, Any] = {}
+
+
+def _init_fold_worker(estimator, x_path: str, y_path: str):
+    _FOLD_STATE["estimator"] = estimator
+    _FOLD_STATE["X"] = np.load(x_path, mmap_mode="r")
+    _FOLD_STATE["y"] = np.load(y_path, mmap_mode="r")
+
+
+def _refit_fold(train_idx, test_idx):
+    """Fit a fresh clone on one fold's training rows and score its test rows."""
+    X, y = _FOLD_STATE["X"], _FOLD_STATE["y"]
+    est = clone(_FOLD_STATE["estimator"])
+    est.fit(X[train_idx], y[train_idx])
+    return _predict_with_score(est, X[test_idx])
+
+
+def evaluate_louo_refit(
+    model,
+    df: pd.DataFrame,
+    feature_cols: List[str],
+    group_col: str = "participantId",
+    target_col: str = "High_Load",
+    n_workers: int = 1,
+    tmp_dir: Optional[str] = None,
+):
+    """
+    Evaluate `model` under LOUO, refitting an unfitted clone on every fold.
+
+    Unlike `evaluate_louo`, the left-out participant is never seen in training.
+    With n_workers > 1 folds run in a process pool; X and y are written once to
+    .npy files in `tmp_dir` and every worker memory-maps the same read-only
+    copy, so only fold indices and predictions cross process boundaries.
+    Estimators with a fixed random_state give identical results for any
+    n_workers.
+
+    Parameters
+    - model: sklearn-like estimator (fitted or not; it is cloned per fold)
+    - n_workers: int -- worker processes (1 = serial, in-process)
+    - tmp_dir: str or None -- where to place the shared .npy files
+
+    Returns
+    - (folds_df, summary_dict, misclassifications_list), as `evaluate_louo`
+    """
+    X = np.ascontiguousarray(df[feature_cols].values)
+    y = df[target_col].values
+    groups = df[group_col].values
+    splits = list(LeaveOneGroupOut().split(X, y, groups))
+
+    records = []
+    mis_list = []
+
+    if n_workers <= 1:
+        _FOLD_STATE.update(estimator=model, X=X, y=y)
+        try:
+            results = [_refit_fold(tr, te) for tr, te in splits]
+        finally:
+            _FOLD_STATE.clear()
+    else:
+        with tempfile.TemporaryDirectory(dir=tmp_dir, prefix="louo_") as shared:
+            x_path = os.path.join(shared, "X.npy")
+            y_path = os.path.join(shared, "y.npy")
+            np.save(x_path, X)
+            np.save(y_path, y)
+            with ProcessPoolExecutor(
+                max_workers=min(n_workers, len(splits)),
+                initializer=_init_fold_worker,
+                initargs=(clone(model), x_path, y_path),
+            ) as pool:
+                futures = [pool.submit(_refit_fold, tr, te) for tr, te in splits]
+                results = [f.result() for f in futures]
+
+    for fold, ((train_idx, test_idx), (y_pred, y_score)) in enumerate(
+        zip(splits, results)
+    ):
+        left_out = groups[test_idx[0]]
+        _record_fold(records, mis_list, fold, left_out, y[test_idx], y_pred, y_score)
+
+    folds_df = pd.DataFrame(records)
+    summary = folds_df.mean(numeric_only=True).to_dict()
+    return folds_df, summary, mis_list
+
+
 def save_fold_metrics_csv(metrics_df: pd.DataFrame, out_path: str):
     """Save a fold-level metrics DataFrame to CSV, creating directories as needed."""
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
@@ -168,6 +261,14 @@ if __name__ == "__main__":
         "--csv", type=str, default="../../data/processed/modeling_dataset.csv"
     )
     parser.add_argument("--outdir", type=str, default="../../results/modeling")
+    parser.add_argument(
+        "--refit-folds",
+        action="store_true",
+        help="Refit a clone of the model on every LOUO training split",
+    )
+    parser.add_argument(
+        "--n-workers", type=int, default=1, help="Processes for --refit-folds"
+    )
     args = parser.parse_args()
 
     df = pd.read_csv(os.path.abspath(args.csv))
@@ -175,7 +276,12 @@ if __name__ == "__main__":
     feature_cols = [c for c in df.columns if c not in drop_cols]
 
     model = joblib.load(os.path.abspath(args.model))
-    folds_df, summary, mis = evaluate_louo(model, df, feature_cols)
+    if args.refit_folds:
+        folds_df, summary, mis = evaluate_louo_refit(
+            model, df, feature_cols, n_workers=args.n_workers
+        )
+    else:
+        folds_df, summary, mis = evaluate_louo(model, df, feature_cols)
     os.makedirs(args.outdir, exist_ok=True)
     folds_df.to_csv(
         os.path.join(args.outdir, "rf_fold_metrics_ultrarealistic.csv"), index=False
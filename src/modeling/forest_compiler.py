@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+forest_compiler.py
+
+Compile the fitted imputer -> scaler -> RandomForest pipeline into packed
+NumPy arrays and score batches directly from them.
+
+`compile_pipeline` exports:
+ - imputer medians (and the mask of columns SimpleImputer keeps)
+ - scaler mean_ / scale_
+ - every tree's nodes, concatenated: feature, threshold, left, right and the
+   normalized class distribution of each node
+ - node covers (weighted training samples), used by tree_shap.py
+
+`CompiledForest.predict_proba` walks all trees for all rows at once, one
+vectorized step per tree level, with no per-tree Python loop and no sklearn
+input validation. The compiled model is saved as a single .npz file and only
+needs NumPy to load, so inference workers do not have to import sklearn.
+
+Usage:
+    python forest_compiler.py \
+        --model ../../models/tuned_random_forest_model.joblib \
+        --out ../../models/tuned_random_forest_compiled.npz \
+        --csv ../../data/processed/modeling_dataset.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+COMPILED_FORMAT = 1
+
+
+class CompiledForest:
+    """Packed-array random forest with its preprocessing.
+
+    Parameters
+    - feature, threshold, left, right: per-node arrays for all trees; leaves
+      point to themselves so extra descent steps are no-ops
+    - value: (n_nodes, n_classes) class distribution per node
+    - roots: index of each tree's root node
+    - max_depth: deepest tree level
+    - classes: class labels, in predict_proba column order
+    - keep: bool mask of input columns kept by the imputer (None = all)
+    - impute: fill values for NaNs (None = no imputer)
+    - mean, scale: StandardScaler parameters (None = no scaler)
+    - cover: weighted training samples per node (needed only for TreeSHAP)
+    """
+
+    def __init__(
+        self,
+        feature,
+        threshold,
+        left,
+        right,
+        value,
+        roots,
+        max_depth,
+        classes,
+        keep=None,
+        impute=None,
+        mean=None,
+        scale=None,
+        cover=None,
+    ):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.classes = np.asarray(classes)
+        self.keep = None if keep is None else np.asarray(keep, dtype=bool)
+        self.impute = None if impute is None else np.asarray(impute, dtype=np.float64)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.cover = None if cover is None else np.asarray(cover, dtype=np.float64)
+        # Interleaved (left, right) children so one gather picks the next node
+        self.children = np.ascontiguousarray(np.stack([self.left, self.right], axis=1).ravel())
+
+    @property
+    def n_trees(self) -> int:
+        return int(self.roots.shape[0])
+
+    # -- preprocessing ---------------------------------------------------
+
+    def transform(self, X) -> np.ndarray:
+        """Apply imputer and scaler exactly as the fitted pipeline does."""
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        if self.impute is not None:
+            if self.keep is not None:
+                X = X[:, self.keep]
+            nan = np.isnan(X)
+            if nan.any():
+                X[nan] = np.broadcast_to(self.impute, X.shape)[nan]
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return X.astype(np.float32).astype(np.float64)
+
+    # -- scoring ---------------------------------------------------------
+
+    def apply(self, Xt: np.ndarray) -> np.ndarray:
+        """Leaf node index per (tree, row) for already-transformed rows."""
+        n, d = Xt.shape
+        flat = Xt.ravel()
+        row_offset = np.arange(n, dtype=np.intp) * d
+        idx = np.repeat(self.roots[:, None], n, axis=1)
+        for _ in range(self.max_depth):
+            # np.take on flat arrays is markedly cheaper than fancy indexing
+            x = flat.take(row_offset + self.feature.take(idx))
+            go_right = x > self.threshold.take(idx)
+            idx = self.children.take(2 * idx + go_right)
+        return idx
+
+    def predict_proba(self, X, chunk_rows: int = 256) -> np.ndarray:
+        """Class probabilities, averaged over trees like RandomForestClassifier.
+
+        Rows are scored `chunk_rows` at a time so the (trees x rows) index
+        arrays stay cache-sized for large batches.
+        """
+        Xt = self.transform(X)
+        out = np.empty((Xt.shape[0], self.value.shape[1]), dtype=np.float64)
+        for start in range(0, Xt.shape[0], chunk_rows):
+            leaves = self.apply(Xt[start : start + chunk_rows])
+            out[start : start + chunk_rows] = self.value[leaves].mean(axis=0)
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    # -- persistence -----------------------------------------------------
+
+    def save(self, path: str):
+        """Write all arrays to a single .npz file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        optional = {
+            k: getattr(self, k)
+            for k in ("keep", "impute", "mean", "scale", "cover")
+            if getattr(self, k) is not None
+        }
+        np.savez(
+            path,
+            format=COMPILED_FORMAT,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            max_depth=self.max_depth,
+            classes=self.classes,
+            **optional,
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path, allow_pickle=False) as z:
+            if int(z["format"]) != COMPILED_FORMAT:
+                raise ValueError(f"unsupported compiled forest format in {path}")
+            kw = {k: z[k] for k in z.files if k != "format"}
+        return cls(**kw)
+
+
+def _pack_trees(estimators):
+    """Concatenate fitted sklearn trees into shared node arrays."""
+    features, thresholds, lefts, rights, values, covers, roots = [], [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for est in estimators:
+        t = est.tree_
+        n = t.node_count
+        node = np.arange(n)
+        leaf = t.children_left == -1
+        features.append(np.where(leaf, 0, t.feature))
+        thresholds.append(np.where(leaf, 0.0, t.threshold))
+        lefts.append(np.where(leaf, node, t.children_left) + offset)
+        rights.append(np.where(leaf, node, t.children_right) + offset)
+        v = t.value[:, 0, :].astype(np.float64)
+        values.append(v / v.sum(axis=1, keepdims=True))
+        covers.append(t.weighted_n_node_samples)
+        roots.append(offset)
+        max_depth = max(max_depth, int(t.max_depth))
+        offset += n
+    return (
+        np.concatenate(features),
+        np.concatenate(thresholds),
+        np.concatenate(lefts),
+        np.concatenate(rights),
+        np.concatenate(values),
+        np.concatenate(covers),
+        np.asarray(roots),
+        max_depth,
+    )
+
+
+def compile_pipeline(model) -> CompiledForest:
+    """Compile a fitted Pipeline(imputer, scaler, rf) or a bare RandomForestClassifier.
+
+    Parameters
+    - model: fitted sklearn Pipeline with `rf` (and optionally `imputer` /
+      `scaler`) steps, or a fitted RandomForestClassifier
+
+    Returns
+    - CompiledForest
+    """
+    steps = dict(model.named_steps) if hasattr(model, "named_steps") else {"rf": model}
+    rf = steps["rf"]
+    if getattr(rf, "n_outputs_", 1) != 1:
+        raise ValueError("only single-output forests can be compiled")
+
+    keep = impute = mean = scale = None
+    imputer = steps.get("imputer")
+    if imputer is not None:
+        if getattr(imputer, "add_indicator", False):
+            raise ValueError("imputers with add_indicator are not supported")
+        stats = np.asarray(imputer.statistics_, dtype=np.float64)
+        keep = ~np.isnan(stats)
+        if getattr(imputer, "keep_empty_features", False):
+            keep[:] = True
+            stats = np.nan_to_num(stats, nan=0.0)
+        impute = stats[keep]
+    scaler = steps.get("scaler")
+    if scaler is not None:
+        if getattr(scaler, "with_mean", True) and scaler.mean_ is not None:
+            mean = scaler.mean_
+        if getattr(scaler, "with_std", True) and scaler.scale_ is not None:
+            scale = scaler.scale_
+
+    feature, threshold, left, right, value, cover, roots, max_depth = _pack_trees(
+        rf.estimators_
+    )
+    return CompiledForest(
+        feature,
+        threshold,
+        left,
+        right,
+        value,
+        roots,
+        max_depth,
+        rf.classes_,
+        keep=keep,
+        impute=impute,
+        mean=mean,
+        scale=scale,
+        cover=cover,
+    )
+
+
+def main():
+    """Compile a joblib model to .npz and optionally check it against predict_proba."""
+    import joblib
+    import pandas as pd
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model", type=str, default="../../models/tuned_random_forest_model.joblib"
+    )
+    parser.add_argument(
+        "--out", type=str, default="../../models/tuned_random_forest_compiled.npz"
+    )
+    parser.add_argument(
+        "--csv", type=str, default=None, help="Optional dataset to verify equivalence on"
+    )
+    args = parser.parse_args()
+
+    model = joblib.load(os.path.abspath(args.model))
+    compiled = compile_pipeline(model)
+    compiled.save(os.path.abspath(args.out))
+    print(
+        f"Saved compiled forest ({compiled.n_trees} trees, "
+        f"{compiled.feature.shape[0]} nodes, depth {compiled.max_depth}) to {args.out}"
+    )
+
+    if args.csv:
+        df = pd.read_csv(os.path.abspath(args.csv))
+        drop_cols = {"participantId", "task_id", "tlx", "High_Load"}
+        feature_cols = [c for c in df.columns if c not in drop_cols]
+        X = df[feature_cols].values
+        diff = np.abs(compiled.predict_proba(X) - model.predict_proba(X)).max()
+        print(f"Max |compiled - predict_proba| on {len(X)} rows: {diff:.3g}")
+
+
+if __name__ == "__main__":
+    main()
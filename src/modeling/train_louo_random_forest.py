@@ -2,9 +2,12 @@
 """
 train_louo_random_forest.py
 
-1) Optionally run hyperparameter search (calls hyperparameter_search.py)
+1) Optionally run hyperparameter search (calls hyperparameter_search.py), or
+   load the best params a previous search saved (--params-json)
 2) Trains a RandomForest on the full dataset using best params (or defaults)
-3) Evaluates with LOUO using evaluate_model.evaluate_louo()
+3) Evaluates with LOUO using evaluate_model.evaluate_louo(), or with
+   evaluate_louo_refit() (one refit per fold, folds in parallel) when
+   --refit-folds is given
 4) Saves model and results to models/ and results/
 
 Usage:
@@ -18,13 +21,26 @@ import os
 import joblib
 import numpy as np
 import pandas as pd
-from evaluate_model import evaluate_louo, save_feature_importances
-from hyperparameter_search import run_grouped_grid_search
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 
+try:  # package usage (src.modeling.train_louo_random_forest)
+    from .evaluate_model import evaluate_louo, evaluate_louo_refit, save_feature_importances
+    from .hyperparameter_search import (
+        run_grouped_grid_search,
+        run_grouped_halving_search,
+        run_grouped_warm_start_search,
+    )
+except ImportError:  # run as a script / imported by bare name
+    from evaluate_model import evaluate_louo, evaluate_louo_refit, save_feature_importances
+    from hyperparameter_search import (
+        run_grouped_grid_search,
+        run_grouped_halving_search,
+        run_grouped_warm_start_search,
+    )
+
 DEFAULT_PARAMS = {
     "rf__n_estimators": 300,
     "rf__max_depth": 12,
@@ -86,6 +102,32 @@ def main():
         "--grid-out", type=str, default="../../models/rf_grid_search.joblib"
     )
     parser.add_argument("--n-jobs", type=int, default=1)
+    parser.add_argument(
+        "--params-json",
+        type=str,
+        default=None,
+        help="Use the best params saved by hyperparameter_search.py "
+        "(rf_best_params.json) instead of searching again",
+    )
+    parser.add_argument(
+        "--search",
+        choices=["grid", "halving", "warm"],
+        default="grid",
+        help="With --do-search: exhaustive grid, successive halving over "
+        "n_estimators, or the grid with warm-started forest growth",
+    )
+    parser.add_argument(
+        "--refit-folds",
+        action="store_true",
+        help="LOUO: refit the pipeline on every training split instead of "
+        "scoring the full-data model",
+    )
+    parser.add_argument(
+        "--louo-workers",
+        type=int,
+        default=1,
+        help="Processes used for --refit-folds (folds run in parallel)",
+    )
     args = parser.parse_args()
 
     df = pd.read_csv(os.path.abspath(args.csv))
@@ -96,9 +138,18 @@ def main():
     os.makedirs(os.path.abspath(args.results_outdir), exist_ok=True)
 
     best_params = DEFAULT_PARAMS.copy()
-    if args.do_search:
+    if args.params_json:
+        with open(os.path.abspath(args.params_json)) as f:
+            best_params.update(json.load(f))
+        print("Using params from", args.params_json, ":", best_params)
+    elif args.do_search:
         print("Running grouped hyperparameter search (this may take time)...")
-        grid = run_grouped_grid_search(df, feature_cols, n_jobs=args.n_jobs)
+        if args.search == "halving":
+            grid = run_grouped_halving_search(df, feature_cols, n_jobs=args.n_jobs)
+        elif args.search == "warm":
+            grid = run_grouped_warm_start_search(df, feature_cols, n_jobs=args.n_jobs)
+        else:
+            grid = run_grouped_grid_search(df, feature_cols, n_jobs=args.n_jobs)
         # extract best params (GridSearchCV returns keys like 'rf__n_estimators')
         best_params = {k: v for k, v in grid.best_params_.items()}
         # save grid object
@@ -122,7 +173,15 @@ def main():
     print("Saved fitted model to", args.model_out)
 
     # Evaluate under LOUO
-    folds_df, summary, mis = evaluate_louo(pipeline, df, feature_cols)
+    if args.refit_folds:
+        folds_df, summary, mis = evaluate_louo_refit(
+            build_pipeline_from_params(best_params),
+            df,
+            feature_cols,
+            n_workers=args.louo_workers,
+        )
+    else:
+        folds_df, summary, mis = evaluate_louo(pipeline, df, feature_cols)
     folds_df.to_csv(
         os.path.join(args.results_outdir, "rf_fold_metrics_ultrarealistic.csv"),
         index=False,
@@ -10,36 +10,62 @@ Import examples:
     from utils.io_utils import read_json
     from utils.plot_utils import save_fig
     from utils.metrics import compute_fold_metrics
+
+Names are resolved lazily (module `__getattr__`): `from utils import
+read_json` imports only io_utils, so inference workers do not pay for
+matplotlib / seaborn / sklearn unless they use plot_utils or metrics.
 """
 
-from .io_utils import (
-    ensure_dir,
-    list_json_files,
-    load_all_json,
-    load_modeling_csv,
-    read_json,
-    save_df,
-    write_json,
-)
-from .metrics import aggregate_metrics, collect_misclassifications, compute_fold_metrics
-from .plot_utils import plot_bar, plot_confusion_matrix, plot_scatter, save_fig
-
-__all__ = [
+import importlib
+from typing import TYPE_CHECKING
+
+# public name -> submodule defining it, imported on first access
+_LAZY = {
     # io_utils
-    "ensure_dir",
-    "read_json",
-    "write_json",
-    "save_df",
-    "load_modeling_csv",
-    "list_json_files",
-    "load_all_json",
+    "ensure_dir": "io_utils",
+    "read_json": "io_utils",
+    "write_json": "io_utils",
+    "save_df": "io_utils",
+    "load_modeling_csv": "io_utils",
+    "list_json_files": "io_utils",
+    "load_all_json": "io_utils",
+    "iter_json_files": "io_utils",
     # plot_utils
-    "save_fig",
-    "plot_bar",
-    "plot_scatter",
-    "plot_confusion_matrix",
+    "save_fig": "plot_utils",
+    "plot_bar": "plot_utils",
+    "plot_scatter": "plot_utils",
+    "plot_confusion_matrix": "plot_utils",
     # metrics
-    "compute_fold_metrics",
-    "aggregate_metrics",
-    "collect_misclassifications",
-]
+    "compute_fold_metrics": "metrics",
+    "aggregate_metrics": "metrics",
+    "collect_misclassifications": "metrics",
+}
+
+__all__ = list(_LAZY)
+
+if TYPE_CHECKING:
+    from .io_utils import (
+        ensure_dir,
+        iter_json_files,
+        list_json_files,
+        load_all_json,
+        load_modeling_csv,
+        read_json,
+        save_df,
+        write_json,
+    )
+    from .metrics import aggregate_metrics, collect_misclassifications, compute_fold_metrics
+    from .plot_utils import plot_bar, plot_confusion_matrix, plot_scatter, save_fig
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -12,6 +12,8 @@ Used by:
 
 import json
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 import pandas as pd
@@ -89,15 +91,72 @@ def list_json_files(directory: str):
     return sorted(files)
 
 
-def load_all_json(directory: str):
-    """Load all JSON files under a root directory."""
+def _read_annotated(path: str):
+    """Worker used by the serial and pooled loaders.
+
+    Returns `(path, obj, error)` where exactly one of `obj`/`error` is set, so
+    failures travel back from worker processes as plain strings.
+    """
+    try:
+        x = read_json(path)
+        x["_source_file"] = path
+        return path, x, None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def iter_json_files(file_list, n_workers=1, backend="thread", max_in_flight=None):
+    """Parse `file_list` and yield `(path, obj, error)` tuples in input order.
+
+    This is the one JSON loader of the pipeline; data_preparation.load_data
+    (iter_raw, load_all_raw) goes through it too.
+
+    Parameters
+    - file_list: iterable[str] -- JSON paths to parse
+    - n_workers: int -- pool size; 1 (default) parses serially in-process
+    - backend: str -- "thread" or "process" pool
+    - max_in_flight: int or None -- upper bound on files submitted but not yet
+      yielded (defaults to 2 * n_workers); bounds peak memory of parsed objects
+
+    Returns
+    - iterator of (path, obj or None, error message or None), each obj
+      annotated with `_source_file`
+    """
+    if n_workers <= 1:
+        for p in file_list:
+            yield _read_annotated(p)
+        return
+
+    pools = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+    if backend not in pools:
+        raise ValueError(f"unknown backend {backend!r} (expected 'thread' or 'process')")
+
+    window = max(1, max_in_flight or 2 * n_workers)
+    with pools[backend](max_workers=n_workers) as pool:
+        pending = deque()
+        for p in file_list:
+            pending.append(pool.submit(_read_annotated, p))
+            # Yielding the oldest future first keeps output order deterministic
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_all_json(directory: str, n_workers=1, backend="thread", max_in_flight=None):
+    """Load all JSON files under a root directory.
+
+    Parameters
+    - directory: str -- root directory to recurse
+    - n_workers: int -- parallel parsers (1 = serial)
+    - backend: str -- "thread" or "process"
+    - max_in_flight: int or None -- bound on parsed-but-unconsumed files
+    """
     file_list = list_json_files(directory)
     data = []
-    for p in file_list:
-        try:
-            x = read_json(p)
-            x["_source_file"] = p
-            data.append(x)
-        except Exception as e:
-            print(f"WARNING: couldn't read {p}: {e}")
+    for p, x, err in iter_json_files(file_list, n_workers, backend, max_in_flight):
+        if err is not None:
+            print(f"WARNING: couldn't read {p}: {err}")
+            continue
+        data.append(x)
     return data